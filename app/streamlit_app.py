@@ -1,6 +1,6 @@
 # app/streamlit_app.py
 from __future__ import annotations
-import sys, pathlib
+import os, sys, pathlib, time
 
 # --- ensure project root is in sys.path ---
 ROOT = pathlib.Path(__file__).resolve().parents[1]
@@ -13,52 +13,174 @@ import pandas as pd
 import altair as alt
 from pathlib import Path
 
-from src.data_io import load_results
 from src.metrics import (
     team_perspective,
     filter_team_opponent_years,
     kpis,
     rolling_form,
-    rolling_goal_diff,
-    rolling_win_pct,
+    build_rolling_tables,
+    team_rolling,
     h2h_summary_table,
-    compute_elo,
-    team_elo_trend,
+    kpis_in_years,
+    contiguous_year_range,
+    build_h2h_cube,
+    h2h_lookup,
+    elo_trend,
+    elo_leaderboard_as_of,
+    standings,
+    team_match_table,
+    streaks_table,
+    team_records,
+    match_records,
+    match_expectations,
+    adjusted_kpis,
+    adjusted_kpis_table,
+    fit_goal_model,
+    goal_model_strengths,
+    scoreline_probabilities,
+    fixture_outcome_probabilities,
 )
+from src.ratings import compute_ratings
+from src.simulate import Tournament, simulate_tournament
 from src.qa import run_all_checks
 from src.i18n import I18N, tr
-from src.sql_io import init_db, load_csv_to_db, run_query, get_query_names, DEFAULT_DB_PATH
+from src.sql_io import (
+    init_db, rebuild_db, db_writer, run_query, run_query_paged, is_paged_query, export_query,
+    parquet_available, EXPORTS_DIR, EXPORT_FORMATS, get_query_names, get_federated_query_names,
+    run_federated_query,
+    configure_slow_query_log, read_slow_query_log, slow_query_summary, slow_query_threshold_ms,
+    configure_read_mode, read_mode, READ_MODES,
+)
+from src.artifacts import install_database, goal_model_artifact
+from src.datasets import DatasetSpec, list_datasets, dataset_shards
+from src.incremental import LivePool
 from src.report import build_h2h_report_html, build_team_report_html, save_report_html
+from src import perf
 
 st.set_page_config(page_title="Sports Results Support Kit", layout="wide")
 
-@st.cache_data
+@st.cache_resource
+def _pool():
+    # per-dataset snapshots shared by all sessions, under one memory budget
+    return LivePool()
+
+def _live(spec: DatasetSpec):
+    # matches appended to the CSV are folded in incrementally, any other edit
+    # reloads it (see src.incremental)
+    live = _pool().get(spec.name, spec.csv_path)
+    if live.snapshot.bundle is not None:
+        install_database(live.snapshot.bundle, spec.db_path)
+    return live
+
+def _ingested():
+    # one parse feeds the dashboard frame, the QA tab and the SQLite loader
+    return SNAPSHOT.ingested
+
 def _load():
-    return load_results()
+    # compact schema: shared team categoricals + narrow ints (see src.data_io.compact_results)
+    return _ingested().results
+
+def _kpi_index():
+    # shared across sessions and never copied
+    return SNAPSHOT.kpi_index
+
+def _h2h_cube():
+    return SNAPSHOT.cached("h2h_cube", lambda: build_h2h_cube(_load()))
+
+def _rolling_tables():
+    # form / GD / win % at the default windows for every team, in one pass
+    return SNAPSHOT.cached("rolling_tables", lambda: build_rolling_tables(_load()))
+
+def _build_streaks_records():
+    df_all = _load()
+    tm = team_match_table(df_all)
+    return streaks_table(df_all, tm), team_records(df_all, tm)
 
-@st.cache_data
-def _elo_cache(df: pd.DataFrame):
-    return compute_elo(df)
+def _streaks_records():
+    # precomputed for every team in one pass; pages only filter by team
+    return SNAPSHOT.cached("streaks_records", _build_streaks_records)
+
+def _elo():
+    return SNAPSHOT.elo
+
+def _ratings():
+    # all default rating models in one pass over the matches
+    return SNAPSHOT.cached("ratings", lambda: compute_ratings(_load()))
+
+def _goal_model(half_life_years: float):
+    # one fit per half-life setting, shared across sessions
+    return SNAPSHOT.cached(goal_model_artifact(half_life_years),
+                           lambda: fit_goal_model(_load(), half_life_years=half_life_years or None))
+
+def _elo_store():
+    return SNAPSHOT.elo_store
+
+def _match_expectations():
+    # every team-match joined to both sides' pre-match Elo, computed once
+    return SNAPSHOT.cached("match_expectations", lambda: match_expectations(_load(), _elo()[0]))
+
+def _team_adjusted(team: str, opponent: str | None = None, years: list[int] | None = None) -> dict:
+    exp = _match_expectations()
+    return adjusted_kpis(filter_team_opponent_years(exp[(exp["team"] == team).to_numpy()], opponent, years))
 
 def _unique_sorted_teams(df: pd.DataFrame) -> list[str]:
     teams = pd.unique(pd.concat([df["home_team"], df["away_team"]], ignore_index=True))
     return sorted(teams.tolist())
 
+def _date_range(label: str, start, end, key: str) -> tuple[str, str]:
+    # while only the first date is picked the widget returns a 1-tuple (or
+    # none when cleared); missing ends fall back to start / end
+    picked = st.date_input(label, value=(start, end), key=key)
+    return (picked[0] if picked else start).isoformat(), (picked[1] if len(picked) == 2 else end).isoformat()
+
 def reset_filters():
     for key in ("team", "opponent", "years"):
         if key in st.session_state:
             del st.session_state[key]
 
+# Process-wide settings (instrumentation, read mode, slow-query log) start
+# from the environment and change only when a session edits their widget,
+# so a rerun never overrides another session's or the env's choice.
+def _set_perf():
+    perf.enable(st.session_state["perf_on"])
+
+def _set_slow_query_log():
+    configure_slow_query_log(float(st.session_state["slow_ms"]) if st.session_state["slow_on"] else None)
+
+def _set_read_mode():
+    configure_read_mode(st.session_state["db_read_mode"])
+
+@st.cache_resource
+def _app_read_mode_default() -> str:
+    # once per process: the app reads through in-memory replicas unless
+    # RESULTS_DB_READ_MODE picked a mode
+    if not os.environ.get("RESULTS_DB_READ_MODE"):
+        configure_read_mode("memory")
+    return read_mode()
+
+_app_read_mode_default()
+
 # ---- LANGUAGE (global selector in sidebar) ----
 with st.sidebar:
     lang = st.selectbox("Language / Idioma", ["en", "es"], index=0, key="lang")
+    datasets = list_datasets()
+    DATASET = datasets[st.selectbox(tr(lang, "dataset"), list(datasets), key="dataset", on_change=reset_filters)]
+    st.session_state["perf_on"] = perf.is_enabled()
+    st.checkbox(tr(lang, "perf_enable"), key="perf_on", on_change=_set_perf, help=tr(lang, "process_wide_help"))
+# every timed call of this rerun lands in perf_rec (shown at the end of the script)
+perf_rec, perf_token = perf.start_recording()
 
 # ---- HEADER ----
 st.title(tr(lang, "app_title"))
 st.caption(tr(lang, "phase_caption"))
 
 # ---- LOAD DATA ----
+# one snapshot per rerun: a concurrent append never changes data mid-page
+SNAPSHOT = _live(DATASET).refresh()
 df = _load()
+if SNAPSHOT.generation:
+    st.caption(tr(lang, "data_updated", change=tr(lang, f"data_change_{SNAPSHOT.change}"),
+                  rows=SNAPSHOT.ingested.rows_read))
 
 # ---- TABS ----
 tab_main, tab_qa, tab_sql, tab_an = st.tabs([
@@ -68,7 +190,7 @@ tab_main, tab_qa, tab_sql, tab_an = st.tabs([
     tr(lang, "tab_analytics"),
 ])
 
-with tab_main:
+with tab_main, perf.timer("app.dashboard"):
     # Sidebar filters (under global language selector)
     with st.sidebar:
         st.subheader(tr(lang, "filters"))
@@ -86,7 +208,15 @@ with tab_main:
     df_filt = filter_team_opponent_years(df_team, opponent, years)
 
     st.markdown("### " + tr(lang, "kpis"))
-    k = kpis(df_filt)
+    year_range = contiguous_year_range(years)
+    use_index = not years or year_range is not None
+    if use_index and opponent is None:
+        # prefix-sum lookup: two binary searches, independent of history length
+        k = kpis_in_years(_kpi_index(), team, *(year_range or (None, None)))
+    elif use_index:
+        k = h2h_lookup(_h2h_cube(), team, opponent, *(year_range or (None, None)))
+    else:
+        k = kpis(df_filt)
     col1, col2, col3, col4, col5, col6 = st.columns(6)
     col1.metric(tr(lang, "games"), f"{k['games']}")
     col2.metric(tr(lang, "w_d_l"), f"{k['w']}-{k['d']}-{k['l']}")
@@ -97,6 +227,14 @@ with tab_main:
     ppg = round((k['w']*1 + k['d']*0.5) / k['games'], 2) if k['games'] else 0.0
     col6.metric(tr(lang, "points_per_game"), f"{ppg}")
 
+    adj = _team_adjusted(team, opponent, years)
+    acol1, acol2, acol3, acol4 = st.columns(4)
+    acol1.metric(tr(lang, "points_3_1_0"), f"{adj['pts']}")
+    acol2.metric(tr(lang, "expected_points"), f"{adj['xpts']}")
+    acol3.metric(tr(lang, "points_over_expectation"), f"{adj['poe']:+}", f"{adj['poe_per_game']:+} / game")
+    acol4.metric(tr(lang, "avg_opp_elo"), f"{adj['avg_opp_elo']:.0f}")
+    st.caption(tr(lang, "adjusted_kpis_caption"))
+
     st.divider()
 
     st.markdown("### " + tr(lang, "filtered_results"))
@@ -112,12 +250,16 @@ with tab_main:
     st.markdown("### " + tr(lang, "head_to_head"))
     if opponent:
         st.write(tr(lang, "selected_teams", team=team, opponent=opponent))
-        h2h_sum = (
-            df_filt.groupby("result")
-            .size()
-            .reindex(["W","D","L"], fill_value=0)
-            .reset_index(name="count")
-        )
+        if use_index:
+            # k already holds the cube lookup for this pair and year range
+            h2h_sum = pd.DataFrame({"result": ["W","D","L"], "count": [k["w"], k["d"], k["l"]]})
+        else:
+            h2h_sum = (
+                df_filt.groupby("result")
+                .size()
+                .reindex(["W","D","L"], fill_value=0)
+                .reset_index(name="count")
+            )
         st.dataframe(h2h_sum, use_container_width=True)
 
         form_df = rolling_form(df_filt, window=5)
@@ -128,7 +270,8 @@ with tab_main:
             recent_cols = ["date","is_home","opponent","gf","ga","result"]
             recent_tbl = df_filt[recent_cols].sort_values("date", ascending=False).head(20)
             form_vals = form_df["rolling_form"].tolist() if not form_df.empty else []
-            html_text = build_h2h_report_html(team, opponent, k_cur, h2h_sum, recent_tbl, form_vals)
+            html_text = build_h2h_report_html(team, opponent, k_cur, h2h_sum, recent_tbl, form_vals,
+                                              adjusted_kpi=adj)
             out_path = save_report_html(
                 html_text, out_dir="outputs",
                 file_name=f"report_h2h_{team.replace(' ','_')}_vs_{opponent.replace(' ','_')}.html"
@@ -152,15 +295,46 @@ with tab_main:
     else:
         st.info(tr(lang, "pick_opponent_info"))
 
-with tab_qa:
+    st.divider()
+
+    st.markdown("### " + tr(lang, "streaks_records_title"))
+    all_streaks, all_records = _streaks_records()
+    sr1, sr2 = st.columns(2)
+    sr1.dataframe(all_streaks[all_streaks["team"] == team].drop(columns="team"),
+                  use_container_width=True, hide_index=True)
+    sr2.dataframe(all_records[all_records["team"] == team].drop(columns="team"),
+                  use_container_width=True, hide_index=True)
+    with st.expander(tr(lang, "all_time_records")):
+        st.dataframe(match_records(df, "biggest_win", top=10), use_container_width=True, hide_index=True)
+        st.dataframe(match_records(df, "highest_scoring", top=10), use_container_width=True, hide_index=True)
+
+    st.divider()
+
+    st.markdown("### " + tr(lang, "standings_title"))
+    tournaments = sorted(df["tournament"].dropna().astype(str).unique().tolist()) if "tournament" in df.columns else []
+    comp = st.selectbox(tr(lang, "tournament"), [""] + tournaments, key="standings_tournament",
+                        format_func=lambda t: t or tr(lang, "all_tournaments"))
+    st.caption(tr(lang, "standings_caption"))
+    table = standings(df, tournament=comp or None, years=years or None)
+    st.dataframe(table, use_container_width=True, hide_index=True)
+
+with tab_qa, perf.timer("app.qa"):
     st.subheader(tr(lang, "tab_qa"))
     st.write(tr(lang, "qa_intro"))
     st.caption(tr(lang, "qa_checks_run"))
 
     use_demo = st.checkbox(tr(lang, "use_demo"), value=False)
 
-    df_qc = df.copy()
+    df_qc = df
     if use_demo and not df_qc.empty:
+        # Shallow copy: only the columns the demo edits are duplicated.
+        df_qc = df.copy(deep=False)
+        # demo values are not in the team categories; edit these columns as plain strings
+        for col in ("home_team", "away_team"):
+            df_qc[col] = df_qc[col].astype(object)
+        for col in ("date", "year"):
+            if col in df_qc.columns:
+                df_qc[col] = df_qc[col].copy()
         df_qc.loc[df_qc.index[0], "date"] = pd.Timestamp("2200-01-01")
         if "year" in df_qc.columns:
             df_qc.loc[df_qc.index[0], "year"] = 2200
@@ -168,7 +342,9 @@ with tab_qa:
         df_qc.loc[df_qc.index[2], "home_team"] = str(df_qc.loc[df_qc.index[2], "home_team"]) + "  "
 
     from src.qa import run_all_checks
-    issues_df = run_all_checks(df_qc)
+    # without the demo, show the checks made on the parsed CSV at ingestion
+    # (they also see rows that were dropped from the dashboard frame)
+    issues_df = run_all_checks(df_qc) if use_demo else _ingested().issues
 
     st.markdown("### " + tr(lang, "qa_summary"))
     if issues_df.empty:
@@ -196,24 +372,45 @@ with tab_qa:
     st.markdown("#### " + tr(lang, "qa_help_title"))
     st.write(tr(lang, "qa_help_text"))
 
-with tab_sql:
+with tab_sql, perf.timer("app.sql"):
     st.subheader(tr(lang, "sql_title"))
-    db_path = DEFAULT_DB_PATH
+    db_path = DATASET.db_path
     exists = Path(db_path).exists()
     st.caption(tr(lang, "db_path_exists", path=str(db_path), exists=str(exists)))
+    st.session_state["db_read_mode"] = read_mode()
+    st.selectbox(tr(lang, "db_read_mode"), READ_MODES, format_func=lambda m: tr(lang, f"db_read_mode_{m}"),
+                 key="db_read_mode", on_change=_set_read_mode, help=tr(lang, "process_wide_help"))
 
+    # writes go through one background writer per database; other sessions keep querying
+    writer = db_writer(db_path)
     colA, colB = st.columns([1,2])
     with colA:
+        job = None
         if st.button(tr(lang, "init_schema")):
-            init_db(db_path)
-            st.success("Schema initialized.")
+            job = writer.submit("init_schema", init_db, db_path)
 
         if st.button(tr(lang, "load_csv_db")):
-            try:
-                teams_count, matches_count = load_csv_to_db(db_path, Path("data/results.csv"))
+            # schema, matches and Elo history are rebuilt in one transaction
+            job = writer.submit("load_csv", rebuild_db, _ingested().results, db_path, _elo()[0])
+
+        if job is not None:
+            bar = st.progress(0.0, text=tr(lang, "write_job_status", name=job.name, status=job.status, message=""))
+            while not job.done:
+                bar.progress(job.progress, text=tr(lang, "write_job_status", name=job.name,
+                                                   status=job.status, message=job.message))
+                time.sleep(0.2)
+            bar.empty()
+            if job.error is not None:
+                st.error(tr(lang, "etl_error", error=str(job.error)))
+            elif job.name == "init_schema":
+                st.success("Schema initialized.")
+            else:
+                teams_count, matches_count, _ = job.result()
                 st.success(tr(lang, "etl_loaded", teams=teams_count, matches=matches_count))
-            except Exception as e:
-                st.error(tr(lang, "etl_error", error=str(e)))
+
+        for other in writer.pending():
+            st.caption(tr(lang, "write_job_status", name=other.name, status=other.status,
+                          message=f"{other.progress:.0%} {other.message}"))
 
     with colB:
         st.markdown("**" + tr(lang, "run_predef_query") + "**")
@@ -230,6 +427,63 @@ with tab_sql:
             if qname == "last_5_matches_h2h":
                 limit = st.number_input(tr(lang, "limit"), min_value=1, max_value=100, value=5, step=1, key="q_limit_h2h")
                 params["limit"] = int(limit)
+        elif qname == "h2h_summary_years":
+            team_a = st.selectbox(tr(lang, "team_a"), teams, key="q_team_a_years")
+            team_b = st.selectbox(tr(lang, "team_b"), [t for t in teams if t != team_a], key="q_team_b_years")
+            min_year, max_year = int(df["year"].min()), int(df["year"].max())
+            year_from, year_to = st.slider(tr(lang, "year_range"), min_value=min_year, max_value=max_year,
+                                           value=(min_year, max_year), key="q_year_range")
+            params.update({"team_a": team_a, "team_b": team_b,
+                           "year_from": int(year_from), "year_to": int(year_to)})
+        elif qname in ("team_year_kpis", "team_year_breakdown", "team_year_leaderboard"):
+            if qname != "team_year_leaderboard":
+                params["team_name"] = st.selectbox(tr(lang, "team"), teams, key="q_team_year")
+            min_year, max_year = int(df["year"].min()), int(df["year"].max())
+            year_from, year_to = st.slider(tr(lang, "year_range"), min_value=min_year, max_value=max_year,
+                                           value=(min_year, max_year), key="q_team_year_range")
+            params.update({"year_from": int(year_from), "year_to": int(year_to)})
+            if qname == "team_year_leaderboard":
+                min_games = st.number_input(tr(lang, "min_games"), min_value=1, max_value=1000, value=20, step=1, key="q_min_games")
+                limit = st.number_input(tr(lang, "limit"), min_value=1, max_value=500, value=20, step=1, key="q_limit_board")
+                params.update({"min_games": int(min_games), "limit": int(limit)})
+        elif qname in ("elo_team_trend", "elo_rating_at_match"):
+            params["team_name"] = st.selectbox(tr(lang, "team"), teams, key="q_team_elo")
+            if qname == "elo_team_trend":
+                params["date_from"], params["date_to"] = _date_range(
+                    tr(lang, "date_range"), df["date"].min().date(), df["date"].max().date(), key="q_elo_range")
+            else:
+                params["match_date"] = st.date_input(tr(lang, "match_date"), value=df["date"].max().date(),
+                                                     key="q_elo_match_date").isoformat()
+        elif qname == "elo_leaderboard_as_of":
+            params["as_of"] = st.date_input(tr(lang, "as_of_date"), value=df["date"].max().date(),
+                                            key="q_elo_as_of").isoformat()
+            params["limit"] = int(st.number_input(tr(lang, "limit"), min_value=1, max_value=500, value=20,
+                                                  step=1, key="q_limit_elo"))
+        elif qname in ("team_rolling_metrics", "team_rolling_metrics_days"):
+            params["team_name"] = st.selectbox(tr(lang, "team"), teams, key="q_team_rolling")
+            if qname == "team_rolling_metrics":
+                params["window"] = int(st.number_input(tr(lang, "window_matches"), min_value=1, max_value=100,
+                                                       value=5, step=1, key="q_window"))
+            else:
+                params["days"] = int(st.number_input(tr(lang, "window_days"), min_value=1, max_value=3650,
+                                                     value=365, step=1, key="q_window_days"))
+        elif qname in ("all_teams_rolling_metrics", "all_teams_current_form"):
+            params["window"] = int(st.number_input(tr(lang, "window_matches"), min_value=1, max_value=100,
+                                                   value=5, step=1, key="q_window_all"))
+            if qname == "all_teams_rolling_metrics":
+                params["date_from"], params["date_to"] = _date_range(
+                    tr(lang, "date_range"), df["date"].max().date().replace(month=1, day=1),
+                    df["date"].max().date(), key="q_rolling_range")
+            else:
+                params["as_of"] = st.date_input(tr(lang, "as_of_date"), value=df["date"].max().date(),
+                                                key="q_form_as_of").isoformat()
+                params["limit"] = int(st.number_input(tr(lang, "limit"), min_value=1, max_value=500, value=20,
+                                                      step=1, key="q_limit_form"))
+        elif qname == "team_match_history":
+            params["team_name"] = st.selectbox(tr(lang, "team"), teams, key="q_team_history")
+        elif qname == "match_history":
+            params["date_from"], params["date_to"] = _date_range(
+                tr(lang, "date_range"), df["date"].min().date(), df["date"].max().date(), key="q_history_range")
         elif qname in ("recent_form_10", "team_top_opponents", "team_recent_goal_diff"):
             team_name = st.selectbox(tr(lang, "team"), teams, key="q_team_single")
             params["team_name"] = team_name
@@ -237,35 +491,126 @@ with tab_sql:
             limit = st.number_input(tr(lang, "limit"), min_value=1, max_value=200, value=default_limit, step=1, key="q_limit_single")
             params["limit"] = int(limit)
 
-        if st.button("Run Query" if lang == "en" else "Ejecutar consulta"):
+        if is_paged_query(qname):
+            # keyset pages: session state keeps the stack of page start keys
+            page_size = st.selectbox(tr(lang, "page_size"), [50, 100, 500, 1000], index=1, key="q_page_size")
+            pager_key = repr((qname, sorted(params.items()), page_size))
+            pager = st.session_state.get("sql_pager")
+            if pager is None or pager["key"] != pager_key:
+                pager = st.session_state["sql_pager"] = {"key": pager_key, "stack": [None], "next": None}
+            if not Path(db_path).exists():
+                st.error(tr(lang, "db_not_found"))
+            else:
+                try:
+                    page = run_query_paged(qname, params, page_size, pager["stack"][-1], db_path)
+                    pager["next"] = page.next_after
+                    first_row = (len(pager["stack"]) - 1) * page_size + 1
+                    st.caption(tr(lang, "page_caption", page=len(pager["stack"]), first=first_row,
+                                  last=first_row + len(page.rows) - 1))
+                    st.dataframe(page.rows, use_container_width=True, hide_index=True)
+                    pv, nx = st.columns(2)
+                    pv.button(tr(lang, "prev_page"), disabled=len(pager["stack"]) == 1, key="q_prev",
+                              on_click=lambda: pager["stack"].pop())
+                    nx.button(tr(lang, "next_page"), disabled=page.next_after is None, key="q_next",
+                              on_click=lambda: pager["stack"].append(pager["next"]))
+                except Exception as e:
+                    st.error(tr(lang, "query_error", error=str(e)))
+        elif st.button("Run Query" if lang == "en" else "Ejecutar consulta"):
             if not Path(db_path).exists():
                 st.error(tr(lang, "db_not_found"))
             else:
                 try:
                     out = run_query(qname, params, db_path=db_path)
                     st.dataframe(out, use_container_width=True)
-                    if qname == "team_recent_goal_diff" and not out.empty:
+                    chart_cols = {"team_recent_goal_diff": "gd", "elo_team_trend": "rating",
+                                  "team_rolling_metrics": "rolling_form", "team_rolling_metrics_days": "rolling_form"}
+                    if qname in chart_cols and not out.empty:
+                        y_col = chart_cols[qname]
                         chart = (
                             alt.Chart(out)
                             .mark_line(point=True)
-                            .encode(x="date:T", y="gd:Q", tooltip=["date:T", "gd:Q"])
+                            .encode(x="date:T", y=f"{y_col}:Q", tooltip=["date:T", f"{y_col}:Q"])
                             .properties(height=300)
                         )
                         st.altair_chart(chart, use_container_width=True)
                 except Exception as e:
                     st.error(tr(lang, "query_error", error=str(e)))
 
-with tab_an:
+        # streamed batch by batch from one cursor into a file; never a full DataFrame
+        with st.expander(tr(lang, "export_title")):
+            formats = [f for f in EXPORT_FORMATS if f != "parquet" or parquet_available()]
+            fmt = st.selectbox(tr(lang, "export_format"), formats, key="q_export_fmt")
+            if st.button(tr(lang, "export_btn"), key="q_export"):
+                if not Path(db_path).exists():
+                    st.error(tr(lang, "db_not_found"))
+                else:
+                    out_path = EXPORTS_DIR / f"{qname}_{time.strftime('%Y%m%d_%H%M%S')}{EXPORT_FORMATS[fmt]}"
+                    try:
+                        rows = export_query(qname, params, out_path, fmt, db_path=db_path)
+                        st.success(tr(lang, "export_done", rows=rows, path=str(out_path)))
+                        with open(out_path, "rb") as f:
+                            st.download_button(tr(lang, "download_now"), data=f, file_name=out_path.name,
+                                               key="q_export_download")
+                    except Exception as e:
+                        st.error(tr(lang, "query_error", error=str(e)))
+
+    # every dataset's database ATTACHed into one connection
+    with st.expander(tr(lang, "federated_title")):
+        st.caption(tr(lang, "federated_caption", datasets=", ".join(datasets)))
+        fname = st.selectbox(tr(lang, "query"), get_federated_query_names(), key="fed_qname")
+        fparams = {}
+        if fname == "team_across_datasets":
+            fparams["team_name"] = st.text_input(tr(lang, "team"), value=teams[0] if teams else "", key="fed_team")
+        if fname in ("team_across_datasets", "goals_per_year_across_datasets"):
+            fy1, fy2 = st.columns(2)
+            fparams["year_from"] = int(fy1.number_input(tr(lang, "year_from"), value=1870, step=1, key="fed_y1"))
+            fparams["year_to"] = int(fy2.number_input(tr(lang, "year_to"), value=2100, step=1, key="fed_y2"))
+        if fname == "elo_top_across_datasets":
+            fparams["limit"] = int(st.number_input(tr(lang, "limit"), min_value=1, max_value=100, value=5,
+                                                   step=1, key="fed_limit"))
+        if st.button(tr(lang, "run_query"), key="fed_run"):
+            try:
+                st.dataframe(run_federated_query(fname, fparams, dataset_shards()),
+                             use_container_width=True, hide_index=True)
+            except Exception as e:
+                st.error(tr(lang, "query_error", error=str(e)))
+
+    with st.expander(tr(lang, "slow_query_title")):
+        sq1, sq2 = st.columns(2)
+        threshold = slow_query_threshold_ms()
+        st.session_state["slow_on"] = threshold is not None
+        if threshold is not None:
+            st.session_state["slow_ms"] = min(int(threshold), 60_000)
+        elif "slow_ms" not in st.session_state:
+            st.session_state["slow_ms"] = 100
+        sq1.checkbox(tr(lang, "slow_query_enable"), key="slow_on", on_change=_set_slow_query_log,
+                     help=tr(lang, "process_wide_help"))
+        sq2.number_input(tr(lang, "slow_query_threshold"), min_value=0, max_value=60_000, step=10,
+                         key="slow_ms", on_change=_set_slow_query_log)
+        slow_entries = read_slow_query_log()
+        if slow_entries.empty:
+            st.info(tr(lang, "slow_query_empty"))
+        else:
+            st.dataframe(slow_query_summary(slow_entries), use_container_width=True, hide_index=True)
+            st.markdown("**" + tr(lang, "slow_query_recent") + "**")
+            recent = slow_entries.tail(20).iloc[::-1]
+            st.dataframe(recent[["ts", "query", "ms", "rows", "signature"]], use_container_width=True, hide_index=True)
+            worst = slow_entries.loc[slow_entries["ms"].idxmax()]
+            st.caption(tr(lang, "slow_query_plan", query=worst["query"], ms=worst["ms"]))
+            st.code("\n".join(worst["plan"]), language="text")
+
+with tab_an, perf.timer("app.analytics"):
     st.subheader(tr(lang, "an_title"))
     teams = _unique_sorted_teams(df)
     team_an = st.selectbox(tr(lang, "team_analytics"), teams, key="an_team")
 
     df_t = team_perspective(df, team_an)
+    # rolling_form / rolling_goal_diff (5) and rolling_win_pct (10) of df_t
+    rf, rgd, rwp = team_rolling(_rolling_tables(), team_an)
 
     c1, c2 = st.columns(2)
     with c1:
         st.markdown("**" + tr(lang, "rolling_form_title") + "**")
-        rf = rolling_form(df_t, window=5)
         if not rf.empty:
             ch = (
                 alt.Chart(rf).mark_line(point=True)
@@ -279,7 +624,6 @@ with tab_an:
 
     with c2:
         st.markdown("**" + tr(lang, "rolling_gd_title") + "**")
-        rgd = rolling_goal_diff(df_t, window=5)
         if not rgd.empty:
             ch2 = (
                 alt.Chart(rgd).mark_line(point=True)
@@ -294,7 +638,6 @@ with tab_an:
     st.divider()
 
     st.markdown("**" + tr(lang, "rolling_winpct_title") + "**")
-    rwp = rolling_win_pct(df_t, window=10)
     if not rwp.empty:
         ch3 = (
             alt.Chart(rwp).mark_line(point=True)
@@ -310,8 +653,8 @@ with tab_an:
 
     st.markdown("**" + tr(lang, "elo_title") + "**")
     with st.spinner("Computing Elo ratings..." if lang == "en" else "Calculando calificaciones Elo..."):
-        ratings_history, final_ratings = _elo_cache(df)
-    trend = team_elo_trend(ratings_history, team_an)
+        elo_store = _elo_store()
+    trend = elo_trend(elo_store, team_an)
     if not trend.empty:
         elo_chart = (
             alt.Chart(trend).mark_line(point=True)
@@ -324,6 +667,90 @@ with tab_an:
     else:
         st.info(tr(lang, "no_data_elo"))
 
+    with st.expander(tr(lang, "rating_models_title")):
+        _, model_final, model_scores = _ratings()
+        st.caption(tr(lang, "rating_models_caption"))
+        st.dataframe(model_scores, use_container_width=True)
+        st.dataframe(model_final.head(20), use_container_width=True)
+
+    with st.expander(tr(lang, "adjusted_table_title")):
+        st.caption(tr(lang, "adjusted_kpis_caption"))
+        st.dataframe(adjusted_kpis_table(_match_expectations(), min_games=50), use_container_width=True)
+
+    st.markdown("**" + tr(lang, "elo_leaderboard_title") + "**")
+    as_of = st.date_input(tr(lang, "as_of_date"), value=df["date"].max().date(),
+                          min_value=df["date"].min().date(), max_value=df["date"].max().date(), key="elo_as_of")
+    st.dataframe(elo_leaderboard_as_of(elo_store, as_of, top=20), use_container_width=True)
+
+    st.divider()
+
+    st.markdown("**" + tr(lang, "goal_model_title") + "**")
+    st.caption(tr(lang, "goal_model_caption"))
+    half_life = st.select_slider(tr(lang, "goal_model_half_life"), options=[0, 2, 4, 8, 16], value=4,
+                                 key="gm_half_life")
+    with st.spinner("Fitting goal model..." if lang == "en" else "Ajustando modelo de goles..."):
+        goal_model = _goal_model(float(half_life))
+    gc1, gc2, gc3 = st.columns([2, 2, 1])
+    gm_home = gc1.selectbox(tr(lang, "home_side"), teams, index=teams.index(team_an), key="gm_home")
+    gm_away = gc2.selectbox(tr(lang, "away_side"), [t for t in teams if t != gm_home], key="gm_away")
+    gm_neutral = gc3.checkbox(tr(lang, "neutral_ground"), value=False, key="gm_neutral")
+    try:
+        probs = fixture_outcome_probabilities(goal_model, gm_home, gm_away, neutral=gm_neutral)
+        pc1, pc2, pc3, pc4 = st.columns(4)
+        pc1.metric(tr(lang, "home_win"), f"{probs['home_win']:.1%}")
+        pc2.metric(tr(lang, "draw"), f"{probs['draw']:.1%}")
+        pc3.metric(tr(lang, "away_win"), f"{probs['away_win']:.1%}")
+        pc4.metric(tr(lang, "expected_goals"), f"{probs['exp_home_goals']} - {probs['exp_away_goals']}")
+        grid = scoreline_probabilities(goal_model, gm_home, gm_away, neutral=gm_neutral, max_goals=6)
+        grid_long = grid.stack().rename("p").reset_index()
+        st.altair_chart(
+            alt.Chart(grid_long).mark_rect()
+            .encode(x="away_goals:O", y=alt.Y("home_goals:O", sort="descending"),
+                    color=alt.Color("p:Q", title="P(score)"),
+                    tooltip=["home_goals:O", "away_goals:O", alt.Tooltip("p:Q", format=".1%")])
+            .properties(height=300),
+            use_container_width=True,
+        )
+    except ValueError as e:
+        st.error(str(e))
+    with st.expander(tr(lang, "goal_model_strengths")):
+        st.dataframe(goal_model_strengths(goal_model).head(50), use_container_width=True)
+
+    st.divider()
+
+    st.markdown("**" + tr(lang, "sim_title") + "**")
+    _, elo_final = _elo()
+    sim_format = st.radio(tr(lang, "sim_format"), ["knockout", "groups"], horizontal=True, key="sim_format",
+                          format_func=lambda f: tr(lang, f"sim_format_{f}"))
+    sim_teams = st.multiselect(tr(lang, "sim_teams"), teams,
+                               default=elo_final["team"].head(16).tolist(), key="sim_teams")
+    sc1, sc2 = st.columns(2)
+    n_sims = sc1.select_slider(tr(lang, "sim_n"), options=[10_000, 50_000, 100_000, 200_000],
+                               value=100_000, key="sim_n")
+    sim_seed = sc2.number_input(tr(lang, "sim_seed"), min_value=0, value=0, step=1, key="sim_seed")
+    if st.button(tr(lang, "sim_run"), key="sim_run"):
+        n_teams = len(sim_teams)
+        try:
+            if sim_format == "groups":
+                if n_teams % 4:
+                    raise ValueError(tr(lang, "sim_groups_error"))
+                groups = {chr(ord("A") + i): sim_teams[4 * i:4 * i + 4] for i in range(n_teams // 4)}
+                tournament = Tournament(groups=groups, advance=2)
+            else:
+                tournament = Tournament(knockout=sim_teams)
+            with st.spinner(tr(lang, "sim_running")):
+                sim_out = simulate_tournament(tournament, elo_final, n_sims=int(n_sims), seed=int(sim_seed))
+            st.dataframe(sim_out, use_container_width=True)
+            st.altair_chart(
+                alt.Chart(sim_out).mark_bar()
+                .encode(x=alt.X("team:N", sort="-y"), y=alt.Y("p_champion:Q", title="P(champion)"),
+                        tooltip=["team:N", "p_champion:Q"])
+                .properties(height=280),
+                use_container_width=True,
+            )
+        except ValueError as e:
+            st.error(str(e))
+
     st.divider()
     # Export team report button
     if st.button(tr(lang, "export_team"), key="export_team_report"):
@@ -332,9 +759,29 @@ with tab_an:
         rgd_tbl = rgd.tail(20) if not rgd.empty else pd.DataFrame()
         form_vals = rf["rolling_form"].tolist() if not rf.empty else []
         gd_vals = rgd["rolling_gd"].tolist() if not rgd.empty else []
-        html_text = build_team_report_html(team_an, k_full, rf_tbl, rgd_tbl, form_vals, gd_vals)
+        all_streaks, all_records = _streaks_records()
+        html_text = build_team_report_html(
+            team_an, k_full, rf_tbl, rgd_tbl, form_vals, gd_vals,
+            streaks_table=all_streaks[all_streaks["team"] == team_an].drop(columns="team"),
+            records_table=all_records[all_records["team"] == team_an].drop(columns="team"),
+            adjusted_kpi=_team_adjusted(team_an),
+        )
         out_path = save_report_html(html_text, out_dir="outputs",
                                     file_name=f"report_team_{team_an.replace(' ','_')}.html")
         st.success(tr(lang, "export_saved", path=str(out_path)))
         st.download_button(tr(lang, "download_now"), data=html_text.encode("utf-8"),
                            file_name=out_path.name, mime="text/html")
+
+# ---- PERFORMANCE (sidebar) ----
+perf.stop_recording(perf_rec, perf_token)
+if perf.is_enabled():
+    with st.sidebar, st.expander(tr(lang, "perf_title"), expanded=False):
+        st.caption(tr(lang, "perf_caption", ms=round(perf_rec.seconds * 1000.0, 1)))
+        rerun_rows = perf.breakdown(perf_rec)
+        if rerun_rows:
+            st.dataframe(pd.DataFrame(rerun_rows), use_container_width=True, hide_index=True)
+        export = {**perf.snapshot(), "rerun": {"seconds": round(perf_rec.seconds, 6), "calls": rerun_rows}}
+        st.download_button(tr(lang, "perf_download_json"), data=perf.to_json(export).encode("utf-8"),
+                           file_name="perf_snapshot.json", mime="application/json")
+        st.download_button(tr(lang, "perf_download_prom"), data=perf.to_prometheus().encode("utf-8"),
+                           file_name="perf_metrics.prom", mime="text/plain")
@@ -0,0 +1,62 @@
+# benchmarks/alloc_metrics.py
+# Peak Python-heap allocation (tracemalloc) and wall time per call for the metrics hot paths.
+# Run from the repo root:  python -m benchmarks.alloc_metrics [--team England] [--compact]
+
+from __future__ import annotations
+import argparse
+import time
+import tracemalloc
+from typing import Callable, Dict, List
+
+import pandas as pd
+
+from src.data_io import load_results
+from src.metrics import (
+    team_perspective, filter_team_opponent_years, kpis,
+    rolling_form, rolling_goal_diff, rolling_win_pct,
+)
+
+def measure(fn: Callable[[], object], repeat: int = 5) -> Dict[str, float]:
+    """Best-of-N wall time (ms) and tracemalloc peak (MB) of a single call."""
+    fn()  # warm-up (imports, caches)
+    best_ms = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best_ms = min(best_ms, (time.perf_counter() - t0) * 1000.0)
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {"ms": round(best_ms, 3), "peak_mb": round(peak / 1_000_000, 3)}
+
+def run(df: pd.DataFrame, team: str) -> pd.DataFrame:
+    df_team = team_perspective(df, team)
+    opponent = str(df_team["opponent"].mode().iloc[0]) if not df_team.empty else None
+    years = sorted(df_team["year"].unique().tolist())[-10:]
+    cases = {
+        "dataset_copy (reference)": lambda: df.copy(),
+        "team_perspective": lambda: team_perspective(df, team),
+        "filter_team_opponent_years": lambda: filter_team_opponent_years(df_team, opponent, years),
+        "kpis": lambda: kpis(df_team),
+        "rolling_form": lambda: rolling_form(df_team, window=5),
+        "rolling_goal_diff": lambda: rolling_goal_diff(df_team, window=5),
+        "rolling_win_pct": lambda: rolling_win_pct(df_team, window=10),
+        "rolling_form_365D": lambda: rolling_form(df_team, window="365D"),
+    }
+    rows: List[dict] = []
+    for name, fn in cases.items():
+        rows.append({"path": name, **measure(fn)})
+    return pd.DataFrame(rows)
+
+def main():
+    ap = argparse.ArgumentParser(description="Peak allocation and wall time of the metrics hot paths")
+    ap.add_argument("--team", default="England")
+    ap.add_argument("--compact", action="store_true", help="use the compact in-memory schema")
+    args = ap.parse_args()
+    df = load_results(compact=args.compact)
+    print(f"rows={len(df)} team={args.team} compact={args.compact}")
+    print(run(df, args.team).to_string(index=False))
+
+if __name__ == "__main__":
+    main()
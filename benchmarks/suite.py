@@ -0,0 +1,191 @@
+# benchmarks/suite.py
+# Time and memory-profile the hot paths on synthetic datasets of increasing
+# size, write the results as JSON, and optionally fail when a path slowed
+# down beyond a threshold against a stored baseline.
+#
+#   python -m benchmarks.suite --sizes 50k,1M --out bench.json
+#   python -m benchmarks.suite --sizes 50k --baseline bench.json --max-slowdown 1.3
+
+from __future__ import annotations
+import argparse
+import json
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.synthetic import parse_size, write_results_csv
+from src.data_io import ingest_results, load_results, parse_results
+from src.metrics import (
+    team_perspective, filter_team_opponent_years, compute_elo, rolling_form, rolling_goal_diff, kpis,
+)
+from src.qa import run_all_checks
+from src.report import build_team_report_html, build_h2h_report_html
+from src.sql_io import init_db, load_csv_to_db, run_query
+
+DEFAULT_SIZES = "50k"
+PATHS = ("load_results", "ingest_results", "run_all_checks", "team_perspective", "compute_elo",
+         "load_csv_to_db", "run_query", "build_team_report_html", "build_h2h_report_html")
+
+def dataset(rows: int, seed: int, data_dir: Path) -> Path:
+    """Synthetic CSV for (rows, seed), generated once and reused."""
+    path = data_dir / f"synthetic_{rows}_{seed}.csv"
+    if not path.exists():
+        write_results_csv(path, rows, seed)
+    return path
+
+def time_and_memory(fn: Callable[[], object], repeat: int = 1, memory: bool = True) -> Dict[str, float]:
+    """Best-of-N wall time (s) and, separately, the tracemalloc peak (MB) of one call."""
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    out = {"seconds": round(best, 4)}
+    if memory:
+        tracemalloc.start()
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        out["peak_mb"] = round(peak / 1_000_000, 2)
+    return out
+
+def hot_paths(csv_path: Path, work_dir: Path, paths=PATHS) -> Dict[str, Callable[[], object]]:
+    """Each callable runs one path; shared inputs are prepared once, outside the timings."""
+    df = load_results(csv_path=csv_path)
+    parsed = parse_results(csv_path)
+    team = pd.concat([df["home_team"], df["away_team"]]).value_counts().index[0]
+    df_team = team_perspective(df, team)
+    opponent = str(df_team["opponent"].mode().iloc[0])
+    db_path = work_dir / "bench.db"
+    query_db = work_dir / "query.db"
+    if "run_query" in paths:
+        init_db(query_db)
+        load_csv_to_db(query_db, csv_path)
+
+    def load_db():
+        init_db(db_path)
+        return load_csv_to_db(db_path, csv_path)
+
+    def queries():
+        run_query("team_rolling_metrics", {"team_name": team, "window": 10}, query_db)
+        run_query("team_year_leaderboard",
+                  {"year_from": 1900, "year_to": 2100, "min_games": 10, "limit": 50}, query_db)
+
+    def report():
+        rf, rgd = rolling_form(df_team), rolling_goal_diff(df_team)
+        return build_team_report_html(team, kpis(df_team), rf.tail(20), rgd.tail(20),
+                                      rf["rolling_form"].tolist(), rgd["rolling_gd"].tolist())
+
+    def h2h_report():
+        df_pair = filter_team_opponent_years(df_team, opponent, None)
+        summary = df_pair["result"].value_counts().reindex(["W", "D", "L"], fill_value=0).reset_index(name="count")
+        recent = df_pair[["date", "is_home", "opponent", "gf", "ga", "result"]] \
+            .sort_values("date", ascending=False).head(20)
+        return build_h2h_report_html(team, opponent, kpis(df_pair), summary, recent,
+                                     rolling_form(df_pair)["rolling_form"].tolist())
+
+    return {
+        "load_results": lambda: load_results(csv_path=csv_path),
+        "ingest_results": lambda: ingest_results(csv_path),
+        "run_all_checks": lambda: run_all_checks(parsed),
+        "team_perspective": lambda: team_perspective(df, team),
+        "compute_elo": lambda: compute_elo(df),
+        "load_csv_to_db": load_db,
+        "run_query": queries,
+        "build_team_report_html": report,
+        "build_h2h_report_html": h2h_report,
+    }
+
+def run_suite(sizes: List[str], seed: int = 0, paths: List[str] | None = None, repeat: int = 1,
+              memory: bool = True, data_dir: Path | None = None) -> dict:
+    data_dir = data_dir or Path(tempfile.gettempdir()) / "results_bench"
+    data_dir.mkdir(parents=True, exist_ok=True)
+    results = []
+    for size in sizes:
+        rows = parse_size(size)
+        csv_path = dataset(rows, seed, data_dir)
+        with tempfile.TemporaryDirectory() as tmp:
+            cases = hot_paths(csv_path, Path(tmp), paths or PATHS)
+            for name in paths or PATHS:
+                m = time_and_memory(cases[name], repeat=repeat, memory=memory)
+                results.append({"size": size, "rows": rows, "path": name, **m})
+                print(f"[BENCH] {size:>5} {name:<24} {m['seconds']:>9.4f}s"
+                      + (f" {m['peak_mb']:>9.2f} MB" if memory else ""), file=sys.stderr)
+    return {
+        "meta": {
+            "created": datetime.now().isoformat(timespec="seconds"),
+            "seed": seed,
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "pandas": pd.__version__,
+            "platform": platform.platform(),
+        },
+        "results": results,
+    }
+
+def compare_to_baseline(current: dict, baseline: dict, max_slowdown: float = 1.3,
+                        min_seconds: float = 0.05) -> pd.DataFrame:
+    """
+    One row per (size, path) present in both runs. A path regresses when it
+    is more than max_slowdown times slower; paths faster than min_seconds in
+    both runs are too noisy to judge and never regress.
+    """
+    base = {(r["size"], r["path"]): r["seconds"] for r in baseline["results"]}
+    rows = []
+    for r in current["results"]:
+        key = (r["size"], r["path"])
+        if key not in base:
+            continue
+        ratio = r["seconds"] / base[key] if base[key] > 0 else float("inf")
+        noisy = max(r["seconds"], base[key]) < min_seconds
+        rows.append({"size": r["size"], "path": r["path"], "baseline_s": base[key],
+                     "current_s": r["seconds"], "ratio": round(ratio, 3),
+                     "regressed": bool(ratio > max_slowdown and not noisy)})
+    return pd.DataFrame(rows, columns=["size", "path", "baseline_s", "current_s", "ratio", "regressed"])
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="Benchmark the hot paths on synthetic data")
+    ap.add_argument("--sizes", default=DEFAULT_SIZES, help="comma-separated, e.g. 50k,1M,10M")
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--paths", default=None, help=f"comma-separated subset of: {','.join(PATHS)}")
+    ap.add_argument("--repeat", type=int, default=3, help="best-of-N timing")
+    ap.add_argument("--no-memory", action="store_true", help="skip the tracemalloc pass")
+    ap.add_argument("--data-dir", type=Path, default=None, help="where synthetic CSVs are cached")
+    ap.add_argument("--out", type=Path, default=None, help="write results JSON here")
+    ap.add_argument("--baseline", type=Path, default=None, help="compare against this results JSON")
+    ap.add_argument("--max-slowdown", type=float, default=1.3)
+    args = ap.parse_args()
+
+    paths = args.paths.split(",") if args.paths else None
+    unknown = set(paths or []) - set(PATHS)
+    if unknown:
+        ap.error(f"unknown paths: {sorted(unknown)}")
+    current = run_suite(args.sizes.split(","), args.seed, paths, args.repeat,
+                        not args.no_memory, args.data_dir)
+    text = json.dumps(current, indent=2)
+    if args.out:
+        args.out.write_text(text, encoding="utf-8")
+        print(f"[BENCH] Saved: {args.out}", file=sys.stderr)
+    else:
+        print(text)
+
+    if args.baseline:
+        report = compare_to_baseline(current, json.loads(args.baseline.read_text(encoding="utf-8")),
+                                     args.max_slowdown)
+        print(report.to_string(index=False), file=sys.stderr)
+        if report["regressed"].any():
+            print(f"[BENCH] Regression: {int(report['regressed'].sum())} path(s) slower than "
+                  f"{args.max_slowdown}x baseline", file=sys.stderr)
+            return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,145 @@
+# benchmarks/synthetic.py
+# Seeded synthetic international results in the schema of data/results.csv:
+# team count growing with the row count, match density rising over time,
+# a realistic tournament mix, Poisson scores from hidden team strengths and
+# a small share of dirty rows (bad dates, padded / variant names, missing
+# scores) for the QA path. Output depends only on (n_rows, seed, chunk_rows).
+#
+# python -m benchmarks.synthetic 1M --out /tmp/results_1M.csv --seed 7
+
+from __future__ import annotations
+import argparse
+from pathlib import Path
+from typing import Iterator
+import numpy as np
+import pandas as pd
+
+FIRST_YEAR, LAST_YEAR = 1872, 2025
+TOURNAMENTS = [
+    ("Friendly", 0.40),
+    ("FIFA World Cup qualification", 0.18),
+    ("UEFA Nations League", 0.06),
+    ("UEFA Euro qualification", 0.06),
+    ("African Cup of Nations qualification", 0.05),
+    ("AFC Asian Cup qualification", 0.04),
+    ("FIFA World Cup", 0.02),
+    ("UEFA Euro", 0.01),
+    ("Copa América", 0.02),
+    ("African Cup of Nations", 0.02),
+    ("Gold Cup", 0.01),
+    ("AFC Asian Cup", 0.01),
+]
+MINOR_CUPS = 80  # the remaining share is spread over small regional cups
+
+def parse_size(size: str | int) -> int:
+    """'50k' -> 50_000, '1M' -> 1_000_000, '10M' -> 10_000_000."""
+    if isinstance(size, int):
+        return size
+    s = str(size).strip().upper()
+    mult = {"K": 1_000, "M": 1_000_000}.get(s[-1:], 1)
+    return int(float(s[:-1] if mult > 1 else s) * mult)
+
+def default_team_count(n_rows: int) -> int:
+    # ~330 teams at the real dataset's ~50k rows, a few thousand at 10M
+    return int(np.clip(1.5 * np.sqrt(n_rows), 40, 5000))
+
+def _tournament_table() -> tuple[np.ndarray, np.ndarray]:
+    names = [t for t, _ in TOURNAMENTS] + [f"Regional Cup {i:02d}" for i in range(MINOR_CUPS)]
+    major = np.array([p for _, p in TOURNAMENTS])
+    probs = np.concatenate([major, np.full(MINOR_CUPS, (1.0 - major.sum()) / MINOR_CUPS)])
+    return np.array(names, dtype=object), probs
+
+def _team_names(n_teams: int) -> np.ndarray:
+    return np.array([f"Nation {i:04d}" for i in range(n_teams)], dtype=object)
+
+def _sorted_years(n_rows: int, rng: np.random.Generator) -> np.ndarray:
+    years = np.arange(FIRST_YEAR, LAST_YEAR + 1)
+    weight = (years - FIRST_YEAR + 5.0) ** 2
+    return np.sort(rng.choice(years, size=n_rows, p=weight / weight.sum())).astype(np.int16)
+
+def _chunk(years: np.ndarray, teams: np.ndarray, strength: np.ndarray, dirty_frac: float,
+           rng: np.random.Generator) -> pd.DataFrame:
+    n, k = len(years), len(teams)
+    day = rng.integers(0, 365, n)
+    order = np.lexsort((day, years))
+    dates = ((years[order].astype(np.int64) - 1970).astype("datetime64[Y]").astype("datetime64[D]")
+             + day[order].astype("timedelta64[D]"))
+    date_str = np.datetime_as_string(dates, unit="D").astype(object)
+
+    # active teams grow over time: early years draw from the first few codes
+    span = (years[order] - FIRST_YEAR + 1) / (LAST_YEAR - FIRST_YEAR + 1)
+    pool = np.maximum((k * span).astype(np.int64), 2)
+    home = (rng.random(n) * pool).astype(np.int64)
+    away = (home + 1 + (rng.random(n) * (pool - 1)).astype(np.int64)) % pool
+
+    neutral = rng.random(n) < 0.25
+    lam_home = np.exp(0.25 + 0.3 * ~neutral + strength[home] - strength[away])
+    lam_away = np.exp(0.25 + strength[away] - strength[home])
+    t_names, t_probs = _tournament_table()
+    tournament = t_names[rng.choice(len(t_names), size=n, p=t_probs)]
+    country = np.where(neutral, teams[(home + 7) % k], teams[home])
+    city = np.char.add("City ", (home * 3 + rng.integers(0, 3, n)).astype(str)).astype(object)
+
+    df = pd.DataFrame({
+        "date": date_str,
+        "home_team": teams[home],
+        "away_team": teams[away],
+        "home_score": rng.poisson(lam_home).astype(float),
+        "away_score": rng.poisson(lam_away).astype(float),
+        "tournament": tournament,
+        "city": city,
+        "country": country,
+        "neutral": neutral,
+    })
+
+    # dirty rows, split evenly across the kinds QA reports
+    dirty = np.flatnonzero(rng.random(n) < dirty_frac)
+    kind = rng.integers(0, 4, len(dirty))
+    df.loc[dirty[kind == 0], "date"] = "not a date"
+    padded = dirty[kind == 1]
+    df.loc[padded, "home_team"] = "  " + df.loc[padded, "home_team"] + " "
+    variant = dirty[kind == 2]
+    df.loc[variant, "away_team"] = df.loc[variant, "away_team"].str.upper().str.replace("A", "Á", regex=False)
+    df.loc[dirty[kind == 3], "home_score"] = np.nan
+    return df
+
+def iter_results(n_rows: int, seed: int = 0, chunk_rows: int = 1_000_000, dirty_frac: float = 0.001,
+                 n_teams: int | None = None) -> Iterator[pd.DataFrame]:
+    """Chunks in date order; each chunk draws from its own spawned seed."""
+    root = np.random.SeedSequence(seed)
+    setup_seq, *chunk_seqs = root.spawn(1 + max(1, -(-n_rows // chunk_rows)))
+    setup = np.random.default_rng(setup_seq)
+    n_teams = n_teams or default_team_count(n_rows)
+    teams = _team_names(n_teams)
+    strength = setup.normal(0.0, 0.45, n_teams)
+    years = _sorted_years(n_rows, setup)
+    for i, seq in enumerate(chunk_seqs):
+        part = years[i * chunk_rows:(i + 1) * chunk_rows]
+        if len(part):
+            yield _chunk(part, teams, strength, dirty_frac, np.random.default_rng(seq))
+
+def generate_results(n_rows: int, seed: int = 0, **kwargs) -> pd.DataFrame:
+    """The whole synthetic dataset in memory (raw CSV schema: dates as strings, dirty rows included)."""
+    return pd.concat(list(iter_results(n_rows, seed, **kwargs)), ignore_index=True)
+
+def write_results_csv(path: Path | str, n_rows: int, seed: int = 0, **kwargs) -> Path:
+    """Stream the dataset to CSV chunk by chunk (bounded memory at 10M rows)."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        for i, chunk in enumerate(iter_results(n_rows, seed, **kwargs)):
+            chunk.to_csv(f, index=False, header=(i == 0), float_format="%.0f")
+    return path
+
+def main():
+    ap = argparse.ArgumentParser(description="Write a synthetic results.csv")
+    ap.add_argument("size", help="row count, e.g. 50k, 1M, 10M")
+    ap.add_argument("--out", type=Path, required=True)
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--dirty-frac", type=float, default=0.001)
+    args = ap.parse_args()
+    out = write_results_csv(args.out, parse_size(args.size), args.seed, dirty_frac=args.dirty_frac)
+    print(f"[SYNTH] Saved: {out}")
+
+if __name__ == "__main__":
+    main()
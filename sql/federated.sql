@@ -0,0 +1,42 @@
+-- name: dataset_overview
+SELECT dataset,
+       COUNT(*) AS matches,
+       MIN(date) AS first_match,
+       MAX(date) AS last_match,
+       ROUND(AVG(home_score + away_score), 2) AS goals_per_game,
+       ROUND(100.0 * SUM(home_score > away_score) / COUNT(*), 1) AS home_win_pct
+FROM all_matches
+GROUP BY dataset
+ORDER BY dataset;
+
+-- name: team_across_datasets
+SELECT dataset, team,
+       SUM(games) AS games,
+       SUM(w) AS w, SUM(d) AS d, SUM(l) AS l,
+       SUM(gf) AS gf, SUM(ga) AS ga,
+       ROUND(100.0 * SUM(w) / SUM(games), 1) AS win_pct
+FROM all_team_year_summary
+WHERE team = :team_name
+  AND year BETWEEN :year_from AND :year_to
+GROUP BY dataset, team
+ORDER BY dataset;
+
+-- name: goals_per_year_across_datasets
+SELECT dataset, year,
+       COUNT(*) AS matches,
+       ROUND(AVG(home_score + away_score), 2) AS goals_per_game
+FROM all_matches
+WHERE year BETWEEN :year_from AND :year_to
+GROUP BY dataset, year
+ORDER BY year, dataset;
+
+-- name: elo_top_across_datasets
+WITH ranked AS (
+  SELECT dataset, team, rating, last_match,
+         ROW_NUMBER() OVER (PARTITION BY dataset ORDER BY rating DESC, team ASC) AS rank
+  FROM all_elo_latest
+)
+SELECT dataset, rank, team, ROUND(rating, 1) AS rating, last_match
+FROM ranked
+WHERE rank <= :limit
+ORDER BY dataset, rank;
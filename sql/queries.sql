@@ -74,3 +74,245 @@ SELECT date, gd
 FROM tm
 ORDER BY date DESC
 LIMIT :limit;
+
+-- name: h2h_summary_years
+WITH pair_matches AS (
+  SELECT m.date, m.year, m.home_score AS gf, m.away_score AS ga
+  FROM matches m
+  JOIN teams ht ON m.home_team_id = ht.id
+  JOIN teams at ON m.away_team_id = at.id
+  WHERE ht.name = :team_a AND at.name = :team_b
+  UNION ALL
+  SELECT m.date, m.year, m.away_score, m.home_score
+  FROM matches m
+  JOIN teams ht ON m.home_team_id = ht.id
+  JOIN teams at ON m.away_team_id = at.id
+  WHERE at.name = :team_a AND ht.name = :team_b
+)
+SELECT :team_a AS team,
+       :team_b AS opponent,
+       COUNT(*) AS games,
+       COALESCE(SUM(CASE WHEN gf > ga THEN 1 ELSE 0 END), 0) AS w,
+       COALESCE(SUM(CASE WHEN gf = ga THEN 1 ELSE 0 END), 0) AS d,
+       COALESCE(SUM(CASE WHEN gf < ga THEN 1 ELSE 0 END), 0) AS l,
+       COALESCE(SUM(gf), 0) AS gf,
+       COALESCE(SUM(ga), 0) AS ga,
+       MAX(date) AS last_meeting_date
+FROM pair_matches
+WHERE year BETWEEN :year_from AND :year_to;
+
+-- name: h2h_year_counts
+WITH team_matches AS (
+  SELECT year, home_team_id AS team_id, away_team_id AS opponent_id,
+         home_score AS gf, away_score AS ga
+  FROM matches
+  UNION ALL
+  SELECT year, away_team_id, home_team_id,
+         away_score, home_score
+  FROM matches
+)
+SELECT ta.name AS team,
+       tb.name AS opponent,
+       tm.year,
+       COUNT(*) AS games,
+       SUM(CASE WHEN gf > ga THEN 1 ELSE 0 END) AS w,
+       SUM(CASE WHEN gf = ga THEN 1 ELSE 0 END) AS d,
+       SUM(CASE WHEN gf < ga THEN 1 ELSE 0 END) AS l,
+       SUM(gf) AS gf,
+       SUM(ga) AS ga
+FROM team_matches tm
+JOIN teams ta ON tm.team_id = ta.id
+JOIN teams tb ON tm.opponent_id = tb.id
+GROUP BY tm.team_id, tm.opponent_id, tm.year
+ORDER BY team, opponent, tm.year;
+
+-- name: team_year_kpis
+SELECT t.name AS team,
+       COALESCE(SUM(s.games), 0) AS games,
+       COALESCE(SUM(s.w), 0) AS w,
+       COALESCE(SUM(s.d), 0) AS d,
+       COALESCE(SUM(s.l), 0) AS l,
+       COALESCE(SUM(s.gf), 0) AS gf,
+       COALESCE(SUM(s.ga), 0) AS ga,
+       ROUND(100.0 * COALESCE(SUM(s.w), 0) / MAX(COALESCE(SUM(s.games), 0), 1), 1) AS win_pct,
+       COALESCE(SUM(s.home_games), 0) AS home_games,
+       COALESCE(SUM(s.home_w), 0) AS home_w,
+       COALESCE(SUM(s.away_games), 0) AS away_games,
+       COALESCE(SUM(s.away_w), 0) AS away_w
+FROM teams t
+LEFT JOIN team_year_summary s
+       ON s.team_id = t.id AND s.year BETWEEN :year_from AND :year_to
+WHERE t.name = :team_name
+GROUP BY t.id;
+
+-- name: team_year_breakdown
+SELECT s.year, s.games, s.w, s.d, s.l, s.gf, s.ga,
+       ROUND(100.0 * s.w / s.games, 1) AS win_pct,
+       s.home_games, s.home_w, s.home_d, s.home_l,
+       s.away_games, s.away_w, s.away_d, s.away_l
+FROM team_year_summary s
+JOIN teams t ON s.team_id = t.id
+WHERE t.name = :team_name
+  AND s.year BETWEEN :year_from AND :year_to
+ORDER BY s.year;
+
+-- name: team_year_leaderboard
+SELECT t.name AS team,
+       SUM(s.games) AS games,
+       SUM(s.w) AS w, SUM(s.d) AS d, SUM(s.l) AS l,
+       SUM(s.gf) AS gf, SUM(s.ga) AS ga,
+       SUM(s.gf) - SUM(s.ga) AS gd,
+       ROUND(100.0 * SUM(s.w) / SUM(s.games), 1) AS win_pct,
+       ROUND((SUM(s.w) + 0.5 * SUM(s.d)) / SUM(s.games), 3) AS points_per_game
+FROM team_year_summary s
+JOIN teams t ON s.team_id = t.id
+WHERE s.year BETWEEN :year_from AND :year_to
+GROUP BY s.team_id
+HAVING SUM(s.games) >= :min_games
+ORDER BY win_pct DESC, games DESC, team ASC
+LIMIT :limit;
+
+-- name: elo_team_trend
+SELECT h.date, h.rating
+FROM elo_history h
+JOIN teams t ON h.team_id = t.id
+WHERE t.name = :team_name
+  AND h.date BETWEEN :date_from AND :date_to
+ORDER BY h.date, h.seq;
+
+-- name: elo_leaderboard_as_of
+WITH latest AS (
+  SELECT t.name AS team,
+         (SELECT h.rating FROM elo_history h
+          WHERE h.team_id = t.id AND h.date <= :as_of
+          ORDER BY h.date DESC, h.seq DESC LIMIT 1) AS rating,
+         (SELECT MAX(h.date) FROM elo_history h
+          WHERE h.team_id = t.id AND h.date <= :as_of) AS last_match
+  FROM teams t
+)
+SELECT team, rating, last_match
+FROM latest
+WHERE rating IS NOT NULL
+ORDER BY rating DESC, team ASC
+LIMIT :limit;
+
+-- name: elo_rating_at_match
+SELECT h.date, h.rating_before, h.rating
+FROM elo_history h
+JOIN teams t ON h.team_id = t.id
+WHERE t.name = :team_name
+  AND h.date = :match_date
+ORDER BY h.seq;
+
+-- name: team_rolling_metrics
+WITH tm AS (
+  SELECT m.date, m.match_id, o.name AS opponent, m.is_home, m.gf, m.ga,
+         CASE WHEN m.gf > m.ga THEN 1.0 WHEN m.gf = m.ga THEN 0.5 ELSE 0.0 END AS points,
+         m.gf - m.ga AS gd,
+         CASE WHEN m.gf > m.ga THEN 1 ELSE 0 END AS win
+  FROM team_matches m
+  JOIN teams t ON m.team_id = t.id
+  JOIN teams o ON m.opponent_id = o.id
+  WHERE t.name = :team_name
+)
+SELECT date, opponent, is_home, gf, ga,
+       CASE WHEN gf > ga THEN 'W' WHEN gf = ga THEN 'D' ELSE 'L' END AS result,
+       points,
+       AVG(points) OVER w AS rolling_form,
+       gd,
+       AVG(gd) OVER w AS rolling_gd,
+       win,
+       100.0 * AVG(win) OVER w AS rolling_win_pct
+FROM tm
+WINDOW w AS (ORDER BY date, match_id ROWS BETWEEN :window - 1 PRECEDING AND CURRENT ROW)
+ORDER BY date, match_id;
+
+-- name: team_rolling_metrics_days
+-- Time window (date - :days, date]; matches on the same date share one value.
+WITH tm AS (
+  SELECT m.date, m.match_id, o.name AS opponent, m.is_home, m.gf, m.ga,
+         CASE WHEN m.gf > m.ga THEN 1.0 WHEN m.gf = m.ga THEN 0.5 ELSE 0.0 END AS points,
+         m.gf - m.ga AS gd,
+         CASE WHEN m.gf > m.ga THEN 1 ELSE 0 END AS win
+  FROM team_matches m
+  JOIN teams t ON m.team_id = t.id
+  JOIN teams o ON m.opponent_id = o.id
+  WHERE t.name = :team_name
+)
+SELECT date, opponent, is_home, gf, ga,
+       CASE WHEN gf > ga THEN 'W' WHEN gf = ga THEN 'D' ELSE 'L' END AS result,
+       points,
+       AVG(points) OVER w AS rolling_form,
+       gd,
+       AVG(gd) OVER w AS rolling_gd,
+       win,
+       100.0 * AVG(win) OVER w AS rolling_win_pct
+FROM tm
+WINDOW w AS (ORDER BY julianday(date) RANGE BETWEEN :days - 1 PRECEDING AND CURRENT ROW)
+ORDER BY date, match_id;
+
+-- name: all_teams_rolling_metrics
+-- Windows run over each team's full history; the date filter applies after.
+WITH rolled AS (
+  SELECT m.team_id, m.date, m.match_id, m.opponent_id, m.gf, m.ga,
+         AVG(CASE WHEN m.gf > m.ga THEN 1.0 WHEN m.gf = m.ga THEN 0.5 ELSE 0.0 END) OVER w AS rolling_form,
+         AVG(m.gf - m.ga) OVER w AS rolling_gd,
+         100.0 * AVG(CASE WHEN m.gf > m.ga THEN 1 ELSE 0 END) OVER w AS rolling_win_pct
+  FROM team_matches m
+  WINDOW w AS (PARTITION BY m.team_id ORDER BY m.date, m.match_id
+               ROWS BETWEEN :window - 1 PRECEDING AND CURRENT ROW)
+)
+SELECT t.name AS team, r.date, o.name AS opponent, r.gf, r.ga,
+       r.rolling_form, r.rolling_gd, r.rolling_win_pct
+FROM rolled r
+JOIN teams t ON r.team_id = t.id
+JOIN teams o ON r.opponent_id = o.id
+WHERE r.date BETWEEN :date_from AND :date_to
+ORDER BY team, r.date, r.match_id;
+
+-- name: all_teams_current_form
+-- Latest rolling values per team (last :window matches up to :as_of).
+WITH rolled AS (
+  SELECT m.team_id, m.date,
+         COUNT(*) OVER w AS games,
+         AVG(CASE WHEN m.gf > m.ga THEN 1.0 WHEN m.gf = m.ga THEN 0.5 ELSE 0.0 END) OVER w AS rolling_form,
+         AVG(m.gf - m.ga) OVER w AS rolling_gd,
+         100.0 * AVG(CASE WHEN m.gf > m.ga THEN 1 ELSE 0 END) OVER w AS rolling_win_pct,
+         ROW_NUMBER() OVER (PARTITION BY m.team_id ORDER BY m.date DESC, m.match_id DESC) AS rn
+  FROM team_matches m
+  WHERE m.date <= :as_of
+  WINDOW w AS (PARTITION BY m.team_id ORDER BY m.date, m.match_id
+               ROWS BETWEEN :window - 1 PRECEDING AND CURRENT ROW)
+)
+SELECT t.name AS team, r.date AS last_match, r.games,
+       ROUND(r.rolling_form, 3) AS rolling_form,
+       ROUND(r.rolling_gd, 2) AS rolling_gd,
+       ROUND(r.rolling_win_pct, 1) AS rolling_win_pct
+FROM rolled r
+JOIN teams t ON r.team_id = t.id
+WHERE r.rn = 1 AND r.games >= :window
+ORDER BY rolling_form DESC, rolling_gd DESC, team ASC
+LIMIT :limit;
+
+-- name: team_match_history
+-- Keyset-paged (run_query_paged): the :page_size rows after (:after_date, :after_id).
+SELECT m.date, m.match_id AS id, o.name AS opponent, m.is_home, m.gf, m.ga,
+       CASE WHEN m.gf > m.ga THEN 'W' WHEN m.gf = m.ga THEN 'D' ELSE 'L' END AS result
+FROM team_matches m
+JOIN teams t ON m.team_id = t.id
+JOIN teams o ON m.opponent_id = o.id
+WHERE t.name = :team_name
+  AND (m.date, m.match_id) > (:after_date, :after_id)
+ORDER BY m.date, m.match_id
+LIMIT :page_size;
+
+-- name: match_history
+-- Keyset-paged (run_query_paged): the :page_size rows after (:after_date, :after_id).
+SELECT m.date, m.id, ht.name AS home_team, at.name AS away_team, m.home_score, m.away_score
+FROM matches m
+JOIN teams ht ON m.home_team_id = ht.id
+JOIN teams at ON m.away_team_id = at.id
+WHERE m.date >= MAX(:date_from, :after_date) AND m.date <= :date_to
+  AND (m.date, m.id) > (:after_date, :after_id)
+ORDER BY m.date, m.id
+LIMIT :page_size;
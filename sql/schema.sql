@@ -1,5 +1,8 @@
 PRAGMA foreign_keys = ON;
 
+DROP TABLE IF EXISTS elo_history;
+DROP TABLE IF EXISTS team_matches;
+DROP TABLE IF EXISTS team_year_summary;
 DROP TABLE IF EXISTS h2h_summary;
 DROP TABLE IF EXISTS matches;
 DROP TABLE IF EXISTS teams;
@@ -36,6 +39,183 @@ CREATE TABLE h2h_summary (
   FOREIGN KEY(opponent_id) REFERENCES teams(id)
 );
 
+-- Per team and calendar year rollup, kept current by the triggers below.
+CREATE TABLE team_year_summary (
+  team_id     INTEGER NOT NULL,
+  year        INTEGER NOT NULL,
+  games       INTEGER NOT NULL DEFAULT 0,
+  w           INTEGER NOT NULL DEFAULT 0,
+  d           INTEGER NOT NULL DEFAULT 0,
+  l           INTEGER NOT NULL DEFAULT 0,
+  gf          INTEGER NOT NULL DEFAULT 0,
+  ga          INTEGER NOT NULL DEFAULT 0,
+  home_games  INTEGER NOT NULL DEFAULT 0,
+  home_w      INTEGER NOT NULL DEFAULT 0,
+  home_d      INTEGER NOT NULL DEFAULT 0,
+  home_l      INTEGER NOT NULL DEFAULT 0,
+  away_games  INTEGER NOT NULL DEFAULT 0,
+  away_w      INTEGER NOT NULL DEFAULT 0,
+  away_d      INTEGER NOT NULL DEFAULT 0,
+  away_l      INTEGER NOT NULL DEFAULT 0,
+  PRIMARY KEY(team_id, year),
+  FOREIGN KEY(team_id) REFERENCES teams(id)
+);
+
+-- One row per team per match, kept current by the triggers below. The
+-- clustered key serves PARTITION BY team_id ORDER BY date, match_id windows.
+CREATE TABLE team_matches (
+  team_id      INTEGER NOT NULL,
+  date         TEXT NOT NULL,     -- ISO date (YYYY-MM-DD)
+  match_id     INTEGER NOT NULL,
+  year         INTEGER NOT NULL,
+  opponent_id  INTEGER NOT NULL,
+  is_home      INTEGER NOT NULL,
+  gf           INTEGER NOT NULL,
+  ga           INTEGER NOT NULL,
+  PRIMARY KEY(team_id, date, match_id),
+  FOREIGN KEY(team_id) REFERENCES teams(id),
+  FOREIGN KEY(match_id) REFERENCES matches(id)
+) WITHOUT ROWID;
+
+-- Point-in-time Elo: one row per team per match, written by save_elo_history().
+CREATE TABLE elo_history (
+  team_id        INTEGER NOT NULL,
+  seq            INTEGER NOT NULL,  -- match processing order
+  date           TEXT NOT NULL,     -- ISO date (YYYY-MM-DD)
+  rating_before  REAL NOT NULL,
+  rating         REAL NOT NULL,     -- post-match rating
+  PRIMARY KEY(team_id, seq),
+  FOREIGN KEY(team_id) REFERENCES teams(id)
+) WITHOUT ROWID;
+
 CREATE INDEX idx_matches_date ON matches(date);
 CREATE INDEX idx_matches_home ON matches(home_team_id);
 CREATE INDEX idx_matches_away ON matches(away_team_id);
+CREATE INDEX idx_team_year_summary_year ON team_year_summary(year);
+CREATE INDEX idx_elo_history_team_date ON elo_history(team_id, date, seq);
+
+-- Incremental maintenance of team_year_summary: every inserted match adds one
+-- home row and one away row, every deleted match subtracts them again and an
+-- updated match subtracts its OLD values before adding its NEW ones.
+CREATE TRIGGER trg_matches_insert_team_year AFTER INSERT ON matches
+BEGIN
+  INSERT INTO team_year_summary(team_id, year, games, w, d, l, gf, ga,
+                                home_games, home_w, home_d, home_l)
+  VALUES (NEW.home_team_id, NEW.year, 1,
+          NEW.home_score > NEW.away_score, NEW.home_score = NEW.away_score, NEW.home_score < NEW.away_score,
+          NEW.home_score, NEW.away_score,
+          1, NEW.home_score > NEW.away_score, NEW.home_score = NEW.away_score, NEW.home_score < NEW.away_score)
+  ON CONFLICT(team_id, year) DO UPDATE SET
+    games = games + 1, w = w + excluded.w, d = d + excluded.d, l = l + excluded.l,
+    gf = gf + excluded.gf, ga = ga + excluded.ga,
+    home_games = home_games + 1, home_w = home_w + excluded.home_w,
+    home_d = home_d + excluded.home_d, home_l = home_l + excluded.home_l;
+
+  INSERT INTO team_year_summary(team_id, year, games, w, d, l, gf, ga,
+                                away_games, away_w, away_d, away_l)
+  VALUES (NEW.away_team_id, NEW.year, 1,
+          NEW.away_score > NEW.home_score, NEW.away_score = NEW.home_score, NEW.away_score < NEW.home_score,
+          NEW.away_score, NEW.home_score,
+          1, NEW.away_score > NEW.home_score, NEW.away_score = NEW.home_score, NEW.away_score < NEW.home_score)
+  ON CONFLICT(team_id, year) DO UPDATE SET
+    games = games + 1, w = w + excluded.w, d = d + excluded.d, l = l + excluded.l,
+    gf = gf + excluded.gf, ga = ga + excluded.ga,
+    away_games = away_games + 1, away_w = away_w + excluded.away_w,
+    away_d = away_d + excluded.away_d, away_l = away_l + excluded.away_l;
+END;
+
+CREATE TRIGGER trg_matches_insert_team_matches AFTER INSERT ON matches
+BEGIN
+  INSERT INTO team_matches(team_id, date, match_id, year, opponent_id, is_home, gf, ga)
+  VALUES (NEW.home_team_id, NEW.date, NEW.id, NEW.year, NEW.away_team_id, 1, NEW.home_score, NEW.away_score),
+         (NEW.away_team_id, NEW.date, NEW.id, NEW.year, NEW.home_team_id, 0, NEW.away_score, NEW.home_score);
+END;
+
+CREATE TRIGGER trg_matches_delete_team_matches AFTER DELETE ON matches
+BEGIN
+  DELETE FROM team_matches
+  WHERE team_id IN (OLD.home_team_id, OLD.away_team_id) AND date = OLD.date AND match_id = OLD.id;
+END;
+
+CREATE TRIGGER trg_matches_update_team_matches AFTER UPDATE ON matches
+BEGIN
+  DELETE FROM team_matches
+  WHERE team_id IN (OLD.home_team_id, OLD.away_team_id) AND date = OLD.date AND match_id = OLD.id;
+  INSERT INTO team_matches(team_id, date, match_id, year, opponent_id, is_home, gf, ga)
+  VALUES (NEW.home_team_id, NEW.date, NEW.id, NEW.year, NEW.away_team_id, 1, NEW.home_score, NEW.away_score),
+         (NEW.away_team_id, NEW.date, NEW.id, NEW.year, NEW.home_team_id, 0, NEW.away_score, NEW.home_score);
+END;
+
+CREATE TRIGGER trg_matches_delete_team_year AFTER DELETE ON matches
+BEGIN
+  UPDATE team_year_summary SET
+    games = games - 1,
+    w = w - (OLD.home_score > OLD.away_score), d = d - (OLD.home_score = OLD.away_score),
+    l = l - (OLD.home_score < OLD.away_score),
+    gf = gf - OLD.home_score, ga = ga - OLD.away_score,
+    home_games = home_games - 1,
+    home_w = home_w - (OLD.home_score > OLD.away_score), home_d = home_d - (OLD.home_score = OLD.away_score),
+    home_l = home_l - (OLD.home_score < OLD.away_score)
+  WHERE team_id = OLD.home_team_id AND year = OLD.year;
+
+  UPDATE team_year_summary SET
+    games = games - 1,
+    w = w - (OLD.away_score > OLD.home_score), d = d - (OLD.away_score = OLD.home_score),
+    l = l - (OLD.away_score < OLD.home_score),
+    gf = gf - OLD.away_score, ga = ga - OLD.home_score,
+    away_games = away_games - 1,
+    away_w = away_w - (OLD.away_score > OLD.home_score), away_d = away_d - (OLD.away_score = OLD.home_score),
+    away_l = away_l - (OLD.away_score < OLD.home_score)
+  WHERE team_id = OLD.away_team_id AND year = OLD.year;
+
+  DELETE FROM team_year_summary WHERE games = 0 AND team_id IN (OLD.home_team_id, OLD.away_team_id);
+END;
+
+CREATE TRIGGER trg_matches_update_team_year AFTER UPDATE ON matches
+BEGIN
+  UPDATE team_year_summary SET
+    games = games - 1,
+    w = w - (OLD.home_score > OLD.away_score), d = d - (OLD.home_score = OLD.away_score),
+    l = l - (OLD.home_score < OLD.away_score),
+    gf = gf - OLD.home_score, ga = ga - OLD.away_score,
+    home_games = home_games - 1,
+    home_w = home_w - (OLD.home_score > OLD.away_score), home_d = home_d - (OLD.home_score = OLD.away_score),
+    home_l = home_l - (OLD.home_score < OLD.away_score)
+  WHERE team_id = OLD.home_team_id AND year = OLD.year;
+
+  UPDATE team_year_summary SET
+    games = games - 1,
+    w = w - (OLD.away_score > OLD.home_score), d = d - (OLD.away_score = OLD.home_score),
+    l = l - (OLD.away_score < OLD.home_score),
+    gf = gf - OLD.away_score, ga = ga - OLD.home_score,
+    away_games = away_games - 1,
+    away_w = away_w - (OLD.away_score > OLD.home_score), away_d = away_d - (OLD.away_score = OLD.home_score),
+    away_l = away_l - (OLD.away_score < OLD.home_score)
+  WHERE team_id = OLD.away_team_id AND year = OLD.year;
+
+  DELETE FROM team_year_summary WHERE games = 0 AND team_id IN (OLD.home_team_id, OLD.away_team_id);
+
+  INSERT INTO team_year_summary(team_id, year, games, w, d, l, gf, ga,
+                                home_games, home_w, home_d, home_l)
+  VALUES (NEW.home_team_id, NEW.year, 1,
+          NEW.home_score > NEW.away_score, NEW.home_score = NEW.away_score, NEW.home_score < NEW.away_score,
+          NEW.home_score, NEW.away_score,
+          1, NEW.home_score > NEW.away_score, NEW.home_score = NEW.away_score, NEW.home_score < NEW.away_score)
+  ON CONFLICT(team_id, year) DO UPDATE SET
+    games = games + 1, w = w + excluded.w, d = d + excluded.d, l = l + excluded.l,
+    gf = gf + excluded.gf, ga = ga + excluded.ga,
+    home_games = home_games + 1, home_w = home_w + excluded.home_w,
+    home_d = home_d + excluded.home_d, home_l = home_l + excluded.home_l;
+
+  INSERT INTO team_year_summary(team_id, year, games, w, d, l, gf, ga,
+                                away_games, away_w, away_d, away_l)
+  VALUES (NEW.away_team_id, NEW.year, 1,
+          NEW.away_score > NEW.home_score, NEW.away_score = NEW.home_score, NEW.away_score < NEW.home_score,
+          NEW.away_score, NEW.home_score,
+          1, NEW.away_score > NEW.home_score, NEW.away_score = NEW.home_score, NEW.away_score < NEW.home_score)
+  ON CONFLICT(team_id, year) DO UPDATE SET
+    games = games + 1, w = w + excluded.w, d = d + excluded.d, l = l + excluded.l,
+    gf = gf + excluded.gf, ga = ga + excluded.ga,
+    away_games = away_games + 1, away_w = away_w + excluded.away_w,
+    away_d = away_d + excluded.away_d, away_l = away_l + excluded.away_l;
+END;
@@ -0,0 +1,389 @@
+# src/api.py
+# Headless JSON API over src.metrics and src.sql_io: a stdlib asyncio
+# HTTP/1.1 server (GET/HEAD, keep-alive). Rendered responses live in an
+# in-process LRU keyed by (dataset version, path, sorted query). The ETag
+# is derived from that same key, so a matching If-None-Match is answered
+# with 304 before any pandas work, and a CSV or database change moves every
+# ETag at once.
+#
+#   python -m src.api --port 8080                 (--dataset <name> for another league)
+#   curl -i localhost:8080/teams/Brazil/kpis?year_from=2000
+#
+# GET /health                                  version, cache stats
+# GET /teams
+# GET /teams/{team}/kpis?year_from&year_to     or ?date_from&date_to
+# GET /h2h/{team}/{opponent}?year_from&year_to
+# GET /standings?tournament&year_from&year_to&limit
+# GET /elo/leaderboard?as_of&limit
+# GET /elo/{team}?date_from&date_to           Elo trend
+# GET /queries
+# GET /queries/{name}?<query params>           paged queries: &after_date&after_id&page_size
+
+from __future__ import annotations
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Tuple
+from urllib.parse import parse_qsl, unquote, urlencode
+import numpy as np
+import pandas as pd
+from src.datasets import DEFAULT_DATASET, get_dataset
+from src.incremental import LiveResults, Snapshot
+from src.metrics import (
+    kpis_in_years, kpis_in_range, H2HCube, build_h2h_cube, h2h_lookup, standings, elo_trend, elo_leaderboard_as_of,
+)
+from src.perf import count
+from src.sql_io import (
+    DEFAULT_DB_PATH, database_version, get_query_names, run_query, run_query_paged, is_paged_query,
+    configure_read_mode, READ_MODES,
+)
+
+REASONS = {200: "OK", 304: "Not Modified", 400: "Bad Request", 404: "Not Found",
+           405: "Method Not Allowed", 500: "Internal Server Error", 503: "Service Unavailable"}
+
+class ApiError(Exception):
+    def __init__(self, status: int, message: str) -> None:
+        super().__init__(message)
+        self.status = status
+
+class Dataset:
+    """
+    The results snapshot (see src.incremental) and the indexes built from it.
+    The version follows the CSV and database files (checked at most every
+    check_interval seconds); matches appended to the CSV are folded into the
+    snapshot rather than reloading it. (version, snapshot) is swapped as one
+    tuple, so a request that captured it never mixes two snapshots.
+    """
+    def __init__(self, csv_path: str | os.PathLike | None = None, db_path: Path | str = DEFAULT_DB_PATH,
+                 check_interval: float = 1.0) -> None:
+        self.live = LiveResults(csv_path)
+        self.csv_path = self.live.path
+        self.db_path = Path(db_path)
+        self.check_interval = check_interval
+        self.state: Tuple[str, Snapshot] = ("", self.live.snapshot)
+        self._checked = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def snapshot(self) -> Snapshot:
+        return self.state[1]
+
+    def due(self) -> bool:
+        return not self.state[0] or time.monotonic() - self._checked >= self.check_interval
+
+    def current(self) -> Tuple[str, Snapshot]:
+        """(version, snapshot), refreshed first when a check is due. Blocks
+        for a CSV reload: call it off the event loop when due() is true."""
+        if not self.due():
+            return self.state
+        if not self._lock.acquire(blocking=False):
+            # another thread is refreshing; keep serving the last snapshot
+            if self.state[0]:
+                return self.state
+            self._lock.acquire()
+        try:
+            if self.due():
+                snapshot = self.live.refresh()
+                raw = f"{snapshot.source.sha1}|{database_version(self.db_path)}"
+                self.state = (hashlib.sha1(raw.encode()).hexdigest()[:12], snapshot)
+                self._checked = time.monotonic()
+            return self.state
+        finally:
+            self._lock.release()
+
+    def version(self) -> str:
+        return self.current()[0]
+
+def _h2h_cube(snapshot: Snapshot) -> H2HCube:
+    return snapshot.cached("h2h_cube", lambda: build_h2h_cube(snapshot.ingested.results))
+
+class ResponseCache:
+    """LRU of rendered response bodies."""
+    def __init__(self, max_entries: int = 4096) -> None:
+        self.max_entries = max_entries
+        self._items: "OrderedDict[Tuple[str, str], bytes]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Tuple[str, str]) -> bytes | None:
+        with self._lock:
+            body = self._items.get(key)
+            if body is None:
+                self.misses += 1
+                return None
+            self._items.move_to_end(key)
+            self.hits += 1
+            return body
+
+    def put(self, key: Tuple[str, str], body: bytes) -> None:
+        with self._lock:
+            self._items[key] = body
+            self._items.move_to_end(key)
+            while len(self._items) > self.max_entries:
+                self._items.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+def _json_default(obj):
+    if isinstance(obj, np.integer):
+        return int(obj)
+    if isinstance(obj, np.floating):
+        return None if np.isnan(obj) else float(obj)
+    if isinstance(obj, (pd.Timestamp, np.datetime64)):
+        return pd.Timestamp(obj).strftime("%Y-%m-%d")
+    return str(obj)
+
+def _records(df: pd.DataFrame) -> list:
+    out = df.copy()
+    for c in out.columns:
+        if pd.api.types.is_datetime64_any_dtype(out[c]):
+            out[c] = out[c].dt.strftime("%Y-%m-%d")
+    return out.astype(object).where(out.notna(), None).to_dict("records")
+
+def _int(query: Dict[str, str], name: str, default: int | None = None) -> int | None:
+    if name not in query or query[name] == "":
+        return default
+    try:
+        return int(query[name])
+    except ValueError:
+        raise ApiError(400, f"{name} must be an integer") from None
+
+def _limit(query: Dict[str, str], name: str, default: int) -> int:
+    value = _int(query, name, default)
+    if value < 1:
+        raise ApiError(400, f"{name} must be at least 1")
+    return value
+
+def _date(query: Dict[str, str], name: str) -> pd.Timestamp | None:
+    if name not in query or query[name] == "":
+        return None
+    try:
+        ts = pd.Timestamp(query[name])
+    except ValueError:
+        ts = pd.NaT
+    if pd.isna(ts):
+        raise ApiError(400, f"{name} must be a date (YYYY-MM-DD)")
+    return ts
+
+def _query_param(value: str):
+    # named-query parameters arrive as strings; whole numbers are bound as ints
+    return int(value) if re.fullmatch(r"-?\d+", value) else value
+
+class ApiServer:
+    def __init__(self, dataset: Dataset, cache_entries: int = 4096) -> None:
+        self.dataset = dataset
+        self.cache = ResponseCache(cache_entries)
+        self._routes = [
+            (re.compile(r"/health"), self._health),
+            (re.compile(r"/teams"), self._teams),
+            (re.compile(r"/teams/([^/]+)/kpis"), self._team_kpis),
+            (re.compile(r"/h2h/([^/]+)/([^/]+)"), self._h2h),
+            (re.compile(r"/standings"), self._standings),
+            (re.compile(r"/elo/leaderboard"), self._elo_leaderboard),
+            (re.compile(r"/elo/([^/]+)"), self._elo_trend),
+            (re.compile(r"/queries"), self._query_names),
+            (re.compile(r"/queries/([^/]+)"), self._named_query),
+        ]
+
+    # handlers: (snapshot, query, path arguments) -> JSON-serializable object
+    def _health(self, snap, query):
+        return {"status": "ok", "version": self.dataset.state[0], "cached": len(self.cache),
+                "hits": self.cache.hits, "misses": self.cache.misses}
+
+    def _teams(self, snap, query):
+        return {"teams": sorted(snap.kpi_index.teams)}
+
+    @staticmethod
+    def _known_team(snap: Snapshot, team: str) -> str:
+        if team not in snap.kpi_index.teams:
+            raise ApiError(404, f"Unknown team: {team}")
+        return team
+
+    def _team_kpis(self, snap, query, team):
+        team = self._known_team(snap, team)
+        if "date_from" in query or "date_to" in query:
+            k = kpis_in_range(snap.kpi_index, team, _date(query, "date_from"), _date(query, "date_to"))
+        else:
+            k = kpis_in_years(snap.kpi_index, team, _int(query, "year_from"), _int(query, "year_to"))
+        return {"team": team, **k}
+
+    def _h2h(self, snap, query, team, opponent):
+        team, opponent = self._known_team(snap, team), self._known_team(snap, opponent)
+        k = h2h_lookup(_h2h_cube(snap), team, opponent, _int(query, "year_from"), _int(query, "year_to"))
+        return {"team": team, "opponent": opponent, **k}
+
+    def _standings(self, snap, query):
+        results = snap.ingested.results
+        first, last = _int(query, "year_from"), _int(query, "year_to")
+        years = None
+        if first is not None or last is not None:
+            # a missing bound is open-ended, as in kpis_in_years
+            first = int(results["year"].min()) if first is None else first
+            last = int(results["year"].max()) if last is None else last
+            if first > last:
+                raise ApiError(400, "year_from must not be after year_to")
+            years = list(range(first, last + 1))
+        table = standings(results, tournament=query.get("tournament") or None, years=years)
+        return {"rows": _records(table.head(_limit(query, "limit", 50)))}
+
+    def _elo_leaderboard(self, snap, query):
+        as_of = _date(query, "as_of")
+        as_of = snap.ingested.results["date"].max() if as_of is None else as_of
+        board = elo_leaderboard_as_of(snap.elo_store, as_of, top=_limit(query, "limit", 20))
+        return {"as_of": _json_default(pd.Timestamp(as_of)), "rows": _records(board)}
+
+    def _elo_trend(self, snap, query, team):
+        team = self._known_team(snap, team)
+        trend = elo_trend(snap.elo_store, team, _date(query, "date_from"), _date(query, "date_to"))
+        return {"team": team, "rows": _records(trend)}
+
+    def _query_names(self, snap, query):
+        return {"queries": get_query_names()}
+
+    def _named_query(self, snap, query, name):
+        if name not in get_query_names():
+            raise ApiError(404, f"Unknown query: {name}")
+        if not self.dataset.db_path.exists():
+            raise ApiError(503, f"Database not found: {self.dataset.db_path}")
+        params = {k: _query_param(v) for k, v in query.items()}
+        if is_paged_query(name):
+            for k in ("after_date", "after_id", "page_size"):
+                params.pop(k, None)
+            after_date, after_id = query.get("after_date"), _int(query, "after_id")
+            after = (after_date, after_id) if after_date is not None and after_id is not None else None
+            page_size = _limit(query, "page_size", 500)
+            page = run_query_paged(name, params, page_size, after, self.dataset.db_path)
+            return {"query": name, "rows": _records(page.rows), "next_after": page.next_after}
+        return {"query": name, "rows": _records(run_query(name, params, self.dataset.db_path))}
+
+    def render(self, path: str, query: Dict[str, str], snapshot: Snapshot | None = None) -> Tuple[int, bytes]:
+        snapshot = self.dataset.snapshot if snapshot is None else snapshot
+        for pattern, handler in self._routes:
+            m = pattern.fullmatch(path)
+            if m:
+                try:
+                    obj = handler(snapshot, query, *(unquote(g) for g in m.groups()))
+                    status = 200
+                except ApiError as e:
+                    status, obj = e.status, {"error": str(e)}
+                except (sqlite3.Error, pd.errors.DatabaseError) as e:
+                    status, obj = 400, {"error": str(e)}
+                except Exception as e:
+                    status, obj = 500, {"error": f"{type(e).__name__}: {e}"}
+                return status, json.dumps(obj, default=_json_default, ensure_ascii=False).encode("utf-8")
+        return 404, json.dumps({"error": f"No route for {path}"}).encode("utf-8")
+
+    async def respond(self, method: str, target: str, headers: Dict[str, str]) -> Tuple[int, Dict[str, str], bytes]:
+        if method not in ("GET", "HEAD"):
+            return 405, {"Allow": "GET, HEAD"}, b'{"error": "method not allowed"}'
+        path, _, qs = target.partition("?")
+        path = path.rstrip("/") or "/"
+        query = dict(parse_qsl(qs, keep_blank_values=True))
+        # one (version, snapshot) per request; a due refresh (possibly a full
+        # CSV reload) runs off the event loop
+        if self.dataset.due():
+            version, snapshot = await asyncio.to_thread(self.dataset.current)
+        else:
+            version, snapshot = self.dataset.state
+        if path == "/health":
+            status, body = self.render(path, query, snapshot)
+            return status, {"Cache-Control": "no-store"}, body
+        key = path + "?" + urlencode(sorted(query.items()))
+        etag = '"' + hashlib.sha1(f"{version}|{key}".encode("utf-8")).hexdigest()[:20] + '"'
+        out_headers = {"ETag": etag, "Cache-Control": "no-cache"}
+
+        if etag in (t.strip() for t in headers.get("if-none-match", "").split(",")):
+            count("api.not_modified")
+            return 304, out_headers, b""
+        body = self.cache.get((version, key))
+        if body is None:
+            # cache misses run off the event loop so cached responses keep flowing
+            status, body = await asyncio.to_thread(self.render, path, query, snapshot)
+            if status != 200:
+                return status, {}, body
+            self.cache.put((version, key), body)
+        count("api.responses")
+        return 200, out_headers, body
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                try:
+                    method, target, http_version = line.decode("latin-1").split()
+                except ValueError:
+                    break
+                headers: Dict[str, str] = {}
+                while True:
+                    h = await reader.readline()
+                    if h in (b"\r\n", b"\n", b""):
+                        break
+                    k, _, v = h.decode("latin-1").partition(":")
+                    headers[k.strip().lower()] = v.strip()
+                if headers.get("content-length"):
+                    await reader.readexactly(int(headers["content-length"]))
+
+                status, extra, body = await self.respond(method, target, headers)
+                keep_alive = http_version == "HTTP/1.1" and headers.get("connection", "").lower() != "close"
+                head = [f"HTTP/1.1 {status} {REASONS.get(status, '')}",
+                        "Content-Type: application/json; charset=utf-8",
+                        f"Content-Length: {len(body)}",
+                        f"Connection: {'keep-alive' if keep_alive else 'close'}"]
+                head += [f"{k}: {v}" for k, v in extra.items()]
+                writer.write(("\r\n".join(head) + "\r\n\r\n").encode("latin-1"))
+                if method != "HEAD":
+                    writer.write(body)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self, host: str = "127.0.0.1", port: int = 8080) -> asyncio.Server:
+        return await asyncio.start_server(self.handle, host, port)
+
+def main():
+    ap = argparse.ArgumentParser(description="JSON API over the results dataset")
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=8080)
+    ap.add_argument("--dataset", default=DEFAULT_DATASET, help="dataset to serve (see src.datasets)")
+    ap.add_argument("--csv", default=None, help="results CSV (default: the dataset's)")
+    ap.add_argument("--db", type=Path, default=None, help="database (default: the dataset's)")
+    ap.add_argument("--read-mode", choices=READ_MODES, default="memory", help="how named queries read the DB")
+    ap.add_argument("--cache-entries", type=int, default=4096)
+    ap.add_argument("--no-warm", action="store_true", help="build the H2H cube on first request instead")
+    args = ap.parse_args()
+
+    configure_read_mode(args.read_mode)
+    spec = get_dataset(args.dataset)
+    dataset = Dataset(args.csv or spec.csv_path, args.db or spec.db_path)
+    if not args.no_warm:
+        _h2h_cube(dataset.current()[1])
+    api = ApiServer(dataset, args.cache_entries)
+
+    async def run():
+        server = await api.serve(args.host, args.port)
+        print(f"[API] Serving on http://{args.host}:{server.sockets[0].getsockname()[1]}")
+        async with server:
+            await server.serve_forever()
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,195 @@
+# src/artifacts.py
+# Warm-start bundle: everything the app, the API and the CLIs would compute
+# from results.csv on a cold start, built ahead of time (e.g. at image build)
+# by `python -m src.etl --build-artifacts` and loaded instead of recomputed.
+#
+# artifacts/
+#   CURRENT                 version of the active bundle
+#   <format>-<csv sha1>/    manifest.json, one pickle per artifact, app.db
+#
+# A bundle is used only when its format, pandas/numpy versions and the SHA-1
+# of the CSV all match; anything else falls back to computing from scratch.
+
+from __future__ import annotations
+import hashlib
+import json
+import os
+import pickle
+import platform
+import shutil
+import sqlite3
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict
+import numpy as np
+import pandas as pd
+from src.data_io import ingest_results, resolve_results_path
+from src.metrics import (
+    build_kpi_index, build_h2h_cube, build_rolling_tables, team_match_table, streaks_table, team_records,
+    compute_elo, build_elo_store, match_expectations, fit_goal_model,
+)
+from src.perf import timed
+from src.ratings import compute_ratings
+from src.sql_io import DEFAULT_DB_PATH, rebuild_db
+
+BUNDLE_FORMAT = 1  # bump when a pickled structure changes shape
+ARTIFACTS_DIR = Path(os.environ.get("RESULTS_ARTIFACTS_DIR", "artifacts"))
+GOAL_MODEL_HALF_LIFE = 4.0  # the app's default half-life
+
+@dataclass(frozen=True)
+class Bundle:
+    path: Path
+    manifest: dict
+
+    @property
+    def version(self) -> str:
+        return self.manifest["version"]
+
+    @property
+    def db_path(self) -> Path:
+        return self.path / "app.db"
+
+    def has(self, name: str) -> bool:
+        return name in self.manifest["artifacts"]
+
+    @timed("artifacts.load")
+    def load(self, name: str):
+        with open(self.path / f"{name}.pkl", "rb") as f:
+            return pickle.load(f)
+
+def goal_model_artifact(half_life_years: float | None) -> str:
+    return f"goal_model_{float(half_life_years or 0):g}"
+
+def csv_sha1(csv_path: str | os.PathLike | None = None) -> str:
+    h = hashlib.sha1()
+    with open(resolve_results_path(csv_path), "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+def _runtime() -> Dict[str, str]:
+    return {"python": platform.python_version(), "pandas": pd.__version__, "numpy": np.__version__}
+
+def _builders(ingested) -> Dict[str, Callable[[], object]]:
+    df = ingested.results
+    cache: Dict[str, object] = {}
+
+    def elo():
+        if "elo" not in cache:
+            cache["elo"] = compute_elo(df)
+        return cache["elo"]
+
+    def streaks_records():
+        tm = team_match_table(df)
+        return streaks_table(df, tm), team_records(df, tm)
+
+    return {
+        "ingested": lambda: ingested,
+        "kpi_index": lambda: build_kpi_index(df),
+        "h2h_cube": lambda: build_h2h_cube(df),
+        "rolling_tables": lambda: build_rolling_tables(df),
+        "streaks_records": streaks_records,
+        "elo": elo,
+        "elo_store": lambda: build_elo_store(elo()[0]),
+        "match_expectations": lambda: match_expectations(df, elo()[0]),
+        "ratings": lambda: compute_ratings(df),
+        goal_model_artifact(GOAL_MODEL_HALF_LIFE): lambda: fit_goal_model(df, half_life_years=GOAL_MODEL_HALF_LIFE),
+    }
+
+@timed
+def build_bundle(csv_path: str | os.PathLike | None = None, root: Path | str = ARTIFACTS_DIR,
+                 keep: int = 2, log: Callable[[str], None] = lambda msg: None) -> Bundle:
+    """
+    Build every artifact plus a populated app.db into root/<version>/, then
+    point root/CURRENT at it. Readers see either the old or the new bundle:
+    the directory is renamed into place complete. Keeps the newest `keep`.
+    """
+    root = Path(root)
+    sha1 = csv_sha1(csv_path)
+    version = f"{BUNDLE_FORMAT}-{sha1[:12]}"
+    tmp = root / f".{version}.{os.getpid()}.tmp"
+    shutil.rmtree(tmp, ignore_errors=True)
+    tmp.mkdir(parents=True)
+
+    ingested = ingest_results(csv_path, compact=True)
+    builders = _builders(ingested)
+    artifacts = {}
+    for name, build in builders.items():
+        t0 = time.perf_counter()
+        obj = build()
+        with open(tmp / f"{name}.pkl", "wb") as f:
+            pickle.dump(obj, f, protocol=pickle.HIGHEST_PROTOCOL)
+        artifacts[name] = {"seconds": round(time.perf_counter() - t0, 3),
+                           "bytes": (tmp / f"{name}.pkl").stat().st_size}
+        log(f"{name}: {artifacts[name]['seconds']}s, {artifacts[name]['bytes'] / 1e6:.1f} MB")
+
+    t0 = time.perf_counter()
+    teams, matches, elo_rows = rebuild_db(ingested.results, tmp / "app.db", builders["elo"]()[0])
+    with sqlite3.connect(tmp / "app.db") as conn:
+        conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    log(f"app.db: {time.perf_counter() - t0:.3f}s, teams={teams}, matches={matches}, elo rows={elo_rows}")
+
+    manifest = {
+        "version": version,
+        "format": BUNDLE_FORMAT,
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "source": {"path": resolve_results_path(csv_path), "sha1": sha1,
+                   "rows_read": ingested.rows_read, "rows_dropped": ingested.rows_dropped},
+        "runtime": _runtime(),
+        "artifacts": artifacts,
+        "db": {"teams": teams, "matches": matches, "elo_rows": elo_rows},
+    }
+    (tmp / "manifest.json").write_text(json.dumps(manifest, indent=2), encoding="utf-8")
+
+    final = root / version
+    shutil.rmtree(final, ignore_errors=True)
+    os.replace(tmp, final)
+    current_tmp = root / f".CURRENT.{os.getpid()}"
+    current_tmp.write_text(version, encoding="utf-8")
+    os.replace(current_tmp, root / "CURRENT")
+
+    bundles = sorted((p for p in root.iterdir() if p.is_dir() and not p.name.startswith(".")),
+                     key=lambda p: p.stat().st_mtime, reverse=True)
+    for old in bundles[keep:]:
+        if old.name != version:
+            shutil.rmtree(old, ignore_errors=True)
+    return Bundle(final, manifest)
+
+def load_bundle(csv_path: str | os.PathLike | None = None, root: Path | str = ARTIFACTS_DIR,
+                sha1: str | None = None) -> Bundle | None:
+    """
+    The current bundle if it was built from this exact CSV by a compatible
+    runtime, else None. Pass sha1 when the caller has already hashed the CSV.
+    """
+    root = Path(root)
+    try:
+        version = (root / "CURRENT").read_text(encoding="utf-8").strip()
+        manifest = json.loads((root / version / "manifest.json").read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+    if manifest.get("format") != BUNDLE_FORMAT or manifest.get("runtime", {}).get("pandas") != pd.__version__ \
+            or manifest.get("runtime", {}).get("numpy") != np.__version__:
+        return None
+    try:
+        if manifest["source"]["sha1"] != (sha1 or csv_sha1(csv_path)):
+            return None
+    except FileNotFoundError:
+        return None
+    return Bundle(root / version, manifest)
+
+def install_database(bundle: Bundle, db_path: Path | str = DEFAULT_DB_PATH) -> bool:
+    """
+    Copy the bundle's app.db to db_path if there is no database there yet.
+    A live database is never replaced on disk (its -wal would outlive it);
+    refresh that one with sql_io.rebuild_db instead.
+    """
+    db_path = Path(db_path)
+    if db_path.exists():
+        return False
+    db_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = db_path.with_name(db_path.name + ".install")
+    shutil.copyfile(bundle.db_path, tmp)
+    os.replace(tmp, db_path)
+    return True
@@ -1,17 +1,34 @@
 # src/data_io.py
 from __future__ import annotations
 import os
+from dataclasses import dataclass
+from typing import IO
 import pandas as pd
+from src.qa import run_all_checks, ISSUE_COLUMNS
+from src.perf import timed, count
 
 REQUIRED_COLS = [
     "date", "home_team", "away_team", "home_score", "away_score"
 ]
 
-def load_results() -> pd.DataFrame:
-    """
-    Load results.csv from ./data/results.csv (preferred) or ./results.csv (fallback).
-    Parse dates, derive 'year', and ensure required columns exist.
-    """
+TEAM_COLS = ["home_team", "away_team"]
+CATEGORY_COLS = ["tournament", "city", "country"]
+SCORE_COLS = ["home_score", "away_score"]
+
+@dataclass(frozen=True)
+class IngestResult:
+    results: pd.DataFrame  # cleaned, date-sorted frame shared by every backend
+    issues: pd.DataFrame   # QA findings on the parsed rows, before invalid rows are dropped
+    rows_read: int
+    rows_dropped: int
+    source: str
+
+def resolve_results_path(csv_path: str | os.PathLike | None = None) -> str:
+    """./data/results.csv (preferred) or ./results.csv (fallback) unless a path is given."""
+    if csv_path is not None:
+        if not os.path.exists(csv_path):
+            raise FileNotFoundError(f"CSV not found: {csv_path}")
+        return str(csv_path)
     preferred_path = os.path.join("data", "results.csv")
     fallback_path = "results.csv"
 
@@ -21,18 +38,122 @@ def load_results() -> pd.DataFrame:
             "results.csv not found. Place it in ./data/results.csv (recommended) "
             "or in project root as ./results.csv."
         )
+    return csv_path
 
-    df = pd.read_csv(csv_path)
+@timed
+def parse_results(csv_path: str | os.PathLike | IO | None = None) -> pd.DataFrame:
+    """
+    Read the CSV once and normalise it: dates parsed (invalid -> NaT), team
+    names stripped, scores numeric (invalid -> NaN) and 'year' always derived
+    from the date. Rows are kept in file order and nothing is dropped, so QA
+    can still report the invalid ones. Also accepts an open binary buffer.
+    """
+    df = pd.read_csv(csv_path if hasattr(csv_path, "read") else resolve_results_path(csv_path))
     missing = [c for c in REQUIRED_COLS if c not in df.columns]
     if missing:
         raise ValueError(f"Missing required columns: {missing}")
 
     df["date"] = pd.to_datetime(df["date"], errors="coerce")
-    df = df.dropna(subset=["date"]).copy()
-    df["year"] = df["date"].dt.year.astype(int)
+    df["year"] = df["date"].dt.year
+    for c in TEAM_COLS:
+        names = df[c]
+        df[c] = names.where(names.isna(), names.astype(str).str.strip())
+    for c in SCORE_COLS:
+        df[c] = pd.to_numeric(df[c], errors="coerce")
+    count("data_io.rows_parsed", len(df))
+    return df
 
-    df["home_team"] = df["home_team"].astype(str).str.strip()
-    df["away_team"] = df["away_team"].astype(str).str.strip()
+@timed
+def clean_results(parsed: pd.DataFrame) -> pd.DataFrame:
+    """Drop rows missing a required value and sort by date (stable, so same-day matches keep file order)."""
+    df = parsed.dropna(subset=REQUIRED_COLS)
+    df = df.astype({"year": int, **{c: "int64" for c in SCORE_COLS}})
+    return df.sort_values("date", kind="stable").reset_index(drop=True)
 
-    df = df.sort_values("date").reset_index(drop=True)
-    return df
+@timed
+def ingest_results(csv_path: str | os.PathLike | None = None, compact: bool = False,
+                   run_qa: bool = True) -> IngestResult:
+    """
+    The one ingestion path: parse once, run QA on the parsed rows, clean.
+    The in-memory snapshot, the SQLite loader and the QA tab all consume the
+    returned frames, so they cannot disagree on parsing rules.
+    """
+    source = resolve_results_path(csv_path)
+    return ingest_parsed(parse_results(source), source, compact=compact, run_qa=run_qa)
+
+def ingest_parsed(parsed: pd.DataFrame, source: str, compact: bool = False, run_qa: bool = True) -> IngestResult:
+    """ingest_results() for rows already read by parse_results()."""
+    issues = run_all_checks(parsed) if run_qa else pd.DataFrame(columns=ISSUE_COLUMNS)
+    df = clean_results(parsed)
+    if compact:
+        df = compact_results(df)
+    return IngestResult(results=df, issues=issues, rows_read=len(parsed),
+                        rows_dropped=len(parsed) - len(df), source=source)
+
+def load_results(compact: bool = False, csv_path: str | os.PathLike | None = None) -> pd.DataFrame:
+    """
+    Load results.csv from ./data/results.csv (preferred) or ./results.csv (fallback).
+    Parse dates, derive 'year', and ensure required columns exist.
+    With compact=True the frame is returned in the schema of compact_results().
+    """
+    return ingest_results(csv_path, compact=compact, run_qa=False).results
+
+@timed
+def compact_results(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Narrow dtypes for long-lived in-memory frames: both team columns become
+    categoricals over one shared team dictionary, tournament/city/country
+    become categoricals, scores and year use the smallest int that fits and
+    'neutral' is bool. Values are unchanged, so metrics and QA accept either form.
+    """
+    out = df.copy()
+    present = [c for c in TEAM_COLS if c in out.columns]
+    if present:
+        names = pd.unique(pd.concat([out[c] for c in present], ignore_index=True).dropna())
+        team_dtype = pd.CategoricalDtype(sorted(str(n) for n in names))
+        for c in present:
+            out[c] = out[c].astype(team_dtype)
+    for c in CATEGORY_COLS:
+        if c in out.columns:
+            out[c] = out[c].astype("category")
+    for c in SCORE_COLS + ["year"]:
+        if c in out.columns and pd.api.types.is_integer_dtype(out[c]):
+            out[c] = pd.to_numeric(out[c], downcast="integer")
+    if "neutral" in out.columns and not out["neutral"].isna().any():
+        out["neutral"] = out["neutral"].astype(bool)
+    return out
+
+@timed
+def append_results(df: pd.DataFrame, new: pd.DataFrame) -> pd.DataFrame:
+    """
+    The cleaned frame of df's rows followed by new's (both from clean_results,
+    new read after df), equal to cleaning both together: a stable date sort
+    that only moves rows when new goes back before df's last date. Compact
+    frames stay compact, with the union of their categories.
+    """
+    if new.empty:
+        return df
+    if isinstance(df["home_team"].dtype, pd.CategoricalDtype):
+        new = compact_results(new)
+        dtypes = {}
+        for c in TEAM_COLS + CATEGORY_COLS:
+            if c in df.columns and isinstance(df[c].dtype, pd.CategoricalDtype):
+                dtypes[c] = pd.CategoricalDtype(sorted(set(df[c].cat.categories) | set(new[c].cat.categories)))
+        out = pd.concat([df.astype(dtypes), new.astype(dtypes)], ignore_index=True)
+        for c in SCORE_COLS + ["year"]:
+            out[c] = pd.to_numeric(out[c], downcast="integer")
+    else:
+        out = pd.concat([df, new], ignore_index=True)
+    if len(df) and new["date"].iloc[0] < df["date"].iloc[-1]:
+        out = out.sort_values("date", kind="stable").reset_index(drop=True)
+    return out
+
+def memory_report(df: pd.DataFrame) -> pd.DataFrame:
+    """Per-column dtype and deep memory usage (bytes), with a TOTAL row."""
+    usage = df.memory_usage(index=True, deep=True)
+    rows = [{"column": str(col), "dtype": str(df[col].dtype) if col in df.columns else "index",
+             "bytes": int(nbytes)} for col, nbytes in usage.items()]
+    rows.append({"column": "TOTAL", "dtype": "", "bytes": int(usage.sum())})
+    out = pd.DataFrame(rows)
+    out["mb"] = (out["bytes"] / 1_000_000).round(3)
+    return out
@@ -0,0 +1,53 @@
+# src/datasets.py
+# Several competitions side by side. Each dataset is one results CSV with
+# its own SQLite database (shard), so loading or querying one league never
+# touches another's file:
+#
+#   data/results.csv, data/app.db                         "international"
+#   data/datasets/<name>/results.csv, .../<name>/app.db   one per extra league
+#
+# Cross-dataset SQL goes through sql_io.run_federated_query, which ATTACHes
+# the shards.
+
+from __future__ import annotations
+import os
+import re
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict
+from src.data_io import resolve_results_path
+from src.sql_io import DEFAULT_DB_PATH
+
+DATASETS_DIR = Path(os.environ.get("RESULTS_DATASETS_DIR", "data/datasets"))
+DEFAULT_DATASET = "international"
+_NAME = re.compile(r"^[A-Za-z0-9][A-Za-z0-9_.-]*$")
+
+@dataclass(frozen=True)
+class DatasetSpec:
+    name: str
+    csv_path: Path
+    db_path: Path
+
+def list_datasets(root: Path | str | None = None) -> Dict[str, DatasetSpec]:
+    """Every dataset with a results CSV under root (default DATASETS_DIR), the default one first."""
+    specs: Dict[str, DatasetSpec] = {}
+    try:
+        specs[DEFAULT_DATASET] = DatasetSpec(DEFAULT_DATASET, Path(resolve_results_path()), DEFAULT_DB_PATH)
+    except FileNotFoundError:
+        pass
+    root = Path(DATASETS_DIR if root is None else root)
+    if root.is_dir():
+        for d in sorted(root.iterdir()):
+            if d.name != DEFAULT_DATASET and _NAME.match(d.name) and (d / "results.csv").is_file():
+                specs[d.name] = DatasetSpec(d.name, d / "results.csv", d / "app.db")
+    return specs
+
+def get_dataset(name: str = DEFAULT_DATASET, root: Path | str | None = None) -> DatasetSpec:
+    specs = list_datasets(root)
+    if name not in specs:
+        raise ValueError(f"Unknown dataset: {name} (available: {', '.join(specs) or 'none'})")
+    return specs[name]
+
+def dataset_shards(root: Path | str | None = None) -> Dict[str, Path]:
+    """Dataset name -> database path, for sql_io.run_federated_query."""
+    return {name: spec.db_path for name, spec in list_datasets(root).items()}
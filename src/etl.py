@@ -1,15 +1,78 @@
 from __future__ import annotations
+import argparse
+import os
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from src.sql_io import init_db, load_csv_to_db, DEFAULT_DB_PATH
+from typing import Tuple
+from src.artifacts import ARTIFACTS_DIR, build_bundle, install_database
+from src.data_io import ingest_results
+from src.datasets import DEFAULT_DATASET, get_dataset, list_datasets
+from src.metrics import compute_elo
+from src.sql_io import rebuild_db, db_writer, DEFAULT_DB_PATH
+
+def build_artifacts(root: Path) -> None:
+    print(f"[ETL] Building warm-start bundle in: {root}")
+    bundle = build_bundle(root=root, log=lambda msg: print(f"[ETL]   {msg}"))
+    print(f"[ETL] Bundle {bundle.version} ready")
+    if install_database(bundle, DEFAULT_DB_PATH):
+        print(f"[ETL] Installed database at: {DEFAULT_DB_PATH}")
+        return
+    # a live database is rebuilt in place (one transaction) rather than replaced
+    print(f"[ETL] Rebuilding database at: {DEFAULT_DB_PATH}")
+    ratings_history, _ = bundle.load("elo")
+    job = db_writer(DEFAULT_DB_PATH).submit("etl", rebuild_db, bundle.load("ingested").results,
+                                            DEFAULT_DB_PATH, ratings_history)
+    teams_count, matches_count, elo_rows = job.result()
+    print(f"[ETL] Done. Teams: {teams_count}, Matches: {matches_count}, Elo rows: {elo_rows}")
+
+def load_dataset(name: str = DEFAULT_DATASET) -> Tuple[str, int, int, int]:
+    """Ingest one dataset's CSV into its own database; with --all each runs in its own process."""
+    spec = get_dataset(name)
+
+    def log(msg: str) -> None:
+        print(f"[ETL] [{name}] {msg}", flush=True)
+
+    log(f"Parsing {spec.csv_path} and running QA checks...")
+    ingested = ingest_results(spec.csv_path)
+    issues = ingested.issues
+    errors = int((issues["severity"] == "ERROR").sum()) if not issues.empty else 0
+    warns = int((issues["severity"] == "WARN").sum()) if not issues.empty else 0
+    log(f"Rows read: {ingested.rows_read}, dropped: {ingested.rows_dropped}, "
+        f"QA errors: {errors}, warnings: {warns}")
+
+    log("Computing Elo history (elo_history)...")
+    ratings_history, _ = compute_elo(ingested.results)
+
+    # schema, teams/matches/h2h_summary and elo_history swap in as one commit;
+    # readers keep the previous data until then
+    log(f"Rebuilding database at: {spec.db_path}")
+    spec.db_path.parent.mkdir(parents=True, exist_ok=True)
+    job = db_writer(spec.db_path).submit("etl", rebuild_db, ingested.results, spec.db_path, ratings_history)
+    teams_count, matches_count, elo_rows = job.result()
+    log(f"Done. Teams: {teams_count}, Matches: {matches_count}, Elo rows: {elo_rows}")
+    return name, teams_count, matches_count, elo_rows
 
 def main():
-    print("[ETL] Initializing database schema...")
-    init_db(DEFAULT_DB_PATH)
-    print(f"[ETL] DB ready at: {DEFAULT_DB_PATH}")
+    ap = argparse.ArgumentParser(description="Load results CSVs into their SQLite databases")
+    ap.add_argument("--dataset", default=DEFAULT_DATASET, help="which dataset to load (see src.datasets)")
+    ap.add_argument("--all", action="store_true", help="load every dataset, one process per source")
+    ap.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    ap.add_argument("--build-artifacts", action="store_true",
+                    help="also build the warm-start bundle the app and CLIs load on start")
+    ap.add_argument("--artifacts-dir", type=Path, default=ARTIFACTS_DIR)
+    args = ap.parse_args()
+    if args.build_artifacts:
+        build_artifacts(args.artifacts_dir)
+        return
+    if not args.all:
+        load_dataset(args.dataset)
+        return
 
-    print("[ETL] Loading CSV into DB (teams, matches, h2h_summary)...")
-    teams_count, matches_count = load_csv_to_db(DEFAULT_DB_PATH, Path("data/results.csv"))
-    print(f"[ETL] Done. Teams: {teams_count}, Matches: {matches_count}")
+    names = list(list_datasets())
+    print(f"[ETL] Loading {len(names)} datasets with {min(args.workers, len(names))} processes")
+    with ProcessPoolExecutor(max_workers=max(1, min(args.workers, len(names)))) as pool:
+        for name, teams_count, matches_count, elo_rows in pool.map(load_dataset, names):
+            print(f"[ETL] {name}: Teams: {teams_count}, Matches: {matches_count}, Elo rows: {elo_rows}")
 
 if __name__ == "__main__":
     main()
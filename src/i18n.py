@@ -10,6 +10,11 @@ I18N = {
         "tab_qa": "Data Quality",
         "tab_sql": "SQL",
         "tab_analytics": "Analytics",
+        "dataset": "Dataset",
+        "data_updated": "results.csv changed since start ({change}); now {rows} rows",
+        "data_change_append": "new matches appended",
+        "data_change_backfill": "back-dated matches appended",
+        "data_change_full": "reloaded",
 
         # Sidebar
         "filters": "Filters",
@@ -32,6 +37,18 @@ I18N = {
         "head_to_head": "Head-to-Head",
         "pick_opponent_info": "Pick an Opponent to see Head-to-Head summary and form chart.",
         "selected_teams": "Selected teams: **{team}** vs **{opponent}**",
+        "standings_title": "Standings",
+        "streaks_records_title": "Streaks & Records",
+        "all_time_records": "All-time records (all teams)",
+        "tournament": "Tournament",
+        "all_tournaments": "All tournaments",
+        "standings_caption": "All teams, 3 points per win and 1 per draw. Uses the Year filter from the sidebar.",
+        "points_3_1_0": "Points (3/1/0)",
+        "expected_points": "Expected Points",
+        "points_over_expectation": "Pts over Expectation",
+        "avg_opp_elo": "Avg Opponent Elo",
+        "adjusted_kpis_caption": "Expected points from both teams' pre-match Elo (home advantage skipped on neutral grounds).",
+        "adjusted_table_title": "Performance vs Expectation (all teams)",
 
         # QA tab
         "qa_intro": "Run automated data quality checks before analysis.",
@@ -52,17 +69,43 @@ I18N = {
         # SQL tab
         "sql_title": "SQLite: ETL & Queries",
         "db_path_exists": "DB path: {path} — Exists: {exists}",
+        "db_read_mode": "Query connection",
+        "db_read_mode_default": "Default (read-write)",
+        "db_read_mode_readonly": "Read-only (mmap)",
+        "db_read_mode_memory": "In-memory replica",
         "init_schema": "Initialize DB schema",
         "load_csv_db": "Load CSV into DB",
         "etl_loaded": "Loaded. Teams={teams}, Matches={matches}",
         "etl_error": "ETL error: {error}",
+        "write_job_status": "Write job {name} ({status}) {message}",
+        "page_size": "Rows per page",
+        "page_caption": "Page {page} · rows {first}–{last}",
+        "prev_page": "◀ Previous",
+        "next_page": "Next ▶",
+        "export_title": "Export full result",
+        "export_format": "Format",
+        "export_btn": "Export",
+        "export_done": "Exported {rows} rows to {path}",
+        "federated_title": "Across datasets",
+        "federated_caption": "Runs over every loaded dataset database: {datasets}",
+        "run_query": "Run query",
+        "year_from": "From year",
+        "year_to": "To year",
         "run_predef_query": "Run a predefined query",
         "query": "Query",
         "team_a": "Team A",
         "team_b": "Team B",
         "limit": "Limit",
+        "year_range": "Year range",
+        "min_games": "Minimum games",
         "db_not_found": "Database not found. Click 'Initialize DB schema' and then 'Load CSV into DB'.",
         "query_error": "Query error: {error}",
+        "slow_query_title": "Slow-query log",
+        "slow_query_enable": "Log slow queries",
+        "slow_query_threshold": "Threshold (ms)",
+        "slow_query_empty": "No slow queries logged yet.",
+        "slow_query_recent": "Most recent entries",
+        "slow_query_plan": "Query plan of the slowest call: {query} ({ms} ms)",
 
         # Analytics tab
         "an_title": "Analytics: Rolling Trends and Elo-lite",
@@ -76,11 +119,46 @@ I18N = {
         "elo_title": "Elo-lite Trend",
         "elo_assumptions": "Assumptions: base=1500, K=20, home advantage=50 Elo pts.",
         "no_data_elo": "No Elo data to display.",
+        "elo_leaderboard_title": "Elo leaderboard as of date",
+        "rating_models_title": "Rating models comparison",
+        "sim_title": "Tournament simulator (Monte Carlo on current Elo)",
+        "sim_format": "Format",
+        "sim_format_knockout": "Knockout (bracket in selection order)",
+        "sim_format_groups": "Groups of 4 + knockout",
+        "sim_teams": "Teams",
+        "sim_n": "Simulations",
+        "sim_seed": "Seed",
+        "sim_run": "Run simulation",
+        "sim_running": "Simulating...",
+        "sim_groups_error": "Group format needs a multiple of 4 teams (8, 16 or 32).",
+        "rating_models_caption": "Baseline, goal-margin, tournament-weighted and neutral-aware Elo, computed in one pass. Lower Brier is better.",
+        "goal_model_title": "Scoreline model (Poisson attack/defence)",
+        "goal_model_caption": "Dixon–Coles Poisson model: attack/defence per team, home advantage and a low-score correction.",
+        "goal_model_half_life": "Time decay half-life (years, 0 = none)",
+        "home_side": "Home side",
+        "away_side": "Away side",
+        "neutral_ground": "Neutral ground",
+        "home_win": "Home win",
+        "draw": "Draw",
+        "away_win": "Away win",
+        "expected_goals": "Expected goals",
+        "goal_model_strengths": "Team strengths",
+        "as_of_date": "As of date",
+        "date_range": "Date range",
+        "window_matches": "Window (matches)",
+        "window_days": "Window (days)",
+        "match_date": "Match date",
 
         # Reports
         "export_h2h": "Export H2H Report (HTML)",
         "export_saved": "Report saved: {path}",
         "download_now": "Download now",
+        "perf_enable": "Performance instrumentation",
+        "process_wide_help": "Process-wide: changing it applies to every session served by this app.",
+        "perf_title": "Performance",
+        "perf_caption": "Timed calls in this rerun ({ms} ms total). Cached steps only show up on the rerun that computes them.",
+        "perf_download_json": "Download JSON snapshot",
+        "perf_download_prom": "Download Prometheus metrics",
         "export_team": "Export Team Report (HTML)",
     },
 
@@ -93,6 +171,11 @@ I18N = {
         "tab_qa": "Calidad de Datos",
         "tab_sql": "SQL",
         "tab_analytics": "Analítica",
+        "dataset": "Conjunto de datos",
+        "data_updated": "results.csv cambió desde el inicio ({change}); ahora {rows} filas",
+        "data_change_append": "partidos nuevos añadidos",
+        "data_change_backfill": "partidos con fecha anterior añadidos",
+        "data_change_full": "recargado",
 
         # Sidebar
         "filters": "Filtros",
@@ -115,6 +198,18 @@ I18N = {
         "head_to_head": "Cara a Cara",
         "pick_opponent_info": "Elige un Oponente para ver el resumen de Cara a Cara y la gráfica de forma.",
         "selected_teams": "Equipos seleccionados: **{team}** vs **{opponent}**",
+        "standings_title": "Clasificación",
+        "streaks_records_title": "Rachas y récords",
+        "all_time_records": "Récords históricos (todos los equipos)",
+        "tournament": "Torneo",
+        "all_tournaments": "Todos los torneos",
+        "standings_caption": "Todos los equipos, 3 puntos por victoria y 1 por empate. Usa el filtro de Año de la barra lateral.",
+        "points_3_1_0": "Puntos (3/1/0)",
+        "expected_points": "Puntos Esperados",
+        "points_over_expectation": "Pts sobre lo Esperado",
+        "avg_opp_elo": "Elo Medio del Rival",
+        "adjusted_kpis_caption": "Puntos esperados según el Elo previo de ambos equipos (sin ventaja local en campo neutral).",
+        "adjusted_table_title": "Rendimiento vs Expectativa (todos los equipos)",
 
         # QA tab
         "qa_intro": "Ejecuta verificaciones automáticas de calidad de datos antes del análisis.",
@@ -135,17 +230,43 @@ I18N = {
         # SQL tab
         "sql_title": "SQLite: ETL y Consultas",
         "db_path_exists": "Ruta BD: {path} — Existe: {exists}",
+        "db_read_mode": "Conexión de consultas",
+        "db_read_mode_default": "Predeterminada (lectura-escritura)",
+        "db_read_mode_readonly": "Solo lectura (mmap)",
+        "db_read_mode_memory": "Réplica en memoria",
         "init_schema": "Inicializar esquema de BD",
         "load_csv_db": "Cargar CSV en BD",
         "etl_loaded": "Cargado. Equipos={teams}, Partidos={matches}",
         "etl_error": "Error ETL: {error}",
+        "write_job_status": "Escritura {name} ({status}) {message}",
+        "page_size": "Filas por página",
+        "page_caption": "Página {page} · filas {first}–{last}",
+        "prev_page": "◀ Anterior",
+        "next_page": "Siguiente ▶",
+        "export_title": "Exportar resultado completo",
+        "export_format": "Formato",
+        "export_btn": "Exportar",
+        "export_done": "Exportadas {rows} filas a {path}",
+        "federated_title": "Entre conjuntos de datos",
+        "federated_caption": "Se ejecuta sobre las bases de datos de todos los conjuntos cargados: {datasets}",
+        "run_query": "Ejecutar consulta",
+        "year_from": "Desde el año",
+        "year_to": "Hasta el año",
         "run_predef_query": "Ejecutar una consulta predefinida",
         "query": "Consulta",
         "team_a": "Equipo A",
         "team_b": "Equipo B",
         "limit": "Límite",
+        "year_range": "Rango de años",
+        "min_games": "Partidos mínimos",
         "db_not_found": "Base de datos no encontrada. Pulsa 'Inicializar esquema de BD' y luego 'Cargar CSV en BD'.",
         "query_error": "Error de consulta: {error}",
+        "slow_query_title": "Registro de consultas lentas",
+        "slow_query_enable": "Registrar consultas lentas",
+        "slow_query_threshold": "Umbral (ms)",
+        "slow_query_empty": "Aún no hay consultas lentas registradas.",
+        "slow_query_recent": "Entradas más recientes",
+        "slow_query_plan": "Plan de la llamada más lenta: {query} ({ms} ms)",
 
         # Analytics tab
         "an_title": "Analítica: Tendencias y Elo-lite",
@@ -159,11 +280,46 @@ I18N = {
         "elo_title": "Tendencia Elo-lite",
         "elo_assumptions": "Suposiciones: base=1500, K=20, ventaja local=50 puntos Elo.",
         "no_data_elo": "No hay datos Elo para mostrar.",
+        "elo_leaderboard_title": "Clasificación Elo a una fecha",
+        "rating_models_title": "Comparación de modelos de rating",
+        "sim_title": "Simulador de torneos (Monte Carlo con Elo actual)",
+        "sim_format": "Formato",
+        "sim_format_knockout": "Eliminatoria (cuadro en el orden elegido)",
+        "sim_format_groups": "Grupos de 4 + eliminatoria",
+        "sim_teams": "Equipos",
+        "sim_n": "Simulaciones",
+        "sim_seed": "Semilla",
+        "sim_run": "Ejecutar simulación",
+        "sim_running": "Simulando...",
+        "sim_groups_error": "El formato de grupos necesita un múltiplo de 4 equipos (8, 16 o 32).",
+        "rating_models_caption": "Elo base, por margen de goles, ponderado por torneo y con campo neutral, calculados en una sola pasada. Menor Brier es mejor.",
+        "goal_model_title": "Modelo de marcadores (Poisson ataque/defensa)",
+        "goal_model_caption": "Modelo de Poisson Dixon–Coles: ataque/defensa por equipo, ventaja local y corrección de marcadores bajos.",
+        "goal_model_half_life": "Vida media del decaimiento (años, 0 = ninguno)",
+        "home_side": "Local",
+        "away_side": "Visitante",
+        "neutral_ground": "Campo neutral",
+        "home_win": "Victoria local",
+        "draw": "Empate",
+        "away_win": "Victoria visitante",
+        "expected_goals": "Goles esperados",
+        "goal_model_strengths": "Fortalezas de los equipos",
+        "as_of_date": "A fecha de",
+        "date_range": "Rango de fechas",
+        "window_matches": "Ventana (partidos)",
+        "window_days": "Ventana (días)",
+        "match_date": "Fecha del partido",
 
         # Reports
         "export_h2h": "Exportar Informe H2H (HTML)",
         "export_saved": "Informe guardado: {path}",
         "download_now": "Descargar ahora",
+        "perf_enable": "Instrumentación de rendimiento",
+        "process_wide_help": "Global al proceso: el cambio se aplica a todas las sesiones de esta app.",
+        "perf_title": "Rendimiento",
+        "perf_caption": "Llamadas medidas en esta ejecución ({ms} ms en total). Los pasos en caché solo aparecen en la ejecución que los calcula.",
+        "perf_download_json": "Descargar snapshot JSON",
+        "perf_download_prom": "Descargar métricas Prometheus",
         "export_team": "Exportar Informe de Equipo (HTML)",
     },
 }
@@ -0,0 +1,233 @@
+# src/incremental.py
+# Keeps the results snapshot in step with results.csv without re-reading it
+# from scratch. The file is fingerprinted by (mtime, size, SHA-1 of the bytes
+# seen); when it changes and the bytes seen before are intact, the change is
+# an append and only the new tail is parsed, QA-checked and folded into the
+# frame, Elo, the KPI index and the Elo store, and into the cached objects
+# listed in EXTENDERS. Anything else (an edit, a truncation, a previous last
+# line without a line break) re-ingests the file. Other cached objects are
+# rebuilt on first use after a change.
+
+from __future__ import annotations
+import hashlib
+import io
+import os
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field, fields, is_dataclass, replace
+from pathlib import Path
+from typing import Callable, Dict, Tuple
+import numpy as np
+import pandas as pd
+from src.artifacts import ARTIFACTS_DIR, Bundle, load_bundle
+from src.data_io import IngestResult, append_results, ingest_parsed, parse_results, resolve_results_path
+from src.metrics import (
+    KpiIndex, EloStore, build_kpi_index, extend_kpi_index, compute_elo, extend_elo,
+    build_elo_store, extend_elo_store, extend_rolling_tables,
+)
+from src.perf import count, timed
+
+# Snapshots of all datasets together (with their cached derived objects) are
+# kept under this many MB; past it the least recently used dataset is dropped.
+CACHE_BUDGET_MB = float(os.environ.get("RESULTS_CACHE_MB", "1024"))
+
+# cached objects (Snapshot.cached names) that an append extends from the new
+# rows: name -> extend(obj, df_new), df_new dated no earlier than obj's matches
+EXTENDERS: Dict[str, Callable[[object, pd.DataFrame], object]] = {
+    "rolling_tables": extend_rolling_tables,
+}
+
+def approx_nbytes(obj) -> int:
+    """Memory held by frames and arrays reachable through tuples, lists, dicts and dataclasses."""
+    if isinstance(obj, (pd.DataFrame, pd.Series)):
+        return int(obj.memory_usage(index=True, deep=True).sum()) if isinstance(obj, pd.DataFrame) \
+            else int(obj.memory_usage(index=True, deep=True))
+    if isinstance(obj, np.ndarray):
+        return int(obj.nbytes)
+    if isinstance(obj, (tuple, list)):
+        return sum(approx_nbytes(x) for x in obj)
+    if isinstance(obj, dict):
+        return sum(approx_nbytes(v) for v in obj.values())
+    if is_dataclass(obj) and not isinstance(obj, type):
+        return sum(approx_nbytes(getattr(obj, f.name)) for f in fields(obj) if not f.name.startswith("_"))
+    return 0
+
+@dataclass(frozen=True)
+class SourceState:
+    path: str
+    mtime_ns: int
+    size: int
+    sha1: str        # of the first `size` bytes
+    clean_end: bool  # ends with a line break, so appended bytes start a new row
+
+def source_state(path: str, mtime_ns: int, data: bytes) -> SourceState:
+    return SourceState(path, mtime_ns, len(data), hashlib.sha1(data).hexdigest(), data.endswith(b"\n"))
+
+@dataclass(frozen=True)
+class Snapshot:
+    generation: int  # bumped on every change of the data
+    change: str      # how it was produced: "full", "append" or "backfill"
+    source: SourceState
+    ingested: IngestResult
+    elo: Tuple[pd.DataFrame, pd.DataFrame]  # compute_elo's (ratings_history, final_ratings)
+    kpi_index: KpiIndex
+    elo_store: EloStore
+    bundle: Bundle | None = None  # the warm-start bundle this snapshot was loaded from
+    _cache: Dict[str, object] = field(default_factory=dict, repr=False, compare=False)
+    _sizes: Dict[str, int] = field(default_factory=dict, repr=False, compare=False)
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False, compare=False)
+
+    def nbytes(self) -> int:
+        """Approximate memory held by the snapshot and everything cached on it."""
+        if "" not in self._sizes:
+            self._sizes[""] = approx_nbytes((self.ingested, self.elo, self.kpi_index, self.elo_store))
+        return sum(self._sizes.values())
+
+    def carry(self, prev: "Snapshot", df_new: pd.DataFrame) -> "Snapshot":
+        """Seed the EXTENDERS objects prev holds (or its bundle has) extended by df_new."""
+        for name, extend in EXTENDERS.items():
+            if name in prev._cache or (prev.bundle is not None and prev.bundle.has(name)):
+                obj = prev.cached(name, lambda: None)
+                obj = obj if df_new.empty else extend(obj, df_new)
+                self._cache[name] = obj
+                self._sizes[name] = approx_nbytes(obj)
+        return self
+
+    def cached(self, name: str, build: Callable[[], object]):
+        """Anything else derived from this snapshot, built once (the bundle's copy when it has one)."""
+        obj = self._cache.get(name)
+        if obj is None:
+            with self._lock:
+                obj = self._cache.get(name)
+                if obj is None:
+                    if self.bundle is not None and self.bundle.has(name):
+                        obj = self.bundle.load(name)
+                    else:
+                        obj = build()
+                    self._cache[name] = obj
+                    self._sizes[name] = approx_nbytes(obj)
+        return obj
+
+class LiveResults:
+    """
+    The current Snapshot of results.csv. refresh() is one os.stat() while the
+    file is unchanged; callers hold on to the Snapshot they got, so a refresh
+    never changes data under a reader.
+    """
+    def __init__(self, csv_path: str | os.PathLike | None = None,
+                 artifacts_root: Path | str | None = ARTIFACTS_DIR) -> None:
+        self.path = resolve_results_path(csv_path)
+        self.artifacts_root = artifacts_root
+        self._lock = threading.Lock()
+        mtime_ns, data = self._read()
+        self.snapshot = self._full(source_state(self.path, mtime_ns, data), data, 0)
+
+    def _read(self) -> Tuple[int, bytes]:
+        mtime_ns = os.stat(self.path).st_mtime_ns
+        with open(self.path, "rb") as f:
+            return mtime_ns, f.read()
+
+    def refresh(self) -> Snapshot:
+        st = os.stat(self.path)
+        snap = self.snapshot
+        if (st.st_mtime_ns, st.st_size) == (snap.source.mtime_ns, snap.source.size):
+            return snap
+        with self._lock:
+            snap = self.snapshot
+            if (st.st_mtime_ns, st.st_size) == (snap.source.mtime_ns, snap.source.size):
+                return snap  # another caller refreshed first
+            mtime_ns, data = self._read()
+            prev = snap.source
+            state = source_state(self.path, mtime_ns, data)
+            if state.sha1 == prev.sha1:  # touched, not changed
+                self.snapshot = replace(snap, source=state)
+            elif state.size > prev.size and prev.clean_end \
+                    and hashlib.sha1(data[:prev.size]).hexdigest() == prev.sha1:
+                self.snapshot = self._append(snap, state, data)
+            else:
+                self.snapshot = self._full(state, data, snap.generation + 1)
+            return self.snapshot
+
+    @timed("incremental.full")
+    def _full(self, state: SourceState, data: bytes, generation: int) -> Snapshot:
+        count("incremental.full_reloads")
+        bundle = load_bundle(self.path, self.artifacts_root, sha1=state.sha1) if self.artifacts_root else None
+        if bundle is not None:
+            return Snapshot(generation, "full", state, bundle.load("ingested"), bundle.load("elo"),
+                            bundle.load("kpi_index"), bundle.load("elo_store"), bundle)
+        ingested = ingest_parsed(parse_results(io.BytesIO(data)), self.path, compact=True)
+        return self._rebuilt(generation, "full", state, ingested)
+
+    def _rebuilt(self, generation: int, change: str, state: SourceState, ingested: IngestResult) -> Snapshot:
+        elo = compute_elo(ingested.results)
+        return Snapshot(generation, change, state, ingested, elo,
+                        build_kpi_index(ingested.results), build_elo_store(elo[0]))
+
+    @timed("incremental.append")
+    def _append(self, snap: Snapshot, state: SourceState, data: bytes) -> Snapshot:
+        header = data[:data.index(b"\n") + 1]
+        parsed = parse_results(io.BytesIO(header + data[snap.source.size:]))
+        parsed.index += snap.ingested.rows_read  # QA row_index stays a position in the whole file
+        tail = ingest_parsed(parsed, self.path)
+        old = snap.ingested
+        # QA runs on the new rows only, so aggregate findings (null counts, name variants) are per batch
+        issues = [frame for frame in (old.issues, tail.issues) if not frame.empty]
+        ingested = IngestResult(
+            results=append_results(old.results, tail.results),
+            issues=pd.concat(issues, ignore_index=True) if len(issues) > 1 else (issues or [old.issues])[0],
+            rows_read=old.rows_read + tail.rows_read,
+            rows_dropped=old.rows_dropped + tail.rows_dropped,
+            source=old.source,
+        )
+        count("incremental.rows_appended", tail.rows_read)
+        new = tail.results
+        if len(new) and len(old.results) and new["date"].iloc[0] < old.results["date"].iloc[-1]:
+            # back-dated rows shift everything rated after them
+            count("incremental.backfills")
+            return self._rebuilt(snap.generation + 1, "backfill", state, ingested)
+        if new.empty:
+            return Snapshot(snap.generation + 1, "append", state, ingested, snap.elo, snap.kpi_index,
+                            snap.elo_store).carry(snap, new)
+        count("incremental.appends")
+        elo = extend_elo(*snap.elo, new)
+        return Snapshot(snap.generation + 1, "append", state, ingested, elo,
+                        extend_kpi_index(snap.kpi_index, new),
+                        extend_elo_store(snap.elo_store, elo[0].iloc[len(snap.elo[0]):])).carry(snap, new)
+
+class LivePool:
+    """
+    One LiveResults per dataset, so each dataset's caches are separate, with
+    a shared memory budget: when their snapshots together exceed budget_mb,
+    the least recently used datasets are dropped (and reloaded on next use).
+    The dataset being returned is never dropped.
+    """
+    def __init__(self, budget_mb: float = CACHE_BUDGET_MB,
+                 artifacts_root: Path | str | None = ARTIFACTS_DIR) -> None:
+        self.budget_mb = budget_mb
+        self.artifacts_root = artifacts_root
+        self._live: "OrderedDict[str, LiveResults]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, name: str, csv_path: str | os.PathLike) -> LiveResults:
+        with self._lock:
+            live = self._live.get(name)
+            if live is None:
+                live = self._live[name] = LiveResults(csv_path, self.artifacts_root)
+            self._live.move_to_end(name)
+            self._evict(keep=name)
+            return live
+
+    def _evict(self, keep: str) -> None:
+        sizes = self.sizes()
+        total = sum(sizes.values())
+        for name, nbytes in sizes.items():
+            if total <= self.budget_mb * 1_000_000:
+                break
+            if name != keep:
+                del self._live[name]
+                total -= nbytes
+                count("incremental.evictions")
+
+    def sizes(self) -> Dict[str, int]:
+        """Approximate bytes per loaded dataset, least recently used first."""
+        return {name: live.snapshot.nbytes() for name, live in self._live.items()}
@@ -2,47 +2,63 @@
 from __future__ import annotations
 import pandas as pd
 import numpy as np
-from typing import Dict, Tuple
+from dataclasses import dataclass
+from typing import Dict, Tuple, Union
+from src.ratings import RatingModel, encode_matches, run_rating_models, match_probabilities
+from src.poisson import PoissonModel, decay_weights, fit_poisson, expected_goals, score_matrix
+from src.perf import timed
 
+@timed
 def team_perspective(df: pd.DataFrame, team: str) -> pd.DataFrame:
-    df = df.copy()
-    is_home = df["home_team"] == team
-    is_away = df["away_team"] == team
-    df_team = df[is_home | is_away].copy()
-
-    df_team["is_home"] = is_home[is_home | is_away]
-    df_team["opponent"] = df_team.apply(
-        lambda r: r["away_team"] if r["is_home"] else r["home_team"], axis=1
-    )
-    df_team["gf"] = df_team.apply(
-        lambda r: r["home_score"] if r["is_home"] else r["away_score"], axis=1
-    )
-    df_team["ga"] = df_team.apply(
-        lambda r: r["away_score"] if r["is_home"] else r["home_score"], axis=1
-    )
-    df_team["result"] = df_team.apply(_row_result, axis=1)
+    # Select the team's rows by position and build only the output columns;
+    # the full dataset is never copied.
+    is_home_all = (df["home_team"] == team).to_numpy()
+    idx = np.flatnonzero(is_home_all | (df["away_team"] == team).to_numpy())
+    dates = df["date"].to_numpy()[idx]
+    if len(idx) > 1 and (dates[1:] < dates[:-1]).any():
+        order = np.argsort(dates, kind="stable")
+        idx, dates = idx[order], dates[order]
 
-    # keep essential columns + originals for reference
-    keep = ["date","year","is_home","opponent","gf","ga","result",
-            "home_team","away_team","home_score","away_score"]
-    df_team = df_team.sort_values("date").reset_index(drop=True)
-    return df_team[keep]
+    is_home = is_home_all[idx]
+    home_team = df["home_team"].iloc[idx].array
+    away_team = df["away_team"].iloc[idx].array
+    home_score = df["home_score"].to_numpy()[idx]
+    away_score = df["away_score"].to_numpy()[idx]
+    gf = np.where(is_home, home_score, away_score)
+    ga = np.where(is_home, away_score, home_score)
+    opponent = pd.Series(away_team).where(is_home, pd.Series(home_team)).array
 
-def _row_result(r) -> str:
-    if r["gf"] > r["ga"]:
-        return "W"
-    if r["gf"] < r["ga"]:
-        return "L"
-    return "D"
+    return pd.DataFrame({
+        "date": dates,
+        "year": df["year"].to_numpy()[idx],
+        "is_home": is_home,
+        "opponent": opponent,
+        "gf": gf,
+        "ga": ga,
+        "result": _results(gf, ga),
+        "home_team": home_team,
+        "away_team": away_team,
+        "home_score": home_score,
+        "away_score": away_score,
+    }, copy=False)
 
+def _results(gf: np.ndarray, ga: np.ndarray) -> np.ndarray:
+    return np.where(gf > ga, "W", np.where(gf < ga, "L", "D")).astype(object)
+
+@timed
 def filter_team_opponent_years(df_team: pd.DataFrame, opponent: str | None, years: list[int] | None) -> pd.DataFrame:
-    out = df_team.copy()
+    # A single combined mask; with no filters the input frame is returned as-is.
+    mask = None
     if opponent:
-        out = out[out["opponent"] == opponent]
+        mask = (df_team["opponent"] == opponent).to_numpy()
     if years:
-        out = out[out["year"].isin(years)]
-    return out
+        year_mask = df_team["year"].isin(years).to_numpy()
+        mask = year_mask if mask is None else mask & year_mask
+    if mask is None:
+        return df_team
+    return df_team[mask]
 
+@timed
 def kpis(df_team_filtered: pd.DataFrame) -> dict:
     n = len(df_team_filtered)
     w = (df_team_filtered["result"] == "W").sum()
@@ -54,39 +70,472 @@ def kpis(df_team_filtered: pd.DataFrame) -> dict:
     return {"games": n, "w": int(w), "d": int(d), "l": int(l), "gf": gf, "ga": ga, "win_pct": win_pct}
 
 
-def rolling_form(df_team_filtered: pd.DataFrame, window: int = 5) -> pd.DataFrame:
-    form_df = df_team_filtered[["date", "result"]].copy()
-    if form_df.empty:
-        form_df["points"] = []
-        form_df["rolling_form"] = []
-        return form_df
+WindowSpec = Union[int, str, pd.Timedelta, pd.DateOffset]
+
+def _time_window(window: WindowSpec) -> pd.Timedelta | pd.DateOffset | None:
+    """
+    Return None for match-count windows, otherwise the time span covered by
+    the window. Strings accept any pandas Timedelta alias ("365D", "90D")
+    plus a calendar-year suffix ("4Y"); a digit-only string ("5") is a
+    match-count window.
+    """
+    if isinstance(window, (int, np.integer)):
+        return None
+    if isinstance(window, (pd.Timedelta, pd.DateOffset)):
+        return window
+    spec = str(window).strip()
+    if spec.isdigit():
+        return None
+    if spec[-1:].upper() == "Y" and spec[:-1].isdigit():
+        return pd.DateOffset(years=int(spec[:-1]))
+    return pd.Timedelta(spec)
+
+def _rolling_mean(dates: pd.Series, values: pd.Series, window: WindowSpec) -> pd.Series:
+    span = _time_window(window)
+    if span is None:
+        return values.rolling(window=int(window), min_periods=1).mean()
+
+    # Time windows cover (date - span, date]. Every match played on the same
+    # date sees the same window, so tournament days with several fixtures
+    # get one consistent value. Bounds come from two binary searches over
+    # the sorted dates and sums from a prefix-sum, so the cost is O(n).
+    d = dates.to_numpy(dtype="datetime64[ns]")
+    order = None
+    if len(d) > 1 and (d[1:] < d[:-1]).any():
+        order = np.argsort(d, kind="stable")
+        d = d[order]
+    v = values.to_numpy(dtype=float)
+    if order is not None:
+        v = v[order]
+
+    starts = (pd.DatetimeIndex(d) - span).to_numpy(dtype="datetime64[ns]")
+    lo = np.searchsorted(d, starts, side="right")
+    hi = np.searchsorted(d, d, side="right")
+    csum = np.concatenate(([0.0], np.cumsum(v)))
+    out = (csum[hi] - csum[lo]) / (hi - lo)
+
+    if order is not None:
+        unsorted = np.empty_like(out)
+        unsorted[order] = out
+        out = unsorted
+    return pd.Series(out, index=values.index)
 
+@timed
+def rolling_form(df_team_filtered: pd.DataFrame, window: WindowSpec = 5) -> pd.DataFrame:
+    dates, result = df_team_filtered["date"], df_team_filtered["result"]
     points_map = {"W": 1.0, "D": 0.5, "L": 0.0}
-    form_df["points"] = form_df["result"].map(points_map).astype(float)
-    form_df["rolling_form"] = form_df["points"].rolling(window=window, min_periods=1).mean()
-    return form_df
-
-def rolling_goal_diff(df_team_filtered: pd.DataFrame, window: int = 5) -> pd.DataFrame:
-    gd_df = df_team_filtered[["date", "gf", "ga"]].copy()
-    if gd_df.empty:
-        gd_df["gd"] = []
-        gd_df["rolling_gd"] = []
-        return gd_df
-    gd_df["gd"] = (gd_df["gf"] - gd_df["ga"]).astype(float)
-    gd_df["rolling_gd"] = gd_df["gd"].rolling(window=window, min_periods=1).mean()
-    return gd_df[["date","gd","rolling_gd"]]
-
-def rolling_win_pct(df_team_filtered: pd.DataFrame, window: int = 10) -> pd.DataFrame:
-    w_df = df_team_filtered[["date", "result"]].copy()
-    if w_df.empty:
-        w_df["win"] = []
-        w_df["rolling_win_pct"] = []
-        return w_df
-    w_df["win"] = (w_df["result"] == "W").astype(int)
-    w_df["rolling_win_pct"] = w_df["win"].rolling(window=window, min_periods=1).mean() * 100.0
-    return w_df
+    points = result.map(points_map).astype(float)
+    rolling = _rolling_mean(dates, points, window) if len(points) else points
+    return pd.DataFrame({"date": dates, "result": result, "points": points,
+                         "rolling_form": rolling}, copy=False)
+
+@timed
+def rolling_goal_diff(df_team_filtered: pd.DataFrame, window: WindowSpec = 5) -> pd.DataFrame:
+    dates = df_team_filtered["date"]
+    gd = df_team_filtered["gf"].astype(float) - df_team_filtered["ga"].astype(float)
+    rolling = _rolling_mean(dates, gd, window) if len(gd) else gd
+    return pd.DataFrame({"date": dates, "gd": gd, "rolling_gd": rolling}, copy=False)
+
+@timed
+def rolling_win_pct(df_team_filtered: pd.DataFrame, window: WindowSpec = 10) -> pd.DataFrame:
+    dates, result = df_team_filtered["date"], df_team_filtered["result"]
+    win = (result == "W").astype(int)
+    rolling = (_rolling_mean(dates, win, window) if len(win) else win.astype(float)) * 100.0
+    return pd.DataFrame({"date": dates, "result": result, "win": win,
+                         "rolling_win_pct": rolling}, copy=False)
+
+@timed
+def team_match_table(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Long format: one row per (team, match), sorted by team then date.
+    'match_idx' is the row position of the match in df.
+    """
+    n = len(df)
+    match_idx = np.concatenate([np.arange(n), np.arange(n)])
+    dates = df["date"].to_numpy()
+    years = df["year"].to_numpy()
+    hs = df["home_score"].to_numpy()
+    as_ = df["away_score"].to_numpy()
+    team = pd.concat([df["home_team"], df["away_team"]], ignore_index=True)
+    opponent = pd.concat([df["away_team"], df["home_team"]], ignore_index=True)
+    codes, _ = pd.factorize(team, sort=True)
+    order = np.lexsort((match_idx, np.concatenate([dates, dates]), codes))
+
+    return pd.DataFrame({
+        "match_idx": match_idx[order],
+        "date": np.concatenate([dates, dates])[order],
+        "year": np.concatenate([years, years])[order],
+        "team": team.take(order).array,
+        "opponent": opponent.take(order).array,
+        "is_home": (np.arange(2 * n) < n)[order],
+        "gf": np.concatenate([hs, as_])[order],
+        "ga": np.concatenate([as_, hs])[order],
+    }, copy=False)
+
+@timed
+def standings(df: pd.DataFrame, tournament: str | list[str] | None = None,
+              years: list[int] | None = None, date_range: tuple | None = None) -> pd.DataFrame:
+    """
+    League table for every team in one grouped pass: games, W/D/L, GF/GA, GD,
+    points (3/1/0) and win %. Optional filters: tournament name(s), years,
+    and an inclusive (start, end) date range.
+    """
+    mask = np.ones(len(df), dtype=bool)
+    if tournament:
+        names = [tournament] if isinstance(tournament, str) else list(tournament)
+        mask &= df["tournament"].isin(names).to_numpy()
+    if years:
+        mask &= df["year"].isin(years).to_numpy()
+    if date_range:
+        start, end = date_range
+        if start is not None:
+            mask &= (df["date"] >= pd.Timestamp(start)).to_numpy()
+        if end is not None:
+            mask &= (df["date"] <= pd.Timestamp(end)).to_numpy()
+
+    hs = df["home_score"].to_numpy()[mask].astype(np.int64)
+    as_ = df["away_score"].to_numpy()[mask].astype(np.int64)
+    teams = pd.concat([df["home_team"][mask], df["away_team"][mask]], ignore_index=True).astype(str)
+    codes, names = pd.factorize(teams)
+    gf = np.concatenate([hs, as_])
+    ga = np.concatenate([as_, hs])
+    k = len(names)
+
+    games = np.bincount(codes, minlength=k)
+    w = np.bincount(codes, weights=gf > ga, minlength=k).astype(np.int64)
+    d = np.bincount(codes, weights=gf == ga, minlength=k).astype(np.int64)
+    out = pd.DataFrame({
+        "team": np.asarray(names, dtype=object),
+        "games": games,
+        "w": w,
+        "d": d,
+        "l": games - w - d,
+        "gf": np.bincount(codes, weights=gf, minlength=k).astype(np.int64),
+        "ga": np.bincount(codes, weights=ga, minlength=k).astype(np.int64),
+    })
+    out["gd"] = out["gf"] - out["ga"]
+    out["points"] = 3 * out["w"] + out["d"]
+    out["win_pct"] = (out["w"] / out["games"].where(out["games"] > 0, 1) * 100).round(1)
+    out = out.sort_values(["points", "gd", "gf", "team"], ascending=[False, False, False, True])
+    out.insert(0, "rank", np.arange(1, len(out) + 1))
+    return out.reset_index(drop=True)
+
+# Streaks and records (run-length encoding over the team-match table)
+STREAK_KINDS = {
+    "win": lambda gf, ga: gf > ga,
+    "unbeaten": lambda gf, ga: gf >= ga,
+    "winless": lambda gf, ga: gf <= ga,
+    "loss": lambda gf, ga: gf < ga,
+    "clean_sheet": lambda gf, ga: ga == 0,
+    "scoring": lambda gf, ga: gf > 0,
+}
+
+def _group_starts(codes: np.ndarray) -> np.ndarray:
+    return np.flatnonzero(np.r_[True, codes[1:] != codes[:-1]]) if len(codes) else np.array([], dtype=int)
+
+@timed
+def streaks_table(df: pd.DataFrame, tm: pd.DataFrame | None = None) -> pd.DataFrame:
+    """
+    Longest and current run of every STREAK_KINDS condition for every team:
+    team, streak, longest, start, end, current. Runs are found with one
+    run-length encoding per condition over the (team, date)-sorted table.
+    """
+    tm = team_match_table(df) if tm is None else tm
+    team = tm["team"].astype(str).to_numpy()
+    codes, names = pd.factorize(team)  # first-appearance order == sorted order here
+    dates = tm["date"].to_numpy()
+    gf = tm["gf"].to_numpy(dtype=np.int64)
+    ga = tm["ga"].to_numpy(dtype=np.int64)
+    n, k = len(codes), len(names)
+    team_last = np.r_[_group_starts(codes)[1:], n] - 1
+
+    frames = []
+    for kind, cond in STREAK_KINDS.items():
+        flag = cond(gf, ga)
+        new_run = np.r_[True, (codes[1:] != codes[:-1]) | (flag[1:] != flag[:-1])] if n else np.array([], dtype=bool)
+        starts = np.flatnonzero(new_run)
+        ends = np.r_[starts[1:], n] - 1
+        lengths = ends - starts + 1
+        run_of_row = np.cumsum(new_run) - 1
+
+        hits = np.flatnonzero(flag[starts])
+        # longest first, earliest on ties; first run per team wins
+        order = hits[np.lexsort((starts[hits], -lengths[hits], codes[starts[hits]]))]
+        best = order[_group_starts(codes[starts[order]])]
+
+        longest = np.zeros(k, dtype=np.int64)
+        start = np.full(k, np.datetime64("NaT"), dtype="datetime64[ns]")
+        end = start.copy()
+        best_team = codes[starts[best]]
+        longest[best_team] = lengths[best]
+        start[best_team] = dates[starts[best]]
+        end[best_team] = dates[ends[best]]
+
+        last_run = run_of_row[team_last] if n else np.array([], dtype=int)
+        current = np.where(flag[team_last], lengths[last_run], 0) if n else np.zeros(0, dtype=np.int64)
+
+        frames.append(pd.DataFrame({"team": np.asarray(names, dtype=object), "streak": kind,
+                                    "longest": longest, "start": start, "end": end, "current": current}))
+    if not frames:
+        return pd.DataFrame(columns=["team", "streak", "longest", "start", "end", "current"])
+    return pd.concat(frames, ignore_index=True).sort_values(["team", "streak"], kind="stable").reset_index(drop=True)
+
+@timed
+def team_records(df: pd.DataFrame, tm: pd.DataFrame | None = None) -> pd.DataFrame:
+    """
+    Per-team records: biggest_win, heaviest_defeat and most_goals (highest
+    scoring match), each with opponent, date and score; earliest on ties.
+    """
+    tm = team_match_table(df) if tm is None else tm
+    team = tm["team"].astype(str).to_numpy()
+    codes, _ = pd.factorize(team)
+    gf = tm["gf"].to_numpy(dtype=np.int64)
+    ga = tm["ga"].to_numpy(dtype=np.int64)
+    position = np.arange(len(codes))
+    metrics = {"biggest_win": gf - ga, "heaviest_defeat": ga - gf, "most_goals": gf + ga}
+    required = {"biggest_win": gf > ga, "heaviest_defeat": gf < ga, "most_goals": np.ones(len(gf), dtype=bool)}
+
+    frames = []
+    for record, value in metrics.items():
+        rows = np.flatnonzero(required[record])
+        order = rows[np.lexsort((position[rows], -value[rows], codes[rows]))]
+        best = order[_group_starts(codes[order])]
+        frames.append(pd.DataFrame({
+            "team": team[best], "record": record, "value": value[best],
+            "opponent": tm["opponent"].astype(str).to_numpy()[best],
+            "date": tm["date"].to_numpy()[best],
+            "score": [f"{a}-{b}" for a, b in zip(gf[best], ga[best])],
+        }))
+    return pd.concat(frames, ignore_index=True).sort_values(["team", "record"], kind="stable").reset_index(drop=True)
+
+@timed
+def match_records(df: pd.DataFrame, kind: str = "biggest_win", top: int = 10) -> pd.DataFrame:
+    """All-time top matches: 'biggest_win' (goal margin) or 'highest_scoring' (total goals)."""
+    hs = df["home_score"].to_numpy(dtype=np.int64)
+    as_ = df["away_score"].to_numpy(dtype=np.int64)
+    if kind == "biggest_win":
+        value = np.abs(hs - as_)
+    elif kind == "highest_scoring":
+        value = hs + as_
+    else:
+        raise ValueError(f"Unknown record kind: {kind}")
+    idx = np.lexsort((np.arange(len(value)), -value))[:top]
+    cols = [c for c in ("date", "home_team", "away_team", "home_score", "away_score", "tournament") if c in df.columns]
+    out = df.iloc[idx][cols].reset_index(drop=True)
+    out.insert(0, kind, value[idx])
+    return out
+
+# Prefix-sum KPI index
+KPI_FIELDS = ("w", "d", "l", "gf", "ga")
+
+@dataclass(frozen=True)
+class KpiIndex:
+    teams: Dict[str, Tuple[int, int]]  # team -> [start, stop) slice of the arrays below
+    dates: np.ndarray                  # datetime64[ns], sorted within each team slice
+    years: np.ndarray
+    cum: np.ndarray                    # (rows + 1, 5) running totals of KPI_FIELDS
+
+@timed
+def build_kpi_index(df: pd.DataFrame) -> KpiIndex:
+    tm = team_match_table(df)
+    gf = tm["gf"].to_numpy(dtype=np.int64)
+    ga = tm["ga"].to_numpy(dtype=np.int64)
+    vals = np.column_stack([gf > ga, gf == ga, gf < ga, gf, ga]).astype(np.int64)
+    cum = np.zeros((len(tm) + 1, len(KPI_FIELDS)), dtype=np.int64)
+    np.cumsum(vals, axis=0, out=cum[1:])
+
+    team = tm["team"].astype(str).to_numpy()
+    starts = np.flatnonzero(np.r_[True, team[1:] != team[:-1]]) if len(team) else np.array([], dtype=int)
+    stops = np.r_[starts[1:], len(team)]
+    teams = {str(team[a]): (int(a), int(b)) for a, b in zip(starts, stops)}
+    return KpiIndex(teams=teams,
+                    dates=tm["date"].to_numpy(dtype="datetime64[ns]"),
+                    years=tm["year"].to_numpy(dtype=np.int64),
+                    cum=cum)
+
+def _merge_slices(slices: Dict[str, Tuple[int, int]], new_slices: Dict[str, Tuple[int, int]],
+                  n_old: int) -> Tuple[Dict[str, Tuple[int, int]], np.ndarray]:
+    """
+    Slices over old rows followed by new rows (positions offset by n_old), each
+    key's new rows right after its old ones, keys sorted. Also returns the
+    row order into the concatenated arrays.
+    """
+    merged: Dict[str, Tuple[int, int]] = {}
+    take = []
+    pos = 0
+    for key in sorted(slices.keys() | new_slices.keys()):
+        a, b = slices.get(key, (0, 0))
+        c, d = new_slices.get(key, (0, 0))
+        take += [np.arange(a, b), np.arange(n_old + c, n_old + d)]
+        merged[key] = (pos, pos + (b - a) + (d - c))
+        pos = merged[key][1]
+    return merged, (np.concatenate(take) if take else np.array([], dtype=int))
+
+@timed
+def extend_kpi_index(index: KpiIndex, df_new: pd.DataFrame) -> KpiIndex:
+    """build_kpi_index over the indexed matches plus df_new, dated no earlier than any of them."""
+    new = build_kpi_index(df_new)
+    teams, take = _merge_slices(index.teams, new.teams, len(index.dates))
+    vals = np.concatenate([np.diff(index.cum, axis=0), np.diff(new.cum, axis=0)])[take]
+    cum = np.zeros((len(take) + 1, len(KPI_FIELDS)), dtype=np.int64)
+    np.cumsum(vals, axis=0, out=cum[1:])
+    return KpiIndex(teams=teams,
+                    dates=np.concatenate([index.dates, new.dates])[take],
+                    years=np.concatenate([index.years, new.years])[take],
+                    cum=cum)
+
+def _kpis_from_slice(index: KpiIndex, lo: int, hi: int) -> dict:
+    w, d, l, gf, ga = (int(x) for x in index.cum[hi] - index.cum[lo])
+    n = hi - lo
+    win_pct = round((w / n) * 100, 1) if n else 0.0
+    return {"games": n, "w": w, "d": d, "l": l, "gf": gf, "ga": ga, "win_pct": win_pct}
+
+def kpis_in_range(index: KpiIndex, team: str, start=None, end=None) -> dict:
+    """Same output as kpis() for the team's matches with start <= date <= end (bounds optional)."""
+    a, b = index.teams.get(team, (0, 0))
+    dates = index.dates[a:b]
+    lo = a + (np.searchsorted(dates, np.datetime64(pd.Timestamp(start), "ns"), side="left") if start is not None else 0)
+    hi = a + (np.searchsorted(dates, np.datetime64(pd.Timestamp(end), "ns"), side="right") if end is not None else b - a)
+    return _kpis_from_slice(index, int(lo), int(max(lo, hi)))
+
+def kpis_in_years(index: KpiIndex, team: str, first_year: int | None = None, last_year: int | None = None) -> dict:
+    """Same output as kpis() for the team's matches with first_year <= year <= last_year."""
+    a, b = index.teams.get(team, (0, 0))
+    years = index.years[a:b]
+    lo = a + (np.searchsorted(years, first_year, side="left") if first_year is not None else 0)
+    hi = a + (np.searchsorted(years, last_year, side="right") if last_year is not None else b - a)
+    return _kpis_from_slice(index, int(lo), int(max(lo, hi)))
+
+def contiguous_year_range(years: list[int] | None) -> Tuple[int, int] | None:
+    """(first, last) if the selected years form one unbroken range, else None."""
+    if not years:
+        return None
+    ys = sorted(set(int(y) for y in years))
+    if ys[-1] - ys[0] + 1 != len(ys):
+        return None
+    return ys[0], ys[-1]
+
+# Per-team rolling tables: the app's default match-count windows for every team
+ROLLING_WINDOWS = {"rolling_form": 5, "rolling_gd": 5, "rolling_win_pct": 10}
+
+@dataclass(frozen=True)
+class RollingTables:
+    teams: Dict[str, Tuple[int, int]]  # team -> [start, stop) slice of the arrays below
+    dates: np.ndarray                  # datetime64[ns], match order within each team slice
+    gf: np.ndarray
+    ga: np.ndarray
+    rolling: Dict[str, np.ndarray]     # ROLLING_WINDOWS column -> per-row rolling mean
+
+def _slice_rolling_mean(starts: np.ndarray, values: np.ndarray, window: int) -> np.ndarray:
+    # mean of the last `window` values within each row's team slice (min_periods=1)
+    csum = np.concatenate(([0.0], np.cumsum(values)))
+    hi = np.arange(1, len(values) + 1)
+    lo = np.maximum(starts, hi - window)
+    return (csum[hi] - csum[lo]) / (hi - lo)
+
+def _rolling_tables(teams: Dict[str, Tuple[int, int]], dates: np.ndarray,
+                    gf: np.ndarray, ga: np.ndarray) -> RollingTables:
+    starts = np.zeros(len(dates), dtype=np.int64)
+    for a, b in teams.values():
+        starts[a:b] = a
+    points = np.where(gf > ga, 1.0, np.where(gf < ga, 0.0, 0.5))
+    values = {"rolling_form": points, "rolling_gd": (gf - ga).astype(float), "rolling_win_pct": (gf > ga) * 1.0}
+    rolling = {c: _slice_rolling_mean(starts, values[c], w) for c, w in ROLLING_WINDOWS.items()}
+    rolling["rolling_win_pct"] *= 100.0  # as rolling_win_pct: mean first, then percent
+    return RollingTables(teams=teams, dates=dates, gf=gf, ga=ga, rolling=rolling)
+
+@timed
+def build_rolling_tables(df: pd.DataFrame) -> RollingTables:
+    tm = team_match_table(df)
+    team = tm["team"].astype(str).to_numpy()
+    starts = np.flatnonzero(np.r_[True, team[1:] != team[:-1]]) if len(team) else np.array([], dtype=int)
+    stops = np.r_[starts[1:], len(team)]
+    return _rolling_tables({str(team[a]): (int(a), int(b)) for a, b in zip(starts, stops)},
+                           tm["date"].to_numpy(dtype="datetime64[ns]"),
+                           tm["gf"].to_numpy(dtype=np.int64), tm["ga"].to_numpy(dtype=np.int64))
+
+@timed
+def extend_rolling_tables(tables: RollingTables, df_new: pd.DataFrame) -> RollingTables:
+    """build_rolling_tables over the tabled matches plus df_new, dated no earlier than any of them."""
+    new = build_rolling_tables(df_new)
+    teams, take = _merge_slices(tables.teams, new.teams, len(tables.dates))
+    return _rolling_tables(teams, np.concatenate([tables.dates, new.dates])[take],
+                           np.concatenate([tables.gf, new.gf])[take], np.concatenate([tables.ga, new.ga])[take])
+
+def team_rolling(tables: RollingTables, team: str) -> Tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame]:
+    """
+    rolling_form, rolling_goal_diff and rolling_win_pct of team_perspective(df,
+    team) at the ROLLING_WINDOWS sizes, read from the precomputed tables.
+    """
+    a, b = tables.teams.get(team, (0, 0))
+    dates = pd.Series(tables.dates[a:b])
+    gf, ga = tables.gf[a:b], tables.ga[a:b]
+    result = pd.Series(_results(gf, ga))
+    rf = pd.DataFrame({"date": dates, "result": result, "points": result.map({"W": 1.0, "D": 0.5, "L": 0.0}),
+                       "rolling_form": tables.rolling["rolling_form"][a:b]})
+    rgd = pd.DataFrame({"date": dates, "gd": (gf - ga).astype(float), "rolling_gd": tables.rolling["rolling_gd"][a:b]})
+    rwp = pd.DataFrame({"date": dates, "result": result, "win": (gf > ga).astype(int),
+                        "rolling_win_pct": tables.rolling["rolling_win_pct"][a:b]})
+    return rf, rgd, rwp
+
+# Sparse (team, opponent, year) head-to-head cube
+H2H_FIELDS = ("games", "w", "d", "l", "gf", "ga")
+
+@dataclass(frozen=True)
+class H2HCube:
+    pairs: Dict[Tuple[str, str], Tuple[int, int]]  # (team, opponent) -> [start, stop) slice
+    years: np.ndarray                              # sorted, unique within each pair slice
+    cum: np.ndarray                                # (rows + 1, 6) running totals of H2H_FIELDS
+
+def h2h_cube_from_counts(counts: pd.DataFrame) -> H2HCube:
+    """
+    Build the cube from per-(team, opponent, year) totals with the H2H_FIELDS
+    columns, e.g. the 'h2h_year_counts' named query.
+    """
+    counts = counts.sort_values(["team", "opponent", "year"], kind="stable")
+    team = counts["team"].astype(str).to_numpy()
+    opp = counts["opponent"].astype(str).to_numpy()
+    cum = np.zeros((len(counts) + 1, len(H2H_FIELDS)), dtype=np.int64)
+    np.cumsum(counts[list(H2H_FIELDS)].to_numpy(dtype=np.int64), axis=0, out=cum[1:])
+
+    if len(counts):
+        new_pair = np.r_[True, (team[1:] != team[:-1]) | (opp[1:] != opp[:-1])]
+        starts = np.flatnonzero(new_pair)
+    else:
+        starts = np.array([], dtype=int)
+    stops = np.r_[starts[1:], len(counts)]
+    pairs = {(str(team[a]), str(opp[a])): (int(a), int(b)) for a, b in zip(starts, stops)}
+    return H2HCube(pairs=pairs, years=counts["year"].to_numpy(dtype=np.int64), cum=cum)
+
+@timed
+def build_h2h_cube(df: pd.DataFrame) -> H2HCube:
+    tm = team_match_table(df)
+    gf = tm["gf"].to_numpy(dtype=np.int64)
+    ga = tm["ga"].to_numpy(dtype=np.int64)
+    counts = pd.DataFrame({
+        "team": tm["team"].astype(str).to_numpy(),
+        "opponent": tm["opponent"].astype(str).to_numpy(),
+        "year": tm["year"].to_numpy(dtype=np.int64),
+        "games": 1, "w": (gf > ga).astype(np.int64), "d": (gf == ga).astype(np.int64),
+        "l": (gf < ga).astype(np.int64), "gf": gf, "ga": ga,
+    })
+    counts = counts.groupby(["team", "opponent", "year"], sort=True, as_index=False).sum()
+    return h2h_cube_from_counts(counts)
+
+def h2h_lookup(cube: H2HCube, team: str, opponent: str,
+               first_year: int | None = None, last_year: int | None = None) -> dict:
+    """Same output as kpis() for team vs opponent with first_year <= year <= last_year."""
+    a, b = cube.pairs.get((team, opponent), (0, 0))
+    years = cube.years[a:b]
+    lo = a + (np.searchsorted(years, first_year, side="left") if first_year is not None else 0)
+    hi = a + (np.searchsorted(years, last_year, side="right") if last_year is not None else b - a)
+    hi = max(lo, hi)
+    games, w, d, l, gf, ga = (int(x) for x in cube.cum[hi] - cube.cum[lo])
+    win_pct = round((w / games) * 100, 1) if games else 0.0
+    return {"games": games, "w": w, "d": d, "l": l, "gf": gf, "ga": ga, "win_pct": win_pct}
 
 # H2H summary
+@timed
 def h2h_summary_table(df_team_filtered: pd.DataFrame) -> pd.DataFrame:
     k = kpis(df_team_filtered)
     out = pd.DataFrame([{
@@ -95,51 +544,267 @@ def h2h_summary_table(df_team_filtered: pd.DataFrame) -> pd.DataFrame:
     return out
 
 # Elo model
+def _elo_history(enc, out: Dict[str, np.ndarray], first_seq: int = 0) -> pd.DataFrame:
+    n = len(enc.home)
+    return pd.DataFrame({
+        "seq": np.repeat(np.arange(first_seq, first_seq + n), 2),
+        "date": np.repeat(enc.dates, 2),
+        "team": enc.teams[np.column_stack([enc.home, enc.away]).ravel()],
+        "rating_before": np.column_stack([out["pre_home"][0], out["pre_away"][0]]).ravel(),
+        "rating": np.column_stack([out["post_home"][0], out["post_away"][0]]).ravel(),
+    })
+
+def _final_ratings(ratings_history: pd.DataFrame) -> pd.DataFrame:
+    final_ratings = ratings_history.groupby("team", sort=False).tail(1)[["team","rating"]]
+    return final_ratings.sort_values("rating", ascending=False, kind="stable").reset_index(drop=True)
+
+@timed
 def compute_elo(df: pd.DataFrame,
                 base_rating: float = 1500.0,
                 k_factor: float = 20.0,
                 home_advantage: float = 50.0) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    # Baseline Elo through the single-pass engine in src.ratings
+    # (home advantage applied on every ground, as before).
+    model = RatingModel("rating", k_factor=k_factor, home_advantage=home_advantage)
+    enc = encode_matches(df)
+    ratings_history = _elo_history(enc, run_rating_models(enc, [model], base_rating))
+    return ratings_history, _final_ratings(ratings_history)
 
+@timed
+def extend_elo(ratings_history: pd.DataFrame, final_ratings: pd.DataFrame, df_new: pd.DataFrame,
+               base_rating: float = 1500.0,
+               k_factor: float = 20.0,
+               home_advantage: float = 50.0) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    compute_elo's output for the old matches plus df_new, when no match in
+    df_new is dated before the last one already rated. Only df_new is run,
+    starting from final_ratings.
+    """
+    model = RatingModel("rating", k_factor=k_factor, home_advantage=home_advantage)
+    enc = encode_matches(df_new)
+    current = dict(zip(final_ratings["team"].astype(str), final_ratings["rating"]))
+    initial = np.array([[current.get(t, base_rating) for t in enc.teams]])
+    new_history = _elo_history(enc, run_rating_models(enc, [model], base_rating, initial),
+                               first_seq=int(ratings_history["seq"].iloc[-1]) + 1 if len(ratings_history) else 0)
+    ratings_history = pd.concat([ratings_history, new_history], ignore_index=True)
+    return ratings_history, _final_ratings(ratings_history)
 
-    df = df.sort_values("date").reset_index(drop=True).copy()
-    teams = pd.unique(pd.concat([df["home_team"], df["away_team"]], ignore_index=True)).tolist()
+def team_elo_trend(ratings_history: pd.DataFrame, team: str) -> pd.DataFrame:
+    if ratings_history.empty:
+        return ratings_history.copy()
+    out = ratings_history[ratings_history["team"] == team][["date","rating"]].sort_values("date", kind="stable").reset_index(drop=True)
+    return out
 
-    rating: Dict[str, float] = {t: float(base_rating) for t in teams}
-    hist_rows = []
+# Point-in-time Elo store: per-team columnar slices of the rating history
+@dataclass(frozen=True)
+class EloStore:
+    teams: Dict[str, Tuple[int, int]]  # team -> [start, stop) slice of the arrays below
+    dates: np.ndarray                  # datetime64[ns], match order within each team slice
+    rating_before: np.ndarray          # float32, pre-match rating
+    rating: np.ndarray                 # float32, post-match rating
+    base_rating: float = 1500.0
 
-    for _, r in df.iterrows():
-        ht = str(r["home_team"]); at = str(r["away_team"])
-        hs = int(r["home_score"]); as_ = int(r["away_score"])
+@timed
+def build_elo_store(ratings_history: pd.DataFrame, base_rating: float = 1500.0) -> EloStore:
+    """
+    Accepts the ratings_history of compute_elo (or the elo_history table read
+    back from SQLite). Rows are regrouped by team, keeping match order.
+    """
+    team = ratings_history["team"].astype(str).to_numpy()
+    seq = ratings_history["seq"].to_numpy() if "seq" in ratings_history.columns else np.arange(len(team))
+    codes, names = pd.factorize(team, sort=True)
+    order = np.lexsort((seq, codes))
+    codes = codes[order]
+    starts = np.flatnonzero(np.r_[True, codes[1:] != codes[:-1]]) if len(codes) else np.array([], dtype=int)
+    stops = np.r_[starts[1:], len(codes)]
+    teams = {str(names[codes[a]]): (int(a), int(b)) for a, b in zip(starts, stops)}
+    before = ratings_history["rating_before"] if "rating_before" in ratings_history.columns else ratings_history["rating"]
+    return EloStore(
+        teams=teams,
+        dates=pd.to_datetime(ratings_history["date"]).to_numpy(dtype="datetime64[ns]")[order],
+        rating_before=before.to_numpy(dtype=np.float32)[order],
+        rating=ratings_history["rating"].to_numpy(dtype=np.float32)[order],
+        base_rating=float(base_rating),
+    )
 
-        rh = rating[ht]; ra = rating[at]
+@timed
+def extend_elo_store(store: EloStore, new_history: pd.DataFrame) -> EloStore:
+    """build_elo_store over the stored history plus new_history (later seq, e.g. from extend_elo)."""
+    new = build_elo_store(new_history, store.base_rating)
+    teams, take = _merge_slices(store.teams, new.teams, len(store.dates))
+    return EloStore(
+        teams=teams,
+        dates=np.concatenate([store.dates, new.dates])[take],
+        rating_before=np.concatenate([store.rating_before, new.rating_before])[take],
+        rating=np.concatenate([store.rating, new.rating])[take],
+        base_rating=store.base_rating,
+    )
 
-        e_home = 1.0 / (1.0 + 10.0 ** ((ra - (rh + home_advantage)) / 400.0))
-        e_away = 1.0 - e_home
+def elo_trend(store: EloStore, team: str, start=None, end=None) -> pd.DataFrame:
+    """Same shape as team_elo_trend(), optionally limited to start <= date <= end."""
+    a, b = store.teams.get(team, (0, 0))
+    dates = store.dates[a:b]
+    lo = np.searchsorted(dates, np.datetime64(pd.Timestamp(start), "ns"), side="left") if start is not None else 0
+    hi = np.searchsorted(dates, np.datetime64(pd.Timestamp(end), "ns"), side="right") if end is not None else b - a
+    return pd.DataFrame({"date": dates[lo:hi], "rating": store.rating[a + lo:a + hi].astype(float)})
 
-        # Actual scores
-        if hs > as_:
-            s_home, s_away = 1.0, 0.0
-        elif hs < as_:
-            s_home, s_away = 0.0, 1.0
-        else:
-            s_home, s_away = 0.5, 0.5
+def elo_rating_at(store: EloStore, team: str, when) -> float:
+    """
+    Rating a team takes into a match on `when`: the post-match rating of its
+    last match strictly before that date, or base_rating if it had none.
+    """
+    a, b = store.teams.get(team, (0, 0))
+    i = int(np.searchsorted(store.dates[a:b], np.datetime64(pd.Timestamp(when), "ns"), side="left"))
+    if i == 0:
+        return store.base_rating
+    return float(store.rating[a + i - 1])
 
-        # Update ratings
-        rh_new = rh + k_factor * (s_home - e_home)
-        ra_new = ra + k_factor * (s_away - e_away)
-        rating[ht], rating[at] = rh_new, ra_new
+@timed
+def elo_leaderboard_as_of(store: EloStore, as_of, top: int = 20) -> pd.DataFrame:
+    """Top teams by rating after all matches played on or before `as_of`."""
+    ts = np.datetime64(pd.Timestamp(as_of), "ns")
+    rows = []
+    for team, (a, b) in store.teams.items():
+        i = int(np.searchsorted(store.dates[a:b], ts, side="right"))
+        if i:
+            rows.append((team, float(store.rating[a + i - 1]), store.dates[a + i - 1], i))
+    out = pd.DataFrame(rows, columns=["team", "rating", "last_match", "games"])
+    out = out.sort_values(["rating", "team"], ascending=[False, True]).head(top).reset_index(drop=True)
+    out["last_match"] = pd.to_datetime(out["last_match"])
+    return out
 
-        # Record history (post-match ratings)
-        hist_rows.append({"date": r["date"], "team": ht, "rating": rh_new})
-        hist_rows.append({"date": r["date"], "team": at, "rating": ra_new})
+# Opponent-strength adjusted KPIs: actual vs expected points from pre-match Elo
+@timed
+def match_expectations(df: pd.DataFrame, ratings_history: pd.DataFrame,
+                       home_advantage: float = 50.0, base_rating: float = 1500.0) -> pd.DataFrame:
+    """
+    team_match_table(df) plus elo / opp_elo (each side's rating after its last
+    match strictly before the date, joined with one merge_asof), W/D/L
+    probabilities, actual points (3/1/0) and expected points xpts. Home
+    advantage is skipped on neutral grounds.
+    """
+    tm = team_match_table(df)
+    n = len(tm)
+    hist = pd.DataFrame({
+        "date": pd.to_datetime(ratings_history["date"]).to_numpy(dtype="datetime64[ns]"),
+        "key": ratings_history["team"].astype(str).to_numpy(),
+        "seq": ratings_history["seq"].to_numpy() if "seq" in ratings_history.columns else np.arange(len(ratings_history)),
+        "rating": ratings_history["rating"].to_numpy(dtype=float),
+    }, copy=False).sort_values(["date", "seq"], kind="stable")
 
-    ratings_history = pd.DataFrame(hist_rows)
-    final_ratings = ratings_history.sort_values("date").groupby("team").tail(1)[["team","rating"]].reset_index(drop=True)
-    final_ratings = final_ratings.sort_values("rating", ascending=False).reset_index(drop=True)
-    return ratings_history, final_ratings
+    # team and opponent lookups stacked into a single as-of join
+    dates = tm["date"].to_numpy(dtype="datetime64[ns]")
+    left = pd.DataFrame({
+        "date": np.concatenate([dates, dates]),
+        "key": np.concatenate([tm["team"].astype(str).to_numpy(), tm["opponent"].astype(str).to_numpy()]),
+        "pos": np.arange(2 * n),
+    }, copy=False).sort_values("date", kind="stable")
+    joined = pd.merge_asof(left, hist[["date", "key", "rating"]], on="date", by="key",
+                           allow_exact_matches=False)
+    pre = np.empty(2 * n)
+    pre[joined["pos"].to_numpy()] = joined["rating"].fillna(base_rating).to_numpy()
 
-def team_elo_trend(ratings_history: pd.DataFrame, team: str) -> pd.DataFrame:
-    if ratings_history.empty:
-        return ratings_history.copy()
-    out = ratings_history[ratings_history["team"] == team][["date","rating"]].sort_values("date").reset_index(drop=True)
-    return out
+    is_home = tm["is_home"].to_numpy()
+    if "neutral" in df.columns:
+        neutral = df["neutral"].fillna(False).astype(bool).to_numpy()[tm["match_idx"].to_numpy()]
+    else:
+        neutral = np.zeros(n, dtype=bool)
+    ha = np.where(neutral, 0.0, np.where(is_home, home_advantage, -home_advantage))
+    p_win, p_draw, p_loss = match_probabilities(pre[:n], pre[n:], ha)
+    gf, ga = tm["gf"].to_numpy(), tm["ga"].to_numpy()
+
+    tm["elo"] = pre[:n]
+    tm["opp_elo"] = pre[n:]
+    tm["p_win"] = p_win
+    tm["p_draw"] = p_draw
+    tm["p_loss"] = p_loss
+    tm["pts"] = np.where(gf > ga, 3, np.where(gf == ga, 1, 0))
+    tm["xpts"] = 3.0 * p_win + p_draw
+    return tm
+
+def adjusted_kpis(expectations: pd.DataFrame) -> dict:
+    """Like kpis() for any slice of match_expectations (e.g. one team, filtered)."""
+    n = len(expectations)
+    pts = int(expectations["pts"].sum()) if n else 0
+    xpts = float(expectations["xpts"].sum()) if n else 0.0
+    return {
+        "games": n,
+        "pts": pts,
+        "xpts": round(xpts, 1),
+        "poe": round(pts - xpts, 1),
+        "poe_per_game": round((pts - xpts) / n, 2) if n else 0.0,
+        "avg_opp_elo": round(float(expectations["opp_elo"].mean()), 0) if n else 0.0,
+    }
+
+@timed
+def adjusted_kpis_table(expectations: pd.DataFrame, min_games: int = 1) -> pd.DataFrame:
+    """adjusted_kpis for every team at once, sorted by points over expectation."""
+    codes, names = pd.factorize(expectations["team"].astype(str), sort=True)
+    k = len(names)
+    games = np.bincount(codes, minlength=k)
+    pts = np.bincount(codes, weights=expectations["pts"].to_numpy(dtype=float), minlength=k)
+    xpts = np.bincount(codes, weights=expectations["xpts"].to_numpy(dtype=float), minlength=k)
+    opp = np.bincount(codes, weights=expectations["opp_elo"].to_numpy(dtype=float), minlength=k)
+    safe = np.maximum(games, 1)
+    out = pd.DataFrame({
+        "team": np.asarray(names, dtype=object),
+        "games": games,
+        "pts": pts.astype(np.int64),
+        "xpts": xpts.round(1),
+        "poe": (pts - xpts).round(1),
+        "poe_per_game": ((pts - xpts) / safe).round(2),
+        "avg_opp_elo": (opp / safe).round(0),
+    })
+    out = out[out["games"] >= min_games]
+    return out.sort_values(["poe", "team"], ascending=[False, True]).reset_index(drop=True)
+
+# Poisson goal model (Dixon–Coles), fit by src.poisson
+@timed
+def fit_goal_model(df: pd.DataFrame, half_life_years: float | None = None, as_of=None,
+                   l2: float = 1.0) -> PoissonModel:
+    """
+    Attack/defence strengths from matches played on or before `as_of`
+    (default: all). With half_life_years, a match's weight halves every
+    half_life_years before the last match date used.
+    """
+    if as_of is not None:
+        df = df[(df["date"] <= pd.Timestamp(as_of)).to_numpy()]
+    enc = encode_matches(df)
+    ref = enc.dates[-1] if len(enc.dates) else np.datetime64("NaT", "ns")
+    return fit_poisson(enc, decay_weights(enc.dates, ref, half_life_years), l2=l2)
+
+def _team_code(model: PoissonModel, team: str) -> int:
+    i = int(np.searchsorted(model.teams, team))
+    if i >= len(model.teams) or model.teams[i] != team:
+        raise ValueError(f"Unknown team for goal model: {team}")
+    return i
+
+def goal_model_strengths(model: PoissonModel) -> pd.DataFrame:
+    """team, attack, defence, overall (attack + defence), strongest first."""
+    out = pd.DataFrame({
+        "team": model.teams,
+        "attack": model.attack.round(3),
+        "defence": model.defence.round(3),
+        "overall": (model.attack + model.defence).round(3),
+    })
+    return out.sort_values("overall", ascending=False, kind="stable").reset_index(drop=True)
+
+def scoreline_probabilities(model: PoissonModel, home: str, away: str, neutral: bool = False,
+                            max_goals: int = 10) -> pd.DataFrame:
+    """Exact-score matrix: index = home goals, columns = away goals."""
+    m = score_matrix(model, _team_code(model, home), _team_code(model, away), neutral, max_goals)
+    goals = pd.RangeIndex(max_goals + 1)
+    return pd.DataFrame(m, index=goals.rename("home_goals"), columns=goals.rename("away_goals"))
+
+def fixture_outcome_probabilities(model: PoissonModel, home: str, away: str, neutral: bool = False,
+                                  max_goals: int = 10) -> dict:
+    h, a = _team_code(model, home), _team_code(model, away)
+    m = score_matrix(model, h, a, neutral, max_goals)
+    xg_home, xg_away = expected_goals(model, h, a, neutral)
+    return {
+        "home_win": float(np.tril(m, -1).sum()),
+        "draw": float(np.trace(m)),
+        "away_win": float(np.triu(m, 1).sum()),
+        "exp_home_goals": round(xg_home, 2),
+        "exp_away_goals": round(xg_away, 2),
+    }
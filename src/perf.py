@@ -0,0 +1,167 @@
+# src/perf.py
+# Lightweight instrumentation: named timers (context manager / decorator) and
+# counters, aggregated process-wide, plus an optional per-run recording of
+# every timed call (the app records one per Streamlit rerun). When disabled,
+# timer() returns a shared no-op context and decorated functions cost one
+# flag check. Enable with enable() or RESULTS_PERF=1.
+
+from __future__ import annotations
+import contextvars
+import functools
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from typing import Callable, Dict, Iterator, List
+
+_enabled = os.environ.get("RESULTS_PERF", "").strip() not in ("", "0")
+_lock = threading.Lock()
+_timers: Dict[str, List[float]] = {}  # name -> [count, total_s, max_s]
+_counters: Dict[str, float] = {}
+_recording: contextvars.ContextVar["Recording | None"] = contextvars.ContextVar("perf_recording", default=None)
+_NULL = nullcontext()
+
+class Recording:
+    """Timed calls made in one context (thread / rerun), in completion order."""
+    def __init__(self) -> None:
+        self.events: List[dict] = []
+        self.depth = 0
+        self.started = time.perf_counter()
+        self.seconds = 0.0
+
+def enable(flag: bool = True) -> None:
+    global _enabled
+    _enabled = bool(flag)
+
+def is_enabled() -> bool:
+    return _enabled
+
+def reset() -> None:
+    with _lock:
+        _timers.clear()
+        _counters.clear()
+
+def _observe(name: str, seconds: float) -> None:
+    with _lock:
+        t = _timers.get(name)
+        if t is None:
+            _timers[name] = [1, seconds, seconds]
+        else:
+            t[0] += 1
+            t[1] += seconds
+            if seconds > t[2]:
+                t[2] = seconds
+
+@contextmanager
+def _timing(name: str) -> Iterator[None]:
+    rec = _recording.get()
+    if rec is not None:
+        rec.depth += 1
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        seconds = time.perf_counter() - t0
+        _observe(name, seconds)
+        if rec is not None:
+            rec.depth -= 1
+            rec.events.append({"name": name, "seconds": seconds, "depth": rec.depth})
+
+def timer(name: str):
+    """with timer("sql.run_query"): ...  (no-op when disabled)"""
+    return _timing(name) if _enabled else _NULL
+
+def timed(name: str | Callable | None = None):
+    """
+    Decorator timing every call under `name` (default: "<module>.<function>").
+    Usable bare (@timed) or with a name (@timed("metrics.elo")).
+    """
+    def wrap(fn: Callable, label: str | None) -> Callable:
+        label = label or f"{fn.__module__.rsplit('.', 1)[-1]}.{fn.__name__}"
+
+        @functools.wraps(fn)
+        def inner(*args, **kwargs):
+            if not _enabled:
+                return fn(*args, **kwargs)
+            with _timing(label):
+                return fn(*args, **kwargs)
+        return inner
+
+    if callable(name):
+        return wrap(name, None)
+    return lambda fn: wrap(fn, name)
+
+def count(name: str, n: float = 1) -> None:
+    if not _enabled:
+        return
+    with _lock:
+        _counters[name] = _counters.get(name, 0) + n
+
+def start_recording() -> tuple[Recording, contextvars.Token]:
+    rec = Recording()
+    return rec, _recording.set(rec)
+
+def stop_recording(rec: Recording, token: contextvars.Token) -> Recording:
+    rec.seconds = time.perf_counter() - rec.started
+    _recording.reset(token)
+    return rec
+
+@contextmanager
+def record() -> Iterator[Recording]:
+    """Collect the timed calls made inside the block (see Recording)."""
+    rec, token = start_recording()
+    try:
+        yield rec
+    finally:
+        stop_recording(rec, token)
+
+def breakdown(rec: Recording) -> List[dict]:
+    """Per-name calls / total / max (ms) for one recording, slowest first."""
+    agg: Dict[str, dict] = {}
+    for e in rec.events:
+        row = agg.setdefault(e["name"], {"name": e["name"], "calls": 0, "total_ms": 0.0, "max_ms": 0.0,
+                                         "depth": e["depth"]})
+        row["calls"] += 1
+        row["total_ms"] += e["seconds"] * 1000.0
+        row["max_ms"] = max(row["max_ms"], e["seconds"] * 1000.0)
+        row["depth"] = min(row["depth"], e["depth"])
+    rows = sorted(agg.values(), key=lambda r: r["total_ms"], reverse=True)
+    for r in rows:
+        r["total_ms"] = round(r["total_ms"], 3)
+        r["max_ms"] = round(r["max_ms"], 3)
+    return rows
+
+def snapshot() -> dict:
+    """Process-wide totals since start / reset()."""
+    with _lock:
+        timers = {k: {"count": int(v[0]), "total_s": round(v[1], 6), "max_s": round(v[2], 6)}
+                  for k, v in sorted(_timers.items())}
+        counters = dict(sorted(_counters.items()))
+    return {"enabled": _enabled, "timers": timers, "counters": counters}
+
+def to_json(snap: dict | None = None) -> str:
+    return json.dumps(snap or snapshot(), indent=2)
+
+def _label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+def to_prometheus(snap: dict | None = None, prefix: str = "results") -> str:
+    """Prometheus text exposition format (timers as summaries without quantiles)."""
+    snap = snap or snapshot()
+    lines = [
+        f"# HELP {prefix}_call_seconds Wall time of instrumented calls.",
+        f"# TYPE {prefix}_call_seconds summary",
+    ]
+    for name, t in snap["timers"].items():
+        lines.append(f'{prefix}_call_seconds_sum{{name="{_label(name)}"}} {t["total_s"]}')
+        lines.append(f'{prefix}_call_seconds_count{{name="{_label(name)}"}} {t["count"]}')
+    lines += [f"# HELP {prefix}_call_seconds_max Slowest single call.",
+              f"# TYPE {prefix}_call_seconds_max gauge"]
+    for name, t in snap["timers"].items():
+        lines.append(f'{prefix}_call_seconds_max{{name="{_label(name)}"}} {t["max_s"]}')
+    lines += [f"# HELP {prefix}_events_total Instrumented counters.",
+              f"# TYPE {prefix}_events_total counter"]
+    for name, v in snap["counters"].items():
+        lines.append(f'{prefix}_events_total{{name="{_label(name)}"}} {v}')
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,186 @@
+# src/poisson.py
+# Dixon–Coles style Poisson goal model: per-team attack/defence strengths,
+# home advantage and a low-score correction (rho), fit by maximum likelihood
+# with an optional exponential time decay. The log-likelihood and its
+# gradient are fully vectorized; a compact L-BFGS minimizes them.
+
+from __future__ import annotations
+from dataclasses import dataclass
+from typing import Callable, Tuple
+import numpy as np
+from src.ratings import EncodedMatches
+
+@dataclass(frozen=True)
+class PoissonModel:
+    teams: np.ndarray      # team names; attack/defence index into this
+    attack: np.ndarray
+    defence: np.ndarray
+    intercept: float       # log of the mean goals of an average side on neutral ground
+    home_advantage: float  # added to the home side's log-rate off neutral grounds
+    rho: float             # Dixon–Coles correction for 0-0, 1-0, 0-1, 1-1
+    log_likelihood: float
+    iterations: int
+
+def decay_weights(dates: np.ndarray, as_of: np.datetime64, half_life_years: float | None) -> np.ndarray:
+    if not half_life_years:
+        return np.ones(len(dates))
+    age_years = (as_of - dates) / np.timedelta64(1, "D") / 365.25
+    return 0.5 ** (age_years / half_life_years)
+
+def _tau(x: np.ndarray, y: np.ndarray, lam: np.ndarray, mu: np.ndarray, rho: float) -> np.ndarray:
+    tau = np.ones(len(x))
+    m00 = (x == 0) & (y == 0)
+    m01 = (x == 0) & (y == 1)
+    m10 = (x == 1) & (y == 0)
+    m11 = (x == 1) & (y == 1)
+    tau[m00] = 1.0 - lam[m00] * mu[m00] * rho
+    tau[m01] = 1.0 + lam[m01] * rho
+    tau[m10] = 1.0 + mu[m10] * rho
+    tau[m11] = 1.0 - rho
+    return tau
+
+def _objective(enc: EncodedMatches, weights: np.ndarray, l2: float) -> Callable[[np.ndarray], Tuple[float, np.ndarray]]:
+    """
+    Negative penalized log-likelihood per unit weight and its gradient.
+    Parameter vector: [intercept, home_advantage, rho, attack (k), defence (k)].
+    """
+    k = len(enc.teams)
+    h, a = enc.home, enc.away
+    x, y = enc.home_score.astype(float), enc.away_score.astype(float)
+    at_home = (~enc.neutral).astype(float)
+    m00 = (x == 0) & (y == 0)
+    m01 = (x == 0) & (y == 1)
+    m10 = (x == 1) & (y == 0)
+    m11 = (x == 1) & (y == 1)
+    total = weights.sum()
+
+    def f(theta: np.ndarray) -> Tuple[float, np.ndarray]:
+        c, ha, rho = theta[0], theta[1], theta[2]
+        att, dfc = theta[3:3 + k], theta[3 + k:]
+        log_lam = c + ha * at_home + att[h] - dfc[a]
+        log_mu = c + att[a] - dfc[h]
+        lam, mu = np.exp(log_lam), np.exp(log_mu)
+        tau = _tau(x, y, lam, mu, rho)
+        if (tau <= 0).any():
+            return np.inf, np.zeros_like(theta)
+
+        # constant log(x!) terms are dropped; they do not move the optimum
+        ll = weights * (x * log_lam - lam + y * log_mu - mu + np.log(tau))
+        penalty = 0.5 * l2 * (att @ att + dfc @ dfc)
+        value = -(ll.sum() - penalty) / total
+
+        d_tau_lam = np.zeros(len(x))  # d log(tau) / d log(lambda)
+        d_tau_mu = np.zeros(len(x))
+        d_tau_rho = np.zeros(len(x))
+        d_tau_lam[m00] = d_tau_mu[m00] = -lam[m00] * mu[m00] * rho / tau[m00]
+        d_tau_lam[m01] = lam[m01] * rho / tau[m01]
+        d_tau_mu[m10] = mu[m10] * rho / tau[m10]
+        d_tau_rho[m00] = -lam[m00] * mu[m00] / tau[m00]
+        d_tau_rho[m01] = lam[m01] / tau[m01]
+        d_tau_rho[m10] = mu[m10] / tau[m10]
+        d_tau_rho[m11] = -1.0 / tau[m11]
+
+        g_lam = weights * (x - lam + d_tau_lam)
+        g_mu = weights * (y - mu + d_tau_mu)
+        grad = np.empty_like(theta)
+        grad[0] = g_lam.sum() + g_mu.sum()
+        grad[1] = (g_lam * at_home).sum()
+        grad[2] = (weights * d_tau_rho).sum()
+        grad[3:3 + k] = np.bincount(h, g_lam, minlength=k) + np.bincount(a, g_mu, minlength=k) - l2 * att
+        grad[3 + k:] = -np.bincount(a, g_lam, minlength=k) - np.bincount(h, g_mu, minlength=k) - l2 * dfc
+        return value, -grad / total
+
+    return f
+
+def _lbfgs(f: Callable[[np.ndarray], Tuple[float, np.ndarray]], x0: np.ndarray,
+           max_iter: int = 500, tol: float = 1e-7, memory: int = 10) -> Tuple[np.ndarray, float, int]:
+    """Minimize f (returns value, gradient) with L-BFGS and Armijo backtracking."""
+    x = x0.copy()
+    fx, g = f(x)
+    s_hist, y_hist = [], []
+    it = 0
+    for it in range(1, max_iter + 1):
+        if np.max(np.abs(g)) < tol:
+            break
+        # two-loop recursion for the search direction
+        q = g.copy()
+        alphas = []
+        for s, yv in reversed(list(zip(s_hist, y_hist))):
+            a_i = (s @ q) / (yv @ s)
+            alphas.append(a_i)
+            q -= a_i * yv
+        if s_hist:
+            q *= (s_hist[-1] @ y_hist[-1]) / (y_hist[-1] @ y_hist[-1])
+        for (s, yv), a_i in zip(zip(s_hist, y_hist), reversed(alphas)):
+            q += s * (a_i - (yv @ q) / (yv @ s))
+        direction = -q
+        slope = g @ direction
+        if slope >= 0:
+            direction, slope = -g, -(g @ g)
+            s_hist.clear(); y_hist.clear()
+
+        step = 1.0
+        while True:
+            x_new = x + step * direction
+            f_new, g_new = f(x_new)
+            if f_new <= fx + 1e-4 * step * slope or step < 1e-12:
+                break
+            step *= 0.5
+        if step < 1e-12:
+            break
+        s, yv = x_new - x, g_new - g
+        if yv @ s > 1e-12:
+            s_hist.append(s); y_hist.append(yv)
+            if len(s_hist) > memory:
+                s_hist.pop(0); y_hist.pop(0)
+        converged = abs(fx - f_new) < tol * max(1.0, abs(fx))
+        x, fx, g = x_new, f_new, g_new
+        if converged:
+            break
+    return x, fx, it
+
+def fit_poisson(enc: EncodedMatches, weights: np.ndarray | None = None, l2: float = 1.0,
+                max_iter: int = 500) -> PoissonModel:
+    """
+    Fit on encoded matches; `weights` (e.g. decay_weights) scale each match's
+    log-likelihood. l2 is a ridge penalty on attack/defence (a N(0, 1/l2)
+    prior) that pins down the model's free shift and tames sparse teams.
+    """
+    k = len(enc.teams)
+    weights = np.ones(len(enc.home)) if weights is None else np.asarray(weights, dtype=float)
+    goals = np.concatenate([enc.home_score, enc.away_score]).astype(float)
+    mean_goals = np.average(goals, weights=np.concatenate([weights, weights])) if len(goals) else 1.0
+    theta0 = np.zeros(3 + 2 * k)
+    theta0[0] = np.log(max(mean_goals, 1e-3))
+    theta, value, iterations = _lbfgs(_objective(enc, weights, l2), theta0, max_iter=max_iter)
+    return PoissonModel(
+        teams=enc.teams,
+        attack=theta[3:3 + k],
+        defence=theta[3 + k:],
+        intercept=float(theta[0]),
+        home_advantage=float(theta[1]),
+        rho=float(theta[2]),
+        log_likelihood=float(-value * weights.sum()),
+        iterations=iterations,
+    )
+
+def expected_goals(model: PoissonModel, home: int, away: int, neutral: bool = False) -> Tuple[float, float]:
+    lam = np.exp(model.intercept + (0.0 if neutral else model.home_advantage)
+                 + model.attack[home] - model.defence[away])
+    mu = np.exp(model.intercept + model.attack[away] - model.defence[home])
+    return float(lam), float(mu)
+
+def score_matrix(model: PoissonModel, home: int, away: int, neutral: bool = False,
+                 max_goals: int = 10) -> np.ndarray:
+    """(max_goals+1, max_goals+1) probabilities; rows = home goals, columns = away goals."""
+    lam, mu = expected_goals(model, home, away, neutral)
+    g = np.arange(max_goals + 1)
+    log_fact = np.concatenate([[0.0], np.cumsum(np.log(np.arange(1, max_goals + 1)))])
+    p_home = np.exp(g * np.log(lam) - lam - log_fact)
+    p_away = np.exp(g * np.log(mu) - mu - log_fact)
+    m = np.outer(p_home, p_away)
+    m[0, 0] *= 1.0 - lam * mu * model.rho
+    m[0, 1] *= 1.0 + lam * model.rho
+    m[1, 0] *= 1.0 + mu * model.rho
+    m[1, 1] *= 1.0 - model.rho
+    return m / m.sum()
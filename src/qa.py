@@ -3,9 +3,12 @@ import re
 import unicodedata
 import pandas as pd
 from typing import List, Dict, Any
+from src.perf import timed, count
 
 REQUIRED_COLS = ["date", "home_team", "away_team", "home_score", "away_score"]
+ISSUE_COLUMNS = ["issue_type", "severity", "column", "row_index", "detail"]
 
+@timed
 def run_all_checks(df: pd.DataFrame) -> pd.DataFrame:
     issues = []
     issues += check_required_columns(df)
@@ -13,8 +16,9 @@ def run_all_checks(df: pd.DataFrame) -> pd.DataFrame:
     issues += check_invalid_dates(df)
     issues += check_unclean_team_names(df, ["home_team", "away_team"])
 
+    count("qa.issues", len(issues))
     if not issues:
-        return pd.DataFrame(columns=["issue_type", "severity", "column", "row_index", "detail"])
+        return pd.DataFrame(columns=ISSUE_COLUMNS)
     return pd.DataFrame(issues)
 
 def check_required_columns(df: pd.DataFrame) -> List[Dict[str, Any]]:
@@ -50,7 +54,7 @@ def check_invalid_dates(df: pd.DataFrame, min_year: int = 1870, max_year: int =
     else:
         years = df.loc[~df["date"].isna(), "date"].dt.year
 
-    bad_idx = df.index[(years < min_year) | (years > max_year)].tolist()
+    bad_idx = years.index[(years < min_year) | (years > max_year)].tolist()
     for idx in bad_idx:
         y = int(years.loc[idx])
         issues.append(_issue("OUT_OF_RANGE_DATE", "ERROR", "date", int(idx), f"Year {y} outside [{min_year}, {max_year}]"))
@@ -0,0 +1,210 @@
+# src/ratings.py
+# Single-pass rating engine: several Elo-style models updated side by side
+# over one encoded copy of the match list.
+
+from __future__ import annotations
+from dataclasses import dataclass
+from typing import Dict, List, Sequence, Tuple
+import numpy as np
+import pandas as pd
+
+@dataclass(frozen=True)
+class RatingModel:
+    name: str
+    k_factor: float = 20.0
+    home_advantage: float = 50.0
+    neutral_aware: bool = False        # no home advantage when neutral is True
+    margin_weighted: bool = False      # scale K by goal margin (World Football Elo)
+    tournament_weighted: bool = False  # scale K by tournament importance
+
+DEFAULT_RATING_MODELS: Tuple[RatingModel, ...] = (
+    RatingModel("elo"),
+    RatingModel("elo_margin", margin_weighted=True),
+    RatingModel("elo_tournament", tournament_weighted=True),
+    RatingModel("elo_neutral", neutral_aware=True),
+)
+
+# K multipliers relative to a friendly (World Football Elo: 60/50/40/30/20)
+CONTINENTAL_FINALS = {
+    "UEFA Euro", "Copa América", "African Cup of Nations", "AFC Asian Cup",
+    "Gold Cup", "CONCACAF Championship", "Oceania Nations Cup", "Confederations Cup",
+}
+
+def tournament_weight(name: str) -> float:
+    name = str(name)
+    if name == "Friendly":
+        return 1.0
+    if name == "FIFA World Cup":
+        return 3.0
+    if name in CONTINENTAL_FINALS:
+        return 2.5
+    if "qualification" in name.lower():
+        return 2.0
+    return 1.5
+
+DRAW_MAX = 0.28  # draw probability between equal teams (historical international rate)
+
+def match_probabilities(r_home: np.ndarray, r_away: np.ndarray,
+                        home_advantage: float | np.ndarray = 0.0) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    (p_home_win, p_draw, p_away_win) from the Elo expected score e. The draw
+    share shrinks linearly as e moves away from 0.5; the rest of e is the win
+    probability, so p_win + p_draw / 2 == e.
+    """
+    e = 1.0 / (1.0 + 10.0 ** ((r_away - (r_home + home_advantage)) / 400.0))
+    p_draw = DRAW_MAX * (1.0 - np.abs(2.0 * e - 1.0))
+    p_win = np.clip(e - p_draw / 2.0, 0.0, 1.0)
+    p_loss = np.clip(1.0 - p_win - p_draw, 0.0, 1.0)
+    return p_win, p_draw, p_loss
+
+def margin_multiplier(goal_diff: np.ndarray) -> np.ndarray:
+    gd = np.abs(goal_diff).astype(float)
+    return np.where(gd <= 1, 1.0, np.where(gd == 2, 1.5, (11.0 + gd) / 8.0))
+
+@dataclass(frozen=True)
+class EncodedMatches:
+    teams: np.ndarray        # team names; codes below index into this
+    home: np.ndarray         # int team codes, match order
+    away: np.ndarray
+    home_score: np.ndarray
+    away_score: np.ndarray
+    neutral: np.ndarray      # bool
+    tournament_w: np.ndarray # float K multiplier
+    dates: np.ndarray        # datetime64[ns]
+
+def encode_matches(df: pd.DataFrame) -> EncodedMatches:
+    """Date-ordered integer/float arrays for the rating engine (stable on ties)."""
+    if not df["date"].is_monotonic_increasing:
+        df = df.sort_values("date", kind="stable")
+    n = len(df)
+    codes, names = pd.factorize(
+        pd.concat([df["home_team"], df["away_team"]], ignore_index=True).astype(str), sort=True
+    )
+    if "neutral" in df.columns:
+        neutral = df["neutral"].fillna(False).astype(bool).to_numpy()
+    else:
+        neutral = np.zeros(n, dtype=bool)
+    if "tournament" in df.columns:
+        t_codes, t_names = pd.factorize(df["tournament"].astype(str))
+        tournament_w = np.array([tournament_weight(t) for t in t_names], dtype=float)[t_codes]
+    else:
+        tournament_w = np.ones(n, dtype=float)
+    return EncodedMatches(
+        teams=np.asarray(names, dtype=object),
+        home=codes[:n],
+        away=codes[n:],
+        home_score=df["home_score"].to_numpy(dtype=np.int64),
+        away_score=df["away_score"].to_numpy(dtype=np.int64),
+        neutral=neutral,
+        tournament_w=tournament_w,
+        dates=df["date"].to_numpy(dtype="datetime64[ns]"),
+    )
+
+def run_rating_models(enc: EncodedMatches, models: Sequence[RatingModel],
+                      base_rating: float = 1500.0, initial: np.ndarray | None = None) -> Dict[str, np.ndarray]:
+    """
+    One sequential pass over the matches updating every model's rating vector.
+    Per-match K and home advantage are precomputed per model with NumPy, so
+    the loop only does the expected-score update. Returns (models, matches)
+    arrays of pre-match home/away ratings and expected home scores, plus the
+    (models, teams) final ratings. `initial` (models, teams), aligned with
+    enc.teams, continues from earlier ratings instead of base_rating.
+    """
+    n, m = len(enc.home), len(models)
+    gd = enc.home_score - enc.away_score
+    actual = np.where(gd > 0, 1.0, np.where(gd < 0, 0.0, 0.5))
+    margin = margin_multiplier(gd)
+
+    k_eff = np.empty((m, n))
+    home_adv = np.empty((m, n))
+    for j, mod in enumerate(models):
+        k = np.full(n, float(mod.k_factor))
+        if mod.margin_weighted:
+            k = k * margin
+        if mod.tournament_weighted:
+            k = k * enc.tournament_w
+        k_eff[j] = k
+        home_adv[j] = np.where(enc.neutral, 0.0, mod.home_advantage) if mod.neutral_aware else mod.home_advantage
+
+    if initial is None:
+        ratings: List[List[float]] = [[float(base_rating)] * len(enc.teams) for _ in range(m)]
+    else:
+        ratings = np.asarray(initial, dtype=float).reshape(m, len(enc.teams)).tolist()
+    k_l, ha_l = k_eff.T.tolist(), home_adv.T.tolist()  # per match: one value per model
+    home_l, away_l, actual_l = enc.home.tolist(), enc.away.tolist(), actual.tolist()
+    pre_h: List[List[float]] = [None] * n
+    pre_a: List[List[float]] = [None] * n
+    exp_l: List[List[float]] = [None] * n
+    models_idx = range(m)
+    for i in range(n):
+        h = home_l[i]; a = away_l[i]; s = actual_l[i]
+        k_i = k_l[i]; ha_i = ha_l[i]
+        ph = [0.0] * m; pa = [0.0] * m; ex = [0.0] * m
+        for j in models_idx:
+            r = ratings[j]
+            rh = r[h]; ra = r[a]
+            e = 1.0 / (1.0 + 10.0 ** ((ra - (rh + ha_i[j])) / 400.0))
+            # away side as k * (s_away - e_away), so the baseline matches the
+            # original per-team Elo update exactly rather than to rounding
+            r[h] = rh + k_i[j] * (s - e)
+            r[a] = ra + k_i[j] * ((1.0 - s) - (1.0 - e))
+            ph[j] = rh; pa[j] = ra; ex[j] = e
+        pre_h[i] = ph; pre_a[i] = pa; exp_l[i] = ex
+
+    pre_home = np.array(pre_h, dtype=float).reshape(n, m).T
+    pre_away = np.array(pre_a, dtype=float).reshape(n, m).T
+    expected = np.array(exp_l, dtype=float).reshape(n, m).T
+    return {
+        "pre_home": pre_home,
+        "pre_away": pre_away,
+        "post_home": pre_home + k_eff * (actual - expected),
+        "post_away": pre_away + k_eff * ((1.0 - actual) - (1.0 - expected)),
+        "expected_home": expected,
+        "actual_home": actual,
+        "final": np.array(ratings),
+    }
+
+def compute_ratings(df: pd.DataFrame, models: Sequence[RatingModel] = DEFAULT_RATING_MODELS,
+                    base_rating: float = 1500.0) -> Tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame]:
+    """
+    Run every model in one pass. Returns
+      ratings_history: seq, date, team + one post-match rating column per model
+      final_ratings:   team + one column per model, sorted by the first model
+      model_scores:    per-model Brier score / accuracy of the pre-match expectations
+    """
+    enc = encode_matches(df)
+    out = run_rating_models(enc, models, base_rating)
+    names = [mod.name for mod in models]
+    n = len(enc.home)
+
+    hist = {
+        "seq": np.repeat(np.arange(n), 2),
+        "date": np.repeat(enc.dates, 2),
+        "team": enc.teams[np.column_stack([enc.home, enc.away]).ravel()],
+    }
+    for j, name in enumerate(names):
+        hist[name] = np.column_stack([out["post_home"][j], out["post_away"][j]]).ravel()
+    ratings_history = pd.DataFrame(hist)
+
+    played = np.zeros(len(enc.teams), dtype=bool)
+    played[enc.home] = True
+    played[enc.away] = True
+    final = {"team": enc.teams[played]}
+    for j, name in enumerate(names):
+        final[name] = out["final"][j][played]
+    final_ratings = pd.DataFrame(final)
+    if names:
+        final_ratings = final_ratings.sort_values(names[0], ascending=False, kind="stable").reset_index(drop=True)
+
+    actual = out["actual_home"]
+    decided = actual != 0.5
+    scores = []
+    for j, name in enumerate(names):
+        e = out["expected_home"][j]
+        scores.append({
+            "model": name,
+            "brier": float(np.mean((actual - e) ** 2)) if n else float("nan"),
+            "accuracy": float(np.mean((e[decided] > 0.5) == (actual[decided] == 1.0))) if decided.any() else float("nan"),
+        })
+    model_scores = pd.DataFrame(scores, columns=["model", "brier", "accuracy"])
+    return ratings_history, final_ratings, model_scores
@@ -7,8 +7,9 @@ from datetime import datetime
 from typing import List, Optional, Dict
 import html
 import pandas as pd
+from src.perf import timed
 
-def _kpi_cards_html(k: Dict[str, float | int]) -> str:
+def _kpi_cards_html(k: Dict[str, float | int], adjusted: Optional[Dict[str, float | int]] = None) -> str:
     cards = [
         ("Games", str(k["games"])),
         ("W-D-L", f'{k["w"]}-{k["d"]}-{k["l"]}'),
@@ -17,6 +18,13 @@ def _kpi_cards_html(k: Dict[str, float | int]) -> str:
         ("Goal Diff", str(k["gf"] - k["ga"])),
         ("Points/Game", f'{round((k["w"]*1 + k["d"]*0.5)/k["games"], 2) if k["games"] else 0.0}')
     ]
+    if adjusted:
+        cards += [
+            ("Points (3/1/0)", str(adjusted["pts"])),
+            ("Expected Points", str(adjusted["xpts"])),
+            ("Pts over Expectation", f'{adjusted["poe"]:+}'),
+            ("Avg Opponent Elo", f'{adjusted["avg_opp_elo"]:.0f}'),
+        ]
     items = []
     for title, val in cards:
         items.append(f"""
@@ -113,11 +121,13 @@ def _html_shell(body: str, title: str) -> str:
 </body>
 </html>"""
 
+@timed
 def build_h2h_report_html(team: str, opponent: str, kpi: Dict[str, float | int],
                           h2h_table: pd.DataFrame, recent_matches: pd.DataFrame,
-                          rolling_form_values: List[float]) -> str:
+                          rolling_form_values: List[float],
+                          adjusted_kpi: Optional[Dict[str, float | int]] = None) -> str:
     title = f"H2H Report — {team} vs {opponent}"
-    kpi_html = _kpi_cards_html(kpi)
+    kpi_html = _kpi_cards_html(kpi, adjusted_kpi)
     h2h_html = _df_to_table_html(h2h_table, f"Head-to-Head Summary: {team} vs {opponent}")
     recent_html = _df_to_table_html(recent_matches, "Recent Matches (Filtered)")
     spark = _sparkline_svg(rolling_form_values, width=720, height=120, padding=12)
@@ -135,11 +145,15 @@ def build_h2h_report_html(team: str, opponent: str, kpi: Dict[str, float | int],
 """
     return _html_shell(body, title)
 
+@timed
 def build_team_report_html(team: str, kpi: Dict[str, float | int],
                            form_table: pd.DataFrame, gd_table: pd.DataFrame,
-                           rolling_form_values: List[float], rolling_gd_values: List[float]) -> str:
+                           rolling_form_values: List[float], rolling_gd_values: List[float],
+                           streaks_table: Optional[pd.DataFrame] = None,
+                           records_table: Optional[pd.DataFrame] = None,
+                           adjusted_kpi: Optional[Dict[str, float | int]] = None) -> str:
     title = f"Team Report — {team}"
-    kpi_html = _kpi_cards_html(kpi)
+    kpi_html = _kpi_cards_html(kpi, adjusted_kpi)
     form_html = _df_to_table_html(form_table, "Rolling Form Table")
     gd_html = _df_to_table_html(gd_table, "Rolling Goal Diff Table")
     spark_form = _sparkline_svg(rolling_form_values, width=720, height=120, padding=12)
@@ -157,9 +171,18 @@ def build_team_report_html(team: str, kpi: Dict[str, float | int],
   <div>{form_html}</div>
   <div>{gd_html}</div>
 </div>
+"""
+    if streaks_table is not None or records_table is not None:
+        body += f"""
+<h2>Streaks &amp; Records</h2>
+<div class="row">
+  <div>{_df_to_table_html(streaks_table, "Streaks")}</div>
+  <div>{_df_to_table_html(records_table, "Records")}</div>
+</div>
 """
     return _html_shell(body, title)
 
+@timed
 def save_report_html(html_text: str, out_dir: Path | str = Path("outputs"),
                      file_name: Optional[str] = None) -> Path:
     out_dir = Path(out_dir)
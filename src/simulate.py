@@ -0,0 +1,246 @@
+# src/simulate.py
+# Vectorized Monte Carlo simulation of fixture lists and group/knockout
+# tournaments from Elo ratings. Each batch draws all simulations of a match
+# at once with NumPy; batches run in a process pool with per-batch seeds so
+# results depend only on (seed, n_sims, batch_size), never on worker count.
+#
+# CLI:  python -m src.simulate spec.json --sims 100000 --workers 4 --seed 7
+
+from __future__ import annotations
+import argparse
+import json
+import math
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Mapping, Sequence, Tuple
+import numpy as np
+import pandas as pd
+from src.ratings import match_probabilities
+
+ROUND_NAMES = {16: "round_of_16", 8: "quarter_final", 4: "semi_final", 2: "final"}
+
+@dataclass(frozen=True)
+class Tournament:
+    """
+    Either a fixture list (league table), a knockout bracket, or groups
+    feeding a knockout bracket.
+      fixtures:       [(home, away), ...]; neutral unless home_advantage applies
+      knockout:       teams in bracket order (power of two); 1v2, 3v4, ...
+      groups:         {"A": [...], "B": [...]}; single round robin, 3/1/0 points
+      advance:        teams per group reaching the knockout
+      knockout_slots: bracket order as (group, rank) pairs; defaults to the
+                      World Cup pattern (1A-2B, 1C-2D, ..., 1B-2A, 1D-2C, ...)
+    """
+    fixtures: List[Tuple[str, str]] = field(default_factory=list)
+    knockout: List[str] = field(default_factory=list)
+    groups: Dict[str, List[str]] = field(default_factory=dict)
+    advance: int = 2
+    knockout_slots: List[Tuple[str, int]] | None = None
+    home_advantage: float = 0.0
+
+    @staticmethod
+    def from_dict(spec: Mapping) -> "Tournament":
+        return Tournament(
+            fixtures=[tuple(f) for f in spec.get("fixtures", [])],
+            knockout=list(spec.get("knockout", [])),
+            groups={str(g): list(t) for g, t in spec.get("groups", {}).items()},
+            advance=int(spec.get("advance", 2)),
+            knockout_slots=[tuple(s) for s in spec["knockout_slots"]] if spec.get("knockout_slots") else None,
+            home_advantage=float(spec.get("home_advantage", 0.0)),
+        )
+
+    def teams(self) -> List[str]:
+        seen: Dict[str, None] = {}
+        for h, a in self.fixtures:
+            seen.setdefault(h); seen.setdefault(a)
+        for t in self.knockout:
+            seen.setdefault(t)
+        for members in self.groups.values():
+            for t in members:
+                seen.setdefault(t)
+        return list(seen)
+
+def _default_slots(groups: Sequence[str], advance: int) -> List[Tuple[str, int]]:
+    if advance == 2 and len(groups) % 2 == 0:
+        first = [(groups[i], 1) if j == 0 else (groups[i + 1], 2)
+                 for i in range(0, len(groups), 2) for j in (0, 1)]
+        second = [(groups[i + 1], 1) if j == 0 else (groups[i], 2)
+                  for i in range(0, len(groups), 2) for j in (0, 1)]
+        return first + second
+    return [(g, rank) for rank in range(1, advance + 1) for g in groups]
+
+def _league(codes_h: np.ndarray, codes_a: np.ndarray, n_teams: int, ratings: np.ndarray,
+            home_advantage: float, n: int, rng: np.random.Generator) -> np.ndarray:
+    """(n, n_teams) points after playing every fixture once per simulation."""
+    points = np.zeros((n, n_teams), dtype=np.int16)
+    p_win, p_draw, _ = match_probabilities(ratings[codes_h], ratings[codes_a], home_advantage)
+    u = rng.random((n, len(codes_h)))
+    home_win = u < p_win
+    draw = (~home_win) & (u < p_win + p_draw)
+    away_win = ~(home_win | draw)
+    for j, (h, a) in enumerate(zip(codes_h, codes_a)):
+        points[:, h] += 3 * home_win[:, j] + draw[:, j]
+        points[:, a] += 3 * away_win[:, j] + draw[:, j]
+    return points
+
+def _rank(points: np.ndarray, rng: np.random.Generator) -> np.ndarray:
+    """(n, teams) column indices best first: by points, ties broken by lot."""
+    noise = rng.random(points.shape) * 0.5
+    return np.argsort(-(points + noise), axis=1)
+
+def _knockout(slots: np.ndarray, ratings: np.ndarray, rng: np.random.Generator,
+              reached: np.ndarray, labels: List[str]) -> None:
+    """slots: (n, 2^k) team codes in bracket order. Adds stage counts into reached."""
+    while slots.shape[1] > 1:
+        size = slots.shape[1]
+        np.add.at(reached[labels.index(ROUND_NAMES.get(size, f"round_of_{size}"))], slots.ravel(), 1)
+        home, away = slots[:, 0::2], slots[:, 1::2]
+        e = 1.0 / (1.0 + 10.0 ** ((ratings[away] - ratings[home]) / 400.0))
+        # draws go to extra time / penalties: the advancing probability is e
+        slots = np.where(rng.random(e.shape) < e, home, away)
+    np.add.at(reached[labels.index("champion")], slots.ravel(), 1)
+
+def _knockout_size(t: Tournament) -> int:
+    if t.knockout:
+        return len(t.knockout)
+    if t.knockout_slots:
+        return len(t.knockout_slots)
+    return len(t.groups) * t.advance if t.groups else 0
+
+def _stage_labels(t: Tournament) -> List[str]:
+    labels: List[str] = []
+    if t.fixtures:
+        labels.append("league_first")
+    if t.groups:
+        labels.append("group_advance")
+    size = _knockout_size(t)
+    while size > 1:
+        labels.append(ROUND_NAMES.get(size, f"round_of_{size}"))
+        size //= 2
+    if t.knockout or t.groups:
+        labels.append("champion")
+    return labels
+
+def _simulate_batch(args) -> Tuple[np.ndarray, np.ndarray]:
+    t, team_names, ratings, n, seed = args
+    rng = np.random.default_rng(seed)
+    code = {name: i for i, name in enumerate(team_names)}
+    labels = _stage_labels(t)
+    reached = np.zeros((len(labels), len(team_names)), dtype=np.int64)
+    points_sum = np.zeros(len(team_names), dtype=np.int64)
+
+    if t.fixtures:
+        h = np.array([code[x] for x, _ in t.fixtures])
+        a = np.array([code[y] for _, y in t.fixtures])
+        points = _league(h, a, len(team_names), ratings, t.home_advantage, n, rng)
+        points_sum += points.sum(axis=0)
+        order = _rank(points, rng)
+        np.add.at(reached[labels.index("league_first")], order[:, 0], 1)
+
+    if t.groups:
+        group_names = list(t.groups)
+        finishing: Dict[str, np.ndarray] = {}
+        for g in group_names:
+            members = np.array([code[x] for x in t.groups[g]])
+            pairs = [(i, j) for i in range(len(members)) for j in range(i + 1, len(members))]
+            hi = np.array([p[0] for p in pairs]); ai = np.array([p[1] for p in pairs])
+            points = _league(hi, ai, len(members), ratings[members], t.home_advantage, n, rng)
+            points_sum[members] += points.sum(axis=0)
+            finishing[g] = members[_rank(points, rng)]  # (n, group size) team codes, best first
+            np.add.at(reached[labels.index("group_advance")], finishing[g][:, :t.advance].ravel(), 1)
+        slots_spec = t.knockout_slots or _default_slots(group_names, t.advance)
+        slots = np.column_stack([finishing[g][:, rank - 1] for g, rank in slots_spec])
+        _knockout(slots, ratings, rng, reached, labels)
+    elif t.knockout:
+        slots = np.tile(np.array([code[x] for x in t.knockout]), (n, 1))
+        _knockout(slots, ratings, rng, reached, labels)
+    return reached, points_sum
+
+def _ratings_vector(team_names: List[str], ratings, default: float) -> np.ndarray:
+    if isinstance(ratings, pd.DataFrame):
+        col = "rating" if "rating" in ratings.columns else ratings.columns[1]
+        ratings = dict(zip(ratings["team"].astype(str), ratings[col].astype(float)))
+    return np.array([float(ratings.get(t, default)) for t in team_names])
+
+def simulate_tournament(tournament: Tournament, ratings, n_sims: int = 100_000, seed: int = 0,
+                        workers: int = 1, batch_size: int = 25_000,
+                        default_rating: float = 1500.0) -> pd.DataFrame:
+    """
+    Per-team probability of reaching each stage (columns depend on the format)
+    and expected points from fixtures / group games. `ratings` is a team ->
+    rating mapping or a frame with team/rating columns (e.g. compute_elo's
+    final_ratings); unknown teams get default_rating.
+    """
+    if n_sims < 1:
+        raise ValueError(f"n_sims must be at least 1, got {n_sims}")
+    team_names = tournament.teams()
+    if not team_names:
+        raise ValueError("Tournament has no teams or fixtures")
+    r = _ratings_vector(team_names, ratings, default_rating)
+    size = _knockout_size(tournament)
+    if (tournament.knockout or tournament.groups) and (size < 2 or size & (size - 1)):
+        raise ValueError(f"Knockout stage needs a power-of-two number of teams, got {size}")
+
+    n_batches = max(1, math.ceil(n_sims / batch_size))
+    seeds = np.random.SeedSequence(seed).spawn(n_batches)
+    sizes = [min(batch_size, n_sims - i * batch_size) for i in range(n_batches)]
+    jobs = [(tournament, team_names, r, s, sd) for s, sd in zip(sizes, seeds)]
+    if workers > 1 and n_batches > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(_simulate_batch, jobs))
+    else:
+        results = [_simulate_batch(j) for j in jobs]
+
+    reached = sum(res[0] for res in results)
+    points = sum(res[1] for res in results)
+    out = pd.DataFrame({"team": team_names, "rating": r})
+    for label, counts in zip(_stage_labels(tournament), reached):
+        out[f"p_{label}"] = counts / n_sims
+    if tournament.fixtures or tournament.groups:
+        out["exp_points"] = points / n_sims
+    sort_col = "p_champion" if (tournament.knockout or tournament.groups) else "p_league_first"
+    return out.sort_values([sort_col, "rating"], ascending=False).reset_index(drop=True)
+
+def benchmark(tournament: Tournament, ratings, n_sims: int = 100_000, workers: int = 1,
+              seed: int = 0) -> Dict[str, float]:
+    t0 = time.perf_counter()
+    simulate_tournament(tournament, ratings, n_sims=n_sims, seed=seed, workers=workers)
+    secs = time.perf_counter() - t0
+    return {"n_sims": n_sims, "workers": workers, "seconds": round(secs, 3),
+            "sims_per_sec": round(n_sims / secs, 1)}
+
+def main():
+    ap = argparse.ArgumentParser(description="Monte Carlo tournament simulator on Elo ratings")
+    ap.add_argument("spec", type=Path, help="JSON with 'fixtures', 'knockout' or 'groups' (+ 'advance')")
+    ap.add_argument("--sims", type=int, default=100_000)
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--workers", type=int, default=1)
+    ap.add_argument("--as-of", default=None, help="use Elo ratings as of this date (default: latest)")
+    ap.add_argument("--out", type=Path, default=None, help="write the probability table as CSV")
+    ap.add_argument("--benchmark", action="store_true", help="print simulations/second")
+    args = ap.parse_args()
+
+    from src.artifacts import load_bundle
+    from src.data_io import load_results
+    from src.metrics import compute_elo, build_elo_store, elo_leaderboard_as_of
+
+    spec = Tournament.from_dict(json.loads(args.spec.read_text(encoding="utf-8")))
+    bundle = load_bundle()
+    ratings_history, final_ratings = bundle.load("elo") if bundle else compute_elo(load_results())
+    if args.as_of:
+        store = bundle.load("elo_store") if bundle else build_elo_store(ratings_history)
+        final_ratings = elo_leaderboard_as_of(store, args.as_of, top=len(store.teams))
+
+    if args.benchmark:
+        print(json.dumps(benchmark(spec, final_ratings, args.sims, args.workers, args.seed)))
+        return
+    out = simulate_tournament(spec, final_ratings, n_sims=args.sims, seed=args.seed, workers=args.workers)
+    if args.out:
+        out.to_csv(args.out, index=False)
+        print(f"[SIM] Saved: {args.out}")
+    print(out.to_string(index=False))
+
+if __name__ == "__main__":
+    main()
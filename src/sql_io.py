@@ -1,119 +1,465 @@
 from __future__ import annotations
+import csv
+import gzip
+import importlib.util
+import itertools
+import json
+import logging
+import os
 import sqlite3
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import datetime
+from logging.handlers import RotatingFileHandler
 from pathlib import Path
 import pandas as pd
-from typing import Dict, Tuple
+from typing import Callable, Deque, Dict, Iterator, List, Mapping, Tuple
+from src.data_io import ingest_results
+from src.metrics import H2HCube, h2h_cube_from_counts, EloStore, build_elo_store
+from src.perf import timed, count
 
 DEFAULT_DB_PATH = Path("data/app.db")
 SCHEMA_PATH = Path("sql/schema.sql")
 QUERIES_PATH = Path("sql/queries.sql")
+FEDERATED_QUERIES_PATH = Path("sql/federated.sql")
+SLOW_QUERY_LOG_PATH = Path("logs/slow_queries.log")
+EXPORTS_DIR = Path("exports")
+EXPORT_FORMATS = {"csv": ".csv", "csv.gz": ".csv.gz", "parquet": ".parquet"}
+FIRST_PAGE: Tuple[str, int] = ("", 0)  # sorts before every (date, id) key
+
+# How run_query and the other readers open the database:
+#   "default"  - a regular read-write connection per call
+#   "readonly" - mode=ro with a large mmap and page cache; immutable=1 (no
+#                locking or change detection) only for rollback-journal files,
+#                since WAL commits stay in the -wal file until a checkpoint
+#   "memory"   - a :memory: clone made with the backup API, re-cloned and
+#                swapped in once a write commits (e.g. after an ETL run)
+READ_MODES = ("default", "readonly", "memory")
+MMAP_SIZE = 256 * 1024 * 1024
+CACHE_KIB = 64 * 1024
+# in "memory" mode each database (dataset shard) gets its own replica; past
+# this total the least recently used ones are dropped and re-cloned on demand
+REPLICA_BUDGET_MB = float(os.environ.get("RESULTS_REPLICA_MB", "512"))
+_read_cfg: Dict[str, str] = {"mode": "default"}
+
+# run_query calls at or above threshold_ms are written, with their query
+# plan, to a rotating JSON-lines log. threshold_ms=None disables logging.
+_slow_logger = logging.getLogger("src.sql_io.slow_queries")
+_slow_logger.propagate = False
+_slow_cfg: Dict[str, object] = {"threshold_ms": None, "path": None, "max_bytes": None, "backup_count": None}
 
 def _connect(db_path: Path | str = DEFAULT_DB_PATH) -> sqlite3.Connection:
-    conn = sqlite3.connect(str(db_path))
+    conn = sqlite3.connect(str(db_path), timeout=30.0)
+    conn.row_factory = sqlite3.Row
+    # WAL: readers keep their snapshot while a write transaction is open
+    conn.execute("PRAGMA journal_mode = WAL")
+    return conn
+
+def _is_wal(db_path: Path | str) -> bool:
+    # header bytes 18/19 (file format read/write versions) are 2 in WAL mode
+    try:
+        with open(db_path, "rb") as fh:
+            header = fh.read(20)
+    except FileNotFoundError:
+        return False
+    return len(header) == 20 and header[18] == 2
+
+def _connect_readonly(db_path: Path | str = DEFAULT_DB_PATH, immutable: bool = True) -> sqlite3.Connection:
+    # immutable=1 would skip the -wal file and return data from the last checkpoint
+    immutable = immutable and not _is_wal(db_path)
+    uri = Path(db_path).resolve().as_uri() + "?mode=ro" + ("&immutable=1" if immutable else "")
+    conn = sqlite3.connect(uri, uri=True)
     conn.row_factory = sqlite3.Row
+    conn.execute(f"PRAGMA mmap_size = {MMAP_SIZE}")
+    conn.execute(f"PRAGMA cache_size = -{CACHE_KIB}")
     return conn
 
-def init_db(db_path: Path | str = DEFAULT_DB_PATH, schema_path: Path | str = SCHEMA_PATH) -> None:
+class _Replica:
+    """
+    An in-memory clone plus a read-only probe connection on the source file.
+    PRAGMA data_version on the probe changes only when another connection
+    commits, so an open (uncommitted) write transaction, which already grows
+    the -wal file, does not make the replica stale.
+    """
+    def __init__(self, conn: sqlite3.Connection, probe: sqlite3.Connection, identity: Tuple[int, int],
+                 data_version: int, nbytes: int = 0) -> None:
+        self.conn = conn
+        self.probe = probe
+        self.identity = identity  # (st_dev, st_ino): a replaced file is a new database
+        self.data_version = data_version
+        self.nbytes = nbytes
+        self.lock = threading.Lock()  # one sqlite3 connection, shared across threads
+        self.probe_lock = threading.Lock()
+
+    def stale(self, db_path: str) -> bool:
+        try:
+            st = os.stat(db_path)
+        except FileNotFoundError:
+            return True
+        if (st.st_dev, st.st_ino) != self.identity:
+            return True
+        with self.probe_lock:
+            return self.probe.execute("PRAGMA data_version").fetchone()[0] != self.data_version
+
+_replicas: "OrderedDict[str, _Replica]" = OrderedDict()  # least recently used first
+_replica_lock = threading.RLock()
+
+def _file_signature(db_path: Path | str) -> Tuple[int, ...]:
+    # in WAL mode commits land in the -wal file first
+    st = os.stat(db_path)
+    try:
+        wal = os.stat(f"{db_path}-wal")
+        return st.st_mtime_ns, st.st_size, wal.st_mtime_ns, wal.st_size
+    except FileNotFoundError:
+        return st.st_mtime_ns, st.st_size, 0, 0
+
+def database_version(db_path: Path | str = DEFAULT_DB_PATH) -> str:
+    """Changes whenever db_path (or its WAL) is written; "" if it does not exist."""
+    try:
+        return "-".join(str(x) for x in _file_signature(db_path))
+    except FileNotFoundError:
+        return ""
+
+def refresh_replica(db_path: Path | str = DEFAULT_DB_PATH) -> int:
+    """Clone db_path into a new in-memory replica and swap it in. Returns pages copied."""
+    key = str(Path(db_path).resolve())
+    with _replica_lock:
+        # taken before the copy: a commit landing during it triggers another refresh
+        probe = sqlite3.connect(Path(key).as_uri() + "?mode=ro", uri=True, check_same_thread=False)
+        data_version = probe.execute("PRAGMA data_version").fetchone()[0]
+        st = os.stat(key)
+        src = _connect_readonly(key, immutable=False)
+        dst = sqlite3.connect(":memory:", check_same_thread=False)
+        try:
+            src.backup(dst)
+        finally:
+            src.close()
+        dst.row_factory = sqlite3.Row
+        dst.execute("PRAGMA query_only = 1")
+        pages = dst.execute("PRAGMA page_count").fetchone()[0]
+        page_size = dst.execute("PRAGMA page_size").fetchone()[0]
+        # readers still holding the old replica finish on it; it closes when released
+        _replicas[key] = _Replica(dst, probe, (st.st_dev, st.st_ino), data_version, pages * page_size)
+        _replicas.move_to_end(key)
+        _evict_replicas(keep=key)
+    count("sql_io.replica_refreshes")
+    return pages
+
+def _evict_replicas(keep: str) -> None:
+    budget = REPLICA_BUDGET_MB * 1_000_000
+    total = sum(r.nbytes for r in _replicas.values())
+    for key in list(_replicas):
+        if total <= budget:
+            break
+        if key != keep:
+            total -= _replicas.pop(key).nbytes
+            count("sql_io.replica_evictions")
+
+def replica_sizes() -> Dict[str, int]:
+    """Bytes held by each in-memory replica, least recently used first."""
+    with _replica_lock:
+        return {key: r.nbytes for key, r in _replicas.items()}
+
+def drop_replicas() -> None:
+    with _replica_lock:
+        _replicas.clear()
+
+def _replica(db_path: Path | str) -> _Replica:
+    key = str(Path(db_path).resolve())
+    replica = _replicas.get(key)
+    if replica is None or replica.stale(key):
+        with _replica_lock:
+            replica = _replicas.get(key)
+            if replica is None or replica.stale(key):
+                refresh_replica(key)
+                replica = _replicas[key]
+    with _replica_lock:
+        if key in _replicas:
+            _replicas.move_to_end(key)
+    return replica
+
+def configure_read_mode(mode: str = "readonly") -> None:
+    """Select how readers open the database (see READ_MODES)."""
+    if mode not in READ_MODES:
+        raise ValueError(f"Unknown read mode: {mode} (expected one of {', '.join(READ_MODES)})")
+    _read_cfg["mode"] = mode
+    if mode != "memory":
+        drop_replicas()
+
+def read_mode() -> str:
+    return _read_cfg["mode"]
+
+@contextmanager
+def _read_connection(db_path: Path | str = DEFAULT_DB_PATH) -> Iterator[sqlite3.Connection]:
+    mode = _read_cfg["mode"]
+    if mode == "memory":
+        replica = _replica(db_path)
+        with replica.lock:
+            yield replica.conn
+        return
+    conn = _connect_readonly(db_path) if mode == "readonly" else _connect(db_path)
+    try:
+        yield conn
+    finally:
+        conn.close()
+
+Progress = Callable[[float, str], None]
+
+def _no_progress(fraction: float, message: str = "") -> None:
+    pass
+
+def _scaled(progress: Progress, lo: float, hi: float) -> Progress:
+    return lambda fraction, message="": progress(lo + (hi - lo) * fraction, message)
+
+@contextmanager
+def _write_transaction(db_path: Path | str) -> Iterator[sqlite3.Connection]:
+    """
+    One BEGIN IMMEDIATE ... COMMIT around the whole write: tables are dropped,
+    rebuilt and filled inside it, and readers keep seeing the previous
+    snapshot until the single commit swaps the new one in.
+    """
     db_path = Path(db_path)
     db_path.parent.mkdir(parents=True, exist_ok=True)
-    with _connect(db_path) as conn, open(schema_path, "r", encoding="utf-8") as f:
-        sql = f.read()
-        conn.executescript(sql)
-
-def load_csv_to_db(db_path: Path | str = DEFAULT_DB_PATH, csv_path: Path | str = Path("data/results.csv")) -> Tuple[int, int]:
-    csv_path = Path(csv_path)
-    if not csv_path.exists():
-        raise FileNotFoundError(f"CSV not found: {csv_path}")
-
-    df = pd.read_csv(csv_path)
-    # basic sanity
-    required = ["date", "home_team", "away_team", "home_score", "away_score"]
-    missing = [c for c in required if c not in df.columns]
-    if missing:
-        raise ValueError(f"Missing required CSV columns: {missing}")
-
-    # dates & year
-    df["date"] = pd.to_datetime(df["date"], errors="coerce")
-    df = df.dropna(subset=["date"]).copy()
-    if "year" not in df.columns:
-        df["year"] = df["date"].dt.year.astype(int)
-    else:
-        df["year"] = df["year"].astype(int)
-
-    # trim names
-    df["home_team"] = df["home_team"].astype(str).str.strip()
-    df["away_team"] = df["away_team"].astype(str).str.strip()
-
-    with _connect(db_path) as conn:
-        cur = conn.cursor()
-
-        # Insert teams
-        teams = pd.unique(pd.concat([df["home_team"], df["away_team"]], ignore_index=True)).tolist()
-        for name in teams:
-            cur.execute("INSERT OR IGNORE INTO teams(name) VALUES (?)", (name,))
-        conn.commit()
-
-        # Map team name -> id
-        team_id = {row["name"]: row["id"] for row in cur.execute("SELECT id, name FROM teams")}
-
-        # Insert matches
-        rows = []
-        for _, r in df.iterrows():
-            rows.append((
-                r["date"].date().isoformat(),
-                int(r["year"]),
-                int(team_id[r["home_team"]]),
-                int(team_id[r["away_team"]]),
-                int(r["home_score"]),
-                int(r["away_score"]),
-            ))
+    conn = _connect(db_path)
+    conn.isolation_level = None  # explicit transaction control
+    conn.execute("PRAGMA synchronous = NORMAL")
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("PRAGMA wal_checkpoint(PASSIVE)")
+    finally:
+        conn.close()
+
+def _schema_statements(sql: str) -> List[str]:
+    # executescript would commit mid-transaction; split on complete statements instead
+    statements, buf = [], ""
+    for line in sql.splitlines(keepends=True):
+        buf += line
+        if sqlite3.complete_statement(buf):
+            statements.append(buf.strip())
+            buf = ""
+    if buf.strip():
+        statements.append(buf.strip())
+    return statements
+
+def _apply_schema(conn: sqlite3.Connection, schema_path: Path | str = SCHEMA_PATH) -> None:
+    for statement in _schema_statements(Path(schema_path).read_text(encoding="utf-8")):
+        conn.execute(statement)
+
+def _insert_results(conn: sqlite3.Connection, df: pd.DataFrame, progress: Progress = _no_progress,
+                    chunk_rows: int = 10_000) -> Tuple[int, int]:
+    cur = conn.cursor()
+
+    # Insert teams
+    home = df["home_team"].astype(str)
+    away = df["away_team"].astype(str)
+    teams = pd.unique(pd.concat([home, away], ignore_index=True)).tolist()
+    cur.executemany("INSERT OR IGNORE INTO teams(name) VALUES (?)", [(name,) for name in teams])
+    progress(0.05, "teams")
+
+    # Map team name -> id
+    team_id = {row["name"]: row["id"] for row in cur.execute("SELECT id, name FROM teams")}
+
+    # Insert matches, column-wise from the frame's buffers
+    rows = list(zip(
+        df["date"].dt.strftime("%Y-%m-%d").tolist(),
+        df["year"].astype(int).tolist(),
+        home.map(team_id).astype(int).tolist(),
+        away.map(team_id).astype(int).tolist(),
+        df["home_score"].astype(int).tolist(),
+        df["away_score"].astype(int).tolist(),
+    ))
+    for start in range(0, len(rows), chunk_rows):
         cur.executemany(
             """INSERT INTO matches(date, year, home_team_id, away_team_id, home_score, away_score)
                VALUES (?, ?, ?, ?, ?, ?)""",
-            rows
-        )
-        conn.commit()
-
-        # Build h2h_summary
-        cur.execute("DELETE FROM h2h_summary;")
-        conn.commit()
-
-        cur.executescript("""
-        WITH team_matches AS (
-          SELECT date, home_team_id AS team_id, away_team_id AS opponent_id,
-                 home_score AS gf, away_score AS ga
-          FROM matches
-          UNION ALL
-          SELECT date, away_team_id, home_team_id,
-                 away_score, home_score
-          FROM matches
-        ),
-        team_results AS (
-          SELECT team_id, opponent_id, date, gf, ga,
-                 CASE WHEN gf > ga THEN 1
-                      WHEN gf = ga THEN 0
-                      ELSE -1 END AS outcome
-          FROM team_matches
+            rows[start:start + chunk_rows]
         )
-        INSERT INTO h2h_summary(team_id, opponent_id, games, w, d, l, gf, ga, last_meeting_date)
-        SELECT team_id,
-               opponent_id,
-               COUNT(*) AS games,
-               SUM(CASE WHEN outcome = 1 THEN 1 ELSE 0 END) AS w,
-               SUM(CASE WHEN outcome = 0 THEN 1 ELSE 0 END) AS d,
-               SUM(CASE WHEN outcome = -1 THEN 1 ELSE 0 END) AS l,
-               SUM(gf) AS gf,
-               SUM(ga) AS ga,
-               MAX(date) AS last_meeting_date
-        FROM team_results
-        GROUP BY team_id, opponent_id;
-        """)
-        conn.commit()
-
-        # return counts
-        teams_count = cur.execute("SELECT COUNT(*) FROM teams;").fetchone()[0]
-        matches_count = cur.execute("SELECT COUNT(*) FROM matches;").fetchone()[0]
-        return teams_count, matches_count
+        done = min(start + chunk_rows, len(rows))
+        progress(0.05 + 0.85 * done / len(rows), f"matches {done}/{len(rows)}")
+
+    # Build h2h_summary
+    cur.execute("DELETE FROM h2h_summary;")
+    cur.execute("""
+    WITH team_matches AS (
+      SELECT date, home_team_id AS team_id, away_team_id AS opponent_id,
+             home_score AS gf, away_score AS ga
+      FROM matches
+      UNION ALL
+      SELECT date, away_team_id, home_team_id,
+             away_score, home_score
+      FROM matches
+    ),
+    team_results AS (
+      SELECT team_id, opponent_id, date, gf, ga,
+             CASE WHEN gf > ga THEN 1
+                  WHEN gf = ga THEN 0
+                  ELSE -1 END AS outcome
+      FROM team_matches
+    )
+    INSERT INTO h2h_summary(team_id, opponent_id, games, w, d, l, gf, ga, last_meeting_date)
+    SELECT team_id,
+           opponent_id,
+           COUNT(*) AS games,
+           SUM(CASE WHEN outcome = 1 THEN 1 ELSE 0 END) AS w,
+           SUM(CASE WHEN outcome = 0 THEN 1 ELSE 0 END) AS d,
+           SUM(CASE WHEN outcome = -1 THEN 1 ELSE 0 END) AS l,
+           SUM(gf) AS gf,
+           SUM(ga) AS ga,
+           MAX(date) AS last_meeting_date
+    FROM team_results
+    GROUP BY team_id, opponent_id;
+    """)
+    progress(1.0, "h2h_summary")
+
+    # return counts
+    teams_count = cur.execute("SELECT COUNT(*) FROM teams;").fetchone()[0]
+    matches_count = cur.execute("SELECT COUNT(*) FROM matches;").fetchone()[0]
+    return teams_count, matches_count
+
+def _insert_elo(conn: sqlite3.Connection, ratings_history: pd.DataFrame) -> int:
+    cur = conn.cursor()
+    team_id = {row["name"]: row["id"] for row in cur.execute("SELECT id, name FROM teams")}
+    rows = zip(
+        ratings_history["team"].astype(str).map(team_id).astype(int).tolist(),
+        ratings_history["seq"].astype(int).tolist(),
+        pd.to_datetime(ratings_history["date"]).dt.strftime("%Y-%m-%d").tolist(),
+        ratings_history["rating_before"].astype(float).tolist(),
+        ratings_history["rating"].astype(float).tolist(),
+    )
+    cur.execute("DELETE FROM elo_history;")
+    cur.executemany(
+        "INSERT INTO elo_history(team_id, seq, date, rating_before, rating) VALUES (?, ?, ?, ?, ?)",
+        rows
+    )
+    return cur.execute("SELECT COUNT(*) FROM elo_history;").fetchone()[0]
+
+@timed
+def init_db(db_path: Path | str = DEFAULT_DB_PATH, schema_path: Path | str = SCHEMA_PATH,
+            progress: Progress = _no_progress) -> None:
+    with _write_transaction(db_path) as conn:
+        _apply_schema(conn, schema_path)
+    progress(1.0, "schema")
+
+@timed
+def load_csv_to_db(db_path: Path | str = DEFAULT_DB_PATH, csv_path: Path | str = Path("data/results.csv"),
+                   progress: Progress = _no_progress) -> Tuple[int, int]:
+    # same parse/clean as load_results (src.data_io.ingest_results)
+    return load_frame_to_db(ingest_results(csv_path, run_qa=False).results, db_path, progress)
+
+@timed
+def load_frame_to_db(df: pd.DataFrame, db_path: Path | str = DEFAULT_DB_PATH,
+                     progress: Progress = _no_progress) -> Tuple[int, int]:
+    """Insert an ingested results frame (plain or compact) into teams/matches and rebuild h2h_summary."""
+    with _write_transaction(db_path) as conn:
+        return _insert_results(conn, df, progress)
+
+@timed
+def rebuild_db(df: pd.DataFrame, db_path: Path | str = DEFAULT_DB_PATH,
+               ratings_history: pd.DataFrame | None = None, schema_path: Path | str = SCHEMA_PATH,
+               progress: Progress = _no_progress) -> Tuple[int, int, int]:
+    """
+    Recreate the schema and load df (and Elo history, if given) in one
+    transaction: readers see the old tables until the new ones are complete.
+    Returns (teams, matches, elo rows).
+    """
+    with _write_transaction(db_path) as conn:
+        _apply_schema(conn, schema_path)
+        progress(0.02, "schema")
+        teams_count, matches_count = _insert_results(conn, df, _scaled(progress, 0.02, 0.9))
+        elo_rows = _insert_elo(conn, ratings_history) if ratings_history is not None else 0
+        progress(1.0, "committed")
+    return teams_count, matches_count, elo_rows
+
+class WriteJob:
+    """One queued write. status: queued -> running -> done | failed."""
+    def __init__(self, job_id: int, name: str) -> None:
+        self.id = job_id
+        self.name = name
+        self.status = "queued"
+        self.progress = 0.0
+        self.message = ""
+        self.submitted = time.time()
+        self.started: float | None = None
+        self.finished: float | None = None
+        self.future: Future | None = None
+
+    def report(self, fraction: float, message: str = "") -> None:
+        self.progress = max(0.0, min(1.0, float(fraction)))
+        self.message = message
+
+    @property
+    def done(self) -> bool:
+        return self.future is not None and self.future.done()
+
+    def result(self, timeout: float | None = None):
+        """Wait for the job; re-raises its error."""
+        return self.future.result(timeout)
+
+    @property
+    def error(self) -> BaseException | None:
+        return self.future.exception() if self.done else None
+
+class DbWriter:
+    """Runs the write jobs of one database one at a time on a background thread."""
+    def __init__(self, db_path: Path | str = DEFAULT_DB_PATH, history: int = 20) -> None:
+        self.db_path = Path(db_path)
+        self._pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="db-writer")
+        self._jobs: Deque[WriteJob] = deque(maxlen=history)
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def submit(self, name: str, fn: Callable, *args, **kwargs) -> WriteJob:
+        """Queue fn(*args, progress=job.report, **kwargs)."""
+        with self._lock:
+            job = WriteJob(next(self._ids), name)
+
+            def run():
+                job.status, job.started = "running", time.time()
+                try:
+                    out = fn(*args, progress=job.report, **kwargs)
+                except BaseException as e:
+                    job.status, job.message = "failed", str(e)
+                    raise
+                else:
+                    job.status = "done"
+                    job.report(1.0, job.message)
+                    return out
+                finally:
+                    job.finished = time.time()
+                    count("sql_io.write_jobs")
+
+            job.future = self._pool.submit(run)
+            self._jobs.append(job)
+        return job
+
+    def jobs(self) -> List[WriteJob]:
+        """Recent jobs, newest first."""
+        with self._lock:
+            return list(reversed(self._jobs))
+
+    def pending(self) -> List[WriteJob]:
+        return [j for j in self.jobs() if not j.done]
+
+_writers: Dict[str, DbWriter] = {}
+_writers_lock = threading.Lock()
+
+def db_writer(db_path: Path | str = DEFAULT_DB_PATH) -> DbWriter:
+    """The process-wide writer for db_path (created on first use)."""
+    key = str(Path(db_path).resolve())
+    with _writers_lock:
+        if key not in _writers:
+            _writers[key] = DbWriter(db_path)
+        return _writers[key]
 
 def _load_query_templates(path: Path | str = QUERIES_PATH) -> Dict[str, str]:
     path = Path(path)
@@ -146,8 +492,335 @@ def get_query_sql(name: str) -> str:
         raise KeyError(f"Unknown query name: {name}")
     return _QUERIES_CACHE[name]
 
+# Cross-dataset views: one UNION ALL branch per ATTACHed shard (one database
+# per dataset), team ids resolved to names since they differ between shards.
+FEDERATED_VIEWS = {
+    "all_matches": """
+        SELECT {dataset} AS dataset, m.id, m.date, m.year, h.name AS home_team, a.name AS away_team,
+               m.home_score, m.away_score
+        FROM {db}.matches m
+        JOIN {db}.teams h ON h.id = m.home_team_id
+        JOIN {db}.teams a ON a.id = m.away_team_id""",
+    "all_team_year_summary": """
+        SELECT {dataset} AS dataset, t.name AS team, s.year, s.games, s.w, s.d, s.l, s.gf, s.ga
+        FROM {db}.team_year_summary s
+        JOIN {db}.teams t ON t.id = s.team_id""",
+    "all_elo_history": """
+        SELECT {dataset} AS dataset, t.name AS team, e.seq, e.date, e.rating_before, e.rating
+        FROM {db}.elo_history e
+        JOIN {db}.teams t ON t.id = e.team_id""",
+    # each team's current rating; CROSS JOIN keeps teams outermost, so it is
+    # one primary-key seek per team instead of a scan of the history
+    "all_elo_latest": """
+        SELECT {dataset} AS dataset, t.name AS team, e.rating, e.date AS last_match
+        FROM {db}.teams t
+        CROSS JOIN {db}.elo_history e
+          ON e.team_id = t.id AND e.seq = (SELECT MAX(seq) FROM {db}.elo_history WHERE team_id = t.id)""",
+}
+
+def _sql_literal(value: str) -> str:
+    return "'" + str(value).replace("'", "''") + "'"
+
+@contextmanager
+def federated_connection(shards: Mapping[str, Path | str]) -> Iterator[sqlite3.Connection]:
+    """
+    A :memory: connection with every shard (dataset name -> database path)
+    ATTACHed read-only and FEDERATED_VIEWS over them as temp views. Shards
+    without a database yet are left out.
+    """
+    present = {name: Path(path) for name, path in shards.items() if Path(path).exists()}
+    if not present:
+        raise FileNotFoundError("No dataset database found; run the ETL first")
+    conn = sqlite3.connect(":memory:", uri=True)  # uri=True: ATTACH accepts file: URIs
+    conn.row_factory = sqlite3.Row
+    try:
+        limit = conn.getlimit(sqlite3.SQLITE_LIMIT_ATTACHED)
+        if len(present) > limit:
+            raise ValueError(f"{len(present)} datasets exceed SQLite's limit of {limit} attached databases")
+        for i, path in enumerate(present.values()):
+            conn.execute(f"ATTACH DATABASE ? AS shard_{i}", (path.resolve().as_uri() + "?mode=ro",))
+        for view, branch in FEDERATED_VIEWS.items():
+            union = "\nUNION ALL".join(branch.format(dataset=_sql_literal(name), db=f"shard_{i}")
+                                       for i, name in enumerate(present))
+            conn.execute(f"CREATE TEMP VIEW {view} AS {union}")
+        yield conn
+    finally:
+        conn.close()
+
+_FEDERATED_CACHE: Dict[str, str] | None = None
+
+def get_federated_query_names() -> list[str]:
+    global _FEDERATED_CACHE
+    if _FEDERATED_CACHE is None:
+        _FEDERATED_CACHE = _load_query_templates(FEDERATED_QUERIES_PATH)
+    return sorted(_FEDERATED_CACHE.keys())
+
+def get_federated_query_sql(name: str) -> str:
+    if name not in get_federated_query_names():
+        raise KeyError(f"Unknown federated query name: {name}")
+    return _FEDERATED_CACHE[name]
+
+@timed
+def run_federated_query(name: str, params: dict, shards: Mapping[str, Path | str]) -> pd.DataFrame:
+    """A named query from sql/federated.sql over the FEDERATED_VIEWS of the given shards."""
+    sql = get_federated_query_sql(name)
+    with federated_connection(shards) as conn:
+        return _read_sql(conn, name, sql, params, "federated:" + ",".join(shards))
+
+def configure_slow_query_log(threshold_ms: float | None = 100.0, path: Path | str = SLOW_QUERY_LOG_PATH,
+                             max_bytes: int = 1_000_000, backup_count: int = 3) -> None:
+    """Log run_query calls taking >= threshold_ms to `path` (rotated at max_bytes); None disables."""
+    path = Path(path)
+    cfg = {"threshold_ms": threshold_ms, "path": path, "max_bytes": max_bytes, "backup_count": backup_count}
+    if cfg == _slow_cfg:
+        return
+    for handler in list(_slow_logger.handlers):
+        _slow_logger.removeHandler(handler)
+        handler.close()
+    _slow_cfg.update(cfg)
+    if threshold_ms is None:
+        return
+    path.parent.mkdir(parents=True, exist_ok=True)
+    handler = RotatingFileHandler(path, maxBytes=max_bytes, backupCount=backup_count, encoding="utf-8")
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    _slow_logger.addHandler(handler)
+    _slow_logger.setLevel(logging.INFO)
+
+def slow_query_threshold_ms() -> float | None:
+    return _slow_cfg["threshold_ms"]
+
+def _param_signature(params: dict) -> str:
+    # names, types and string lengths: enough to spot unusual inputs at a glance
+    parts = []
+    for k in sorted(params or {}):
+        v = params[k]
+        parts.append(f"{k}:{type(v).__name__}" + (f"({len(v)})" if isinstance(v, str) else ""))
+    return ",".join(parts)
+
+def _query_plan(conn: sqlite3.Connection, sql: str, params: dict) -> List[str]:
+    """EXPLAIN QUERY PLAN as indented lines (two spaces per level)."""
+    rows = conn.execute("EXPLAIN QUERY PLAN " + sql, params or {}).fetchall()
+    depth: Dict[int, int] = {0: -1}
+    lines = []
+    for node_id, parent, _, detail in rows:
+        depth[node_id] = depth.get(parent, -1) + 1
+        lines.append("  " * depth[node_id] + str(detail))
+    return lines
+
+def _log_slow_query(conn: sqlite3.Connection, name: str, sql: str, params: dict, ms: float,
+                    rows: int, db_path: Path | str) -> None:
+    try:
+        plan = _query_plan(conn, sql, params)
+    except sqlite3.Error as e:
+        plan = [f"plan unavailable: {e}"]
+    entry = {
+        "ts": datetime.now().isoformat(timespec="milliseconds"),
+        "query": name,
+        "ms": round(ms, 3),
+        "rows": rows,
+        "threshold_ms": _slow_cfg["threshold_ms"],
+        "signature": _param_signature(params),
+        "params": {k: (v if isinstance(v, (int, float)) else str(v)[:120]) for k, v in (params or {}).items()},
+        "db": str(db_path),
+        "plan": plan,
+    }
+    _slow_logger.info(json.dumps(entry, ensure_ascii=False))
+    count("sql_io.slow_queries")
+
+def _read_sql(conn: sqlite3.Connection, name: str, sql: str, params: dict,
+              db_path: Path | str) -> pd.DataFrame:
+    threshold = _slow_cfg["threshold_ms"]
+    t0 = time.perf_counter()
+    df = pd.read_sql_query(sql, conn, params=params)
+    ms = (time.perf_counter() - t0) * 1000.0
+    if threshold is not None and ms >= threshold:
+        _log_slow_query(conn, name, sql, params, ms, len(df), db_path)
+    count("sql_io.queries")
+    count("sql_io.rows_returned", len(df))
+    return df
+
+@timed
 def run_query(name: str, params: dict, db_path: Path | str = DEFAULT_DB_PATH) -> pd.DataFrame:
     sql = get_query_sql(name)
-    with _connect(db_path) as conn:
-        df = pd.read_sql_query(sql, conn, params=params)
-    return df
+    with _read_connection(db_path) as conn:
+        return _read_sql(conn, name, sql, params, db_path)
+
+@dataclass(frozen=True)
+class Page:
+    rows: pd.DataFrame
+    after: Tuple[str, int]               # key this page starts after
+    next_after: Tuple[str, int] | None   # `after` of the next page; None on the last page
+
+def is_paged_query(name: str) -> bool:
+    return ":after_date" in get_query_sql(name)
+
+@timed
+def run_query_paged(name: str, params: dict, page_size: int = 500, after: Tuple[str, int] | None = None,
+                    db_path: Path | str = DEFAULT_DB_PATH) -> Page:
+    """
+    One page of a keyset-paged query (ordered by (date, id), taking :after_date,
+    :after_id and :page_size): the page_size rows after `after`, or the first
+    page when None. Every page is an index seek, however deep.
+    """
+    if not is_paged_query(name):
+        raise ValueError(f"Query {name} does not support keyset pagination")
+    if page_size < 1:
+        raise ValueError("page_size must be >= 1")
+    after = tuple(after) if after else FIRST_PAGE
+    # one extra row tells whether another page follows
+    q = {**params, "after_date": after[0], "after_id": int(after[1]), "page_size": page_size + 1}
+    with _read_connection(db_path) as conn:
+        df = _read_sql(conn, name, get_query_sql(name), q, db_path)
+    more = len(df) > page_size
+    df = df.iloc[:page_size]
+    next_after = (str(df["date"].iloc[-1]), int(df["id"].iloc[-1])) if more else None
+    return Page(df, after, next_after)
+
+def iter_query_pages(name: str, params: dict, page_size: int = 10_000,
+                     db_path: Path | str = DEFAULT_DB_PATH) -> Iterator[pd.DataFrame]:
+    after = None
+    while True:
+        page = run_query_paged(name, params, page_size, after, db_path)
+        if not page.rows.empty:
+            yield page.rows
+        if page.next_after is None:
+            return
+        after = page.next_after
+
+def parquet_available() -> bool:
+    return importlib.util.find_spec("pyarrow") is not None
+
+@contextmanager
+def _batch_writer(path: Path, fmt: str, columns: List[str]) -> Iterator[Callable[[list], None]]:
+    if fmt == "parquet":
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError as e:
+            raise ImportError("Parquet export needs pyarrow (pip install pyarrow)") from e
+        state: Dict[str, object] = {"writer": None}
+
+        def write(batch: list) -> None:
+            data = {c: [row[i] for row in batch] for i, c in enumerate(columns)}
+            if state["writer"] is None:
+                # the first batch fixes the schema; later batches are cast to it
+                table = pa.Table.from_pydict(data)
+                state["writer"] = pq.ParquetWriter(str(path), table.schema)
+            else:
+                table = pa.Table.from_pydict(data, schema=state["writer"].schema)
+            state["writer"].write_table(table)
+        try:
+            yield write
+        finally:
+            if state["writer"] is not None:
+                state["writer"].close()
+            else:
+                pq.write_table(pa.table({c: [] for c in columns}), str(path))
+        return
+
+    f = gzip.open(path, "wt", compresslevel=6, encoding="utf-8", newline="") if fmt == "csv.gz" \
+        else open(path, "w", encoding="utf-8", newline="")
+    with f:
+        writer = csv.writer(f)
+        writer.writerow(columns)
+        yield writer.writerows
+
+@timed
+def export_query(name: str, params: dict, out_path: Path | str, fmt: str | None = None,
+                 batch_rows: int = 10_000, db_path: Path | str = DEFAULT_DB_PATH) -> int:
+    """
+    Stream a named query into a CSV, gzip CSV or Parquet file (fmt inferred
+    from the suffix when None), batch_rows rows at a time from one cursor.
+    Keyset-paged queries are exported whole. Written to a .part file and
+    renamed, so readers never see a partial export. Returns rows written.
+    Reads through its own mode=ro connection, never the shared replica, so a
+    long export does not block other queries in "memory" mode.
+    """
+    out_path = Path(out_path)
+    fmt = fmt or next((f for f, ext in EXPORT_FORMATS.items() if out_path.name.endswith(ext)), None)
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Unknown export format for {out_path.name} (expected one of {', '.join(EXPORT_FORMATS)})")
+    sql = get_query_sql(name)
+    params = dict(params or {})
+    if is_paged_query(name):
+        params.update(after_date=FIRST_PAGE[0], after_id=FIRST_PAGE[1], page_size=-1)  # LIMIT -1: no limit
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = out_path.with_name(out_path.name + ".part")
+    rows = 0
+    try:
+        conn = _connect_readonly(db_path)
+        try:
+            cur = conn.execute(sql, params)
+            columns = [d[0] for d in cur.description]
+            with _batch_writer(tmp, fmt, columns) as write:
+                while True:
+                    batch = cur.fetchmany(batch_rows)
+                    if not batch:
+                        break
+                    write(batch)
+                    rows += len(batch)
+        finally:
+            conn.close()
+        os.replace(tmp, out_path)
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
+    count("sql_io.rows_exported", rows)
+    return rows
+
+def read_slow_query_log(path: Path | str | None = None) -> pd.DataFrame:
+    """All entries of the slow-query log and its rotated backups, oldest first."""
+    path = Path(path or _slow_cfg["path"] or SLOW_QUERY_LOG_PATH)
+    files = sorted(path.parent.glob(path.name + ".*"), key=lambda p: -int(p.suffix[1:]) if p.suffix[1:].isdigit() else 0)
+    entries = []
+    for f in files + [path]:
+        if f.exists():
+            for line in f.read_text(encoding="utf-8").splitlines():
+                if line.strip():
+                    entries.append(json.loads(line))
+    cols = ["ts", "query", "ms", "rows", "threshold_ms", "signature", "params", "db", "plan"]
+    return pd.DataFrame(entries, columns=cols)
+
+def slow_query_summary(entries: pd.DataFrame) -> pd.DataFrame:
+    """Per query: slow calls, median / max ms, max rows, last seen and the slowest call's parameters."""
+    cols = ["query", "calls", "median_ms", "max_ms", "max_rows", "last_seen", "slowest_params"]
+    if entries.empty:
+        return pd.DataFrame(columns=cols)
+    slowest = entries.loc[entries.groupby("query")["ms"].idxmax(), ["query", "params"]]
+    out = entries.groupby("query").agg(
+        calls=("ms", "size"), median_ms=("ms", "median"), max_ms=("ms", "max"),
+        max_rows=("rows", "max"), last_seen=("ts", "max"),
+    ).reset_index()
+    out = out.merge(slowest.rename(columns={"params": "slowest_params"}), on="query")
+    out["slowest_params"] = out["slowest_params"].map(lambda p: json.dumps(p, ensure_ascii=False))
+    out["median_ms"] = out["median_ms"].round(1)
+    return out.sort_values("max_ms", ascending=False).reset_index(drop=True)[cols]
+
+@timed
+def build_h2h_cube_from_db(db_path: Path | str = DEFAULT_DB_PATH) -> H2HCube:
+    counts = run_query("h2h_year_counts", {}, db_path)
+    return h2h_cube_from_counts(counts)
+
+@timed
+def save_elo_history(ratings_history: pd.DataFrame, db_path: Path | str = DEFAULT_DB_PATH,
+                     progress: Progress = _no_progress) -> int:
+    """Replace elo_history with the ratings_history of compute_elo. Returns rows written."""
+    with _write_transaction(db_path) as conn:
+        rows = _insert_elo(conn, ratings_history)
+    progress(1.0, "elo_history")
+    return rows
+
+@timed
+def load_elo_store_from_db(db_path: Path | str = DEFAULT_DB_PATH, base_rating: float = 1500.0) -> EloStore:
+    with _read_connection(db_path) as conn:
+        hist = pd.read_sql_query(
+            """SELECT t.name AS team, h.seq, h.date, h.rating_before, h.rating
+               FROM elo_history h JOIN teams t ON h.team_id = t.id""",
+            conn,
+        )
+    return build_elo_store(hist, base_rating=base_rating)
+
+if os.environ.get("RESULTS_SLOW_QUERY_MS"):
+    configure_slow_query_log(float(os.environ["RESULTS_SLOW_QUERY_MS"]))
+if os.environ.get("RESULTS_DB_READ_MODE"):
+    configure_read_mode(os.environ["RESULTS_DB_READ_MODE"])
@@ -0,0 +1,108 @@
+from __future__ import annotations
+import asyncio
+import json
+import os
+import time
+import pandas as pd
+from src.api import ApiServer, Dataset
+from src.data_io import load_results
+from src.metrics import build_kpi_index, kpis_in_years, standings
+from src.sql_io import init_db, load_frame_to_db
+
+async def _get(port: int, path: str, headers: dict | None = None):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    extra = "".join(f"{k}: {v}\r\n" for k, v in (headers or {}).items())
+    writer.write(f"GET {path} HTTP/1.1\r\nHost: test\r\nConnection: close\r\n{extra}\r\n".encode())
+    await writer.drain()
+    raw = await reader.read()
+    writer.close()
+    head, _, body = raw.partition(b"\r\n\r\n")
+    lines = head.decode("latin-1").split("\r\n")
+    hdrs = {k.lower(): v.strip() for k, _, v in (line.partition(":") for line in lines[1:])}
+    return int(lines[0].split()[1]), hdrs, (json.loads(body) if body else None)
+
+def test_api_routes_etags_and_cache(tmp_path):
+    csv_path = tmp_path / "results.csv"
+    pd.read_csv("data/results.csv").head(4000).to_csv(csv_path, index=False)
+    db_path = tmp_path / "api.db"
+    init_db(db_path)
+    load_frame_to_db(load_results(csv_path=csv_path), db_path)
+    api = ApiServer(Dataset(csv_path, db_path, check_interval=0.0))
+
+    async def scenario():
+        server = await api.serve("127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        async with server:
+            status, hdrs, body = await _get(port, "/teams/England/kpis?year_from=1900&year_to=1930")
+            k = kpis_in_years(build_kpi_index(load_results(csv_path=csv_path)), "England", 1900, 1930)
+            assert status == 200 and body == {"team": "England", **k}
+            etag = hdrs["etag"]
+
+            # same resource, parameters in another order: cached, same ETag, 304 on revalidation
+            status, hdrs, _ = await _get(port, "/teams/England/kpis?year_to=1930&year_from=1900")
+            assert hdrs["etag"] == etag and api.cache.hits == 1
+            status, hdrs, body = await _get(port, "/teams/England/kpis?year_from=1900&year_to=1930",
+                                            {"If-None-Match": etag})
+            assert status == 304 and body is None
+
+            status, _, body = await _get(port, "/h2h/England/Scotland")
+            assert status == 200 and body["games"] > 0
+            status, _, body = await _get(port, "/elo/leaderboard?as_of=1920-01-01&limit=3")
+            assert len(body["rows"]) == 3
+            status, _, body = await _get(port, "/queries/match_history?date_from=1900-01-01&date_to=1910-12-31"
+                                               "&page_size=5")
+            assert len(body["rows"]) == 5 and body["next_after"][1] == body["rows"][-1]["id"]
+            assert (await _get(port, "/teams/Atlantis/kpis"))[0] == 404
+            assert (await _get(port, "/teams/England/kpis?year_from=x"))[0] == 400
+            for bad in ("/elo/leaderboard?as_of=notadate", "/elo/England?date_from=2001-13-01",
+                        "/teams/England/kpis?date_to=nat", "/standings?year_from=2000&year_to=1990",
+                        "/standings?limit=-3", "/elo/leaderboard?limit=0",
+                        "/queries/match_history?after_date=1900-01-01&after_id=x",
+                        "/queries/match_history?page_size=abc", "/queries/match_history?page_size=0"):
+                assert (await _get(port, bad))[0] == 400
+
+            # one open year bound filters from / up to it
+            status, _, body = await _get(port, "/standings?year_from=1925&limit=500")
+            recent = standings(load_results(csv_path=csv_path).query("year >= 1925"))
+            assert [r["games"] for r in body["rows"]] == recent["games"].tolist()
+            assert (await _get(port, "/nowhere"))[0] == 404
+
+            # touching the CSV keeps ETags; appending a match moves every one
+            os.utime(csv_path, ns=(0, 0))
+            assert (await _get(port, "/teams/England/kpis?year_from=1900&year_to=1930",
+                               {"If-None-Match": etag}))[0] == 304
+            games = kpis_in_years(build_kpi_index(load_results(csv_path=csv_path)), "England")["games"]
+            with open(csv_path, "a", encoding="utf-8") as f:
+                f.write("2030-01-01,England,Scotland,2,0,Friendly,London,England,FALSE\n")
+            status, hdrs, body = await _get(port, "/teams/England/kpis", {"If-None-Match": etag})
+            assert status == 200 and hdrs["etag"] != etag
+            assert body["games"] == games + 1 and api.dataset.snapshot.change == "append"
+
+    asyncio.run(scenario())
+
+def test_refresh_runs_off_the_event_loop(tmp_path):
+    csv_path = tmp_path / "results.csv"
+    pd.read_csv("data/results.csv").head(2000).to_csv(csv_path, index=False)
+    dataset = Dataset(csv_path, tmp_path / "none.db", check_interval=0.0)
+    api = ApiServer(dataset)
+    dataset.current()
+    refresh = dataset.live.refresh
+    def slow_refresh():
+        time.sleep(0.5)
+        return refresh()
+    dataset.live.refresh = slow_refresh
+
+    async def scenario():
+        server = await api.serve("127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        async with server:
+            t0 = time.perf_counter()
+            first = asyncio.ensure_future(_get(port, "/teams/England/kpis"))
+            await asyncio.sleep(0.1)
+            # the loop keeps serving while the first request's refresh runs,
+            # from the last complete snapshot
+            status, _, body = await _get(port, "/teams/England/kpis")
+            assert status == 200 and body["games"] > 0 and time.perf_counter() - t0 < 0.4
+            assert (await first)[0] == 200
+
+    asyncio.run(scenario())
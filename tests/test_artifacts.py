@@ -0,0 +1,48 @@
+from __future__ import annotations
+import json
+import sqlite3
+import pandas as pd
+from src.artifacts import build_bundle, load_bundle, install_database, goal_model_artifact, GOAL_MODEL_HALF_LIFE
+from src.data_io import load_results
+from src.metrics import (
+    compute_elo, build_kpi_index, kpis_in_years, team_perspective, rolling_form, rolling_win_pct, team_rolling,
+)
+
+def test_bundle_round_trip_and_invalidation(tmp_path):
+    csv_path = tmp_path / "results.csv"
+    pd.read_csv("data/results.csv").head(3000).to_csv(csv_path, index=False)
+    root = tmp_path / "artifacts"
+    built = build_bundle(csv_path, root)
+
+    bundle = load_bundle(csv_path, root)
+    assert bundle is not None and bundle.version == built.version
+    assert (root / "CURRENT").read_text() == bundle.version
+    manifest = json.loads((bundle.path / "manifest.json").read_text())
+    assert manifest["db"]["matches"] == len(bundle.load("ingested").results)
+    assert bundle.has(goal_model_artifact(GOAL_MODEL_HALF_LIFE))
+
+    # loaded artifacts equal what a cold start computes
+    df = load_results(compact=True, csv_path=csv_path)
+    pd.testing.assert_frame_equal(bundle.load("ingested").results, df)
+    pd.testing.assert_frame_equal(bundle.load("elo")[1], compute_elo(df)[1])
+    team = df["home_team"].value_counts().index[0]
+    assert kpis_in_years(bundle.load("kpi_index"), team) == kpis_in_years(build_kpi_index(df), team)
+    rf, _, rwp = team_rolling(bundle.load("rolling_tables"), team)
+    pd.testing.assert_frame_equal(rf, rolling_form(team_perspective(df, team), 5), check_exact=True)
+    pd.testing.assert_frame_equal(rwp, rolling_win_pct(team_perspective(df, team), 10), check_exact=True)
+
+    db_path = tmp_path / "app.db"
+    assert install_database(bundle, db_path)
+    assert not install_database(bundle, db_path)  # never replaces a live database
+    with sqlite3.connect(db_path) as conn:
+        assert conn.execute("SELECT COUNT(*) FROM teams").fetchone()[0] == manifest["db"]["teams"]
+
+    # any change to the CSV invalidates the bundle; rebuilding prunes to `keep`
+    with open(csv_path, "a", encoding="utf-8") as f:
+        f.write("2030-01-01,Brazil,Argentina,1,0,Friendly,Rio,Brazil,FALSE\n")
+    assert load_bundle(csv_path, root) is None
+    assert load_bundle(csv_path, tmp_path / "missing") is None
+    rebuilt = build_bundle(csv_path, root, keep=1)
+    assert rebuilt.version != built.version
+    assert [p.name for p in root.iterdir() if p.is_dir()] == [rebuilt.version]
+    assert load_bundle(csv_path, root).version == rebuilt.version
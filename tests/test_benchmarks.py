@@ -0,0 +1,29 @@
+from __future__ import annotations
+from benchmarks.synthetic import generate_results, write_results_csv, parse_size, default_team_count
+from benchmarks.suite import compare_to_baseline
+from src.data_io import ingest_results
+
+def test_synthetic_generator_is_seeded_and_dirty(tmp_path):
+    assert parse_size("50k") == 50_000 and parse_size("10M") == 10_000_000
+    a = generate_results(20_000, seed=3, chunk_rows=7_000)
+    b = generate_results(20_000, seed=3, chunk_rows=7_000)
+    assert a.equals(b) and not a.equals(generate_results(20_000, seed=4, chunk_rows=7_000))
+    assert len(a) == 20_000 and a["home_team"].str.strip().nunique() <= default_team_count(20_000)
+    assert (a["home_team"] != a["away_team"]).all()
+
+    csv_path = write_results_csv(tmp_path / "synthetic.csv", 20_000, seed=3, chunk_rows=7_000, dirty_frac=0.01)
+    ing = ingest_results(csv_path)
+    assert 0 < ing.rows_dropped < 200
+    assert {"INVALID_DATE", "UNCLEAN_TEAM_NAME", "NULL_VALUES"} <= set(ing.issues["issue_type"])
+    assert ing.results["date"].is_monotonic_increasing
+
+def test_regression_compare_flags_slow_paths():
+    base = {"results": [{"size": "50k", "path": "a", "seconds": 1.0},
+                        {"size": "50k", "path": "b", "seconds": 0.01},
+                        {"size": "50k", "path": "c", "seconds": 2.0}]}
+    cur = {"results": [{"size": "50k", "path": "a", "seconds": 1.5},
+                       {"size": "50k", "path": "b", "seconds": 0.03},
+                       {"size": "50k", "path": "c", "seconds": 2.1},
+                       {"size": "1M", "path": "a", "seconds": 9.0}]}
+    report = compare_to_baseline(cur, base, max_slowdown=1.3)
+    assert report.set_index("path")["regressed"].to_dict() == {"a": True, "b": False, "c": False}
@@ -0,0 +1,77 @@
+from __future__ import annotations
+import pandas as pd
+import sqlite3
+from src.data_io import load_results, compact_results, memory_report, ingest_results
+from src.sql_io import init_db, load_csv_to_db, load_frame_to_db
+from src.metrics import (
+    team_perspective, filter_team_opponent_years, kpis,
+    rolling_form, rolling_goal_diff, rolling_win_pct, compute_elo, team_elo_trend
+)
+from src.qa import run_all_checks
+
+def test_compact_schema_and_memory():
+    df = load_results()
+    dfc = compact_results(df)
+    assert isinstance(dfc["home_team"].dtype, pd.CategoricalDtype)
+    assert dfc["home_team"].cat.categories.equals(dfc["away_team"].cat.categories)
+    assert dfc["home_score"].dtype.itemsize <= 2 and dfc["year"].dtype.itemsize <= 2
+    assert (dfc["home_team"].astype(str) == df["home_team"]).all()
+
+    full = memory_report(df)
+    small = memory_report(dfc)
+    total = lambda r: int(r.loc[r["column"] == "TOTAL", "bytes"].iloc[0])
+    assert total(small) * 3 < total(full)
+
+def test_metrics_and_qa_accept_compact_frame():
+    df = load_results()
+    dfc = load_results(compact=True)
+    team = str(df.iloc[0]["home_team"])
+
+    dt, dtc = team_perspective(df, team), team_perspective(dfc, team)
+    assert kpis(dt) == kpis(dtc)
+    opp = str(dt.iloc[0]["opponent"])
+    assert kpis(filter_team_opponent_years(dt, opp, None)) == kpis(filter_team_opponent_years(dtc, opp, None))
+    assert rolling_form(dt)["rolling_form"].tolist() == rolling_form(dtc)["rolling_form"].tolist()
+    assert rolling_goal_diff(dt)["rolling_gd"].tolist() == rolling_goal_diff(dtc)["rolling_gd"].tolist()
+    assert rolling_win_pct(dt)["rolling_win_pct"].tolist() == rolling_win_pct(dtc)["rolling_win_pct"].tolist()
+
+    head = dfc.head(2000)
+    hist, final = compute_elo(head)
+    hist_ref, final_ref = compute_elo(df.head(2000))
+    assert final["rating"].round(6).tolist() == final_ref["rating"].round(6).tolist()
+    assert not team_elo_trend(hist, team).empty
+
+    assert len(run_all_checks(dfc)) == len(run_all_checks(df))
+
+def test_single_parse_ingestion_feeds_every_backend(tmp_path):
+    raw = pd.read_csv("data/results.csv").head(500)
+    raw["year"] = 1066  # a stale year column must not be trusted
+    raw.loc[3, "date"] = "not a date"
+    raw.loc[5, "home_team"] = "  " + raw.loc[5, "home_team"] + " "
+    raw.loc[7, "away_score"] = None
+    csv_path = tmp_path / "results.csv"
+    raw.to_csv(csv_path, index=False)
+
+    ing = ingest_results(csv_path)
+    df = ing.results
+    assert ing.rows_read == 500 and ing.rows_dropped == 2 and len(df) == 498
+    assert (df["year"] == df["date"].dt.year).all()
+    assert df["date"].is_monotonic_increasing and df["home_score"].dtype == "int64"
+    assert raw.loc[5, "home_team"].strip() in set(df["home_team"])
+    assert "INVALID_DATE" in set(ing.issues["issue_type"])
+    assert load_results(csv_path=csv_path).equals(df)
+
+    # the CSV loader and the frame loader write identical matches
+    rows = []
+    for name, load in (("csv", lambda p: load_csv_to_db(p, csv_path)),
+                       ("frame", lambda p: load_frame_to_db(ingest_results(csv_path, compact=True).results, p))):
+        db_path = tmp_path / f"{name}.db"
+        init_db(db_path)
+        assert load(db_path) == (len(set(df["home_team"]) | set(df["away_team"])), 498)
+        with sqlite3.connect(db_path) as conn:
+            rows.append(conn.execute(
+                """SELECT m.date, m.year, h.name, a.name, m.home_score, m.away_score FROM matches m
+                   JOIN teams h ON h.id = m.home_team_id JOIN teams a ON a.id = m.away_team_id
+                   ORDER BY m.id""").fetchall())
+    assert rows[0] == rows[1]
+    assert [r[0] for r in rows[0]] == df["date"].dt.strftime("%Y-%m-%d").tolist()
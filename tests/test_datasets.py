@@ -0,0 +1,63 @@
+from __future__ import annotations
+import pandas as pd
+import src.datasets as datasets
+from src import sql_io
+from src.data_io import load_results
+from src.datasets import DEFAULT_DATASET, list_datasets, dataset_shards
+from src.etl import load_dataset
+from src.incremental import LivePool
+from src.sql_io import run_query, run_federated_query, replica_sizes
+
+def _leagues(tmp_path, monkeypatch):
+    raw = pd.read_csv("data/results.csv").head(3000)
+    root = tmp_path / "datasets"
+    for name, part in (("league_a", raw.iloc[:1500]), ("league_b", raw.iloc[1500:])):
+        (root / name).mkdir(parents=True)
+        part.to_csv(root / name / "results.csv", index=False)
+    (root / "not a dataset").mkdir()
+    monkeypatch.setattr(datasets, "DATASETS_DIR", root)
+    return raw
+
+def test_shards_federated_views_and_partitioned_caches(tmp_path, monkeypatch):
+    raw = _leagues(tmp_path, monkeypatch)
+    specs = list_datasets()
+    assert list(specs) == [DEFAULT_DATASET, "league_a", "league_b"]
+    for name in ("league_a", "league_b"):
+        assert load_dataset(name)[2] == len(load_results(csv_path=specs[name].csv_path))
+
+    # per-dataset queries see only their own shard
+    a = run_query("team_year_leaderboard", {"year_from": 1800, "year_to": 2100, "min_games": 1, "limit": 1000},
+                  specs["league_a"].db_path)
+    assert a["games"].sum() == 2 * 1500
+
+    shards = {k: v for k, v in dataset_shards().items() if k != DEFAULT_DATASET}
+    overview = run_federated_query("dataset_overview", {}, shards).set_index("dataset")
+    assert overview.loc["league_a", "matches"] == 1500 and overview.loc["league_b", "matches"] == 1500
+    assert overview.loc["league_a", "last_match"] <= overview.loc["league_b", "first_match"]
+
+    team = raw["home_team"].iloc[0]
+    across = run_federated_query("team_across_datasets", {"team_name": team, "year_from": 1800, "year_to": 2100},
+                                 shards)
+    played = ((raw["home_team"] == team) | (raw["away_team"] == team))
+    assert across["games"].sum() == played.sum()
+    top = run_federated_query("elo_top_across_datasets", {"limit": 3}, shards)
+    assert top.groupby("dataset").size().tolist() == [3, 3]
+
+    # snapshots are per dataset; the least recently used is dropped past the budget
+    pool = LivePool(budget_mb=0, artifacts_root=None)
+    snap_a = pool.get("league_a", specs["league_a"].csv_path).refresh()
+    assert len(snap_a.ingested.results) == 1500
+    pool.get("league_b", specs["league_b"].csv_path)
+    assert list(pool.sizes()) == ["league_b"]
+
+    # so are the in-memory SQL replicas, under their own budget
+    sql_io.configure_read_mode("memory")
+    try:
+        monkeypatch.setattr(sql_io, "REPLICA_BUDGET_MB", 0)
+        run_query("team_year_leaderboard", {"year_from": 1800, "year_to": 2100, "min_games": 1, "limit": 5},
+                  specs["league_a"].db_path)
+        run_query("team_year_leaderboard", {"year_from": 1800, "year_to": 2100, "min_games": 1, "limit": 5},
+                  specs["league_b"].db_path)
+        assert list(replica_sizes()) == [str(specs["league_b"].db_path.resolve())]
+    finally:
+        sql_io.configure_read_mode("default")
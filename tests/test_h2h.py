@@ -1,6 +1,9 @@
 from __future__ import annotations
 from src.data_io import load_results
-from src.metrics import team_perspective, kpis, h2h_summary_table
+from src.metrics import (
+    team_perspective, kpis, h2h_summary_table, filter_team_opponent_years,
+    build_h2h_cube, h2h_lookup
+)
 
 def test_h2h_summary_consistency():
     df = load_results()
@@ -14,3 +17,17 @@ def test_h2h_summary_consistency():
     assert k["games"] == k["w"] + k["d"] + k["l"]
     # And table must reflect Games == KPIs games
     assert int(tbl.iloc[0]["Games"]) == k["games"]
+
+def test_h2h_cube_matches_filtered_kpis():
+    df = load_results()
+    cube = build_h2h_cube(df)
+    df_t = team_perspective(df, "England")
+    for opp in ["Scotland", "Germany", "Brazil"]:
+        assert h2h_lookup(cube, "England", opp) == kpis(filter_team_opponent_years(df_t, opp, None))
+        for first, last in [(1900, 1950), (1966, 1966), (2030, 2040)]:
+            expected = kpis(filter_team_opponent_years(df_t, opp, list(range(first, last + 1))))
+            assert h2h_lookup(cube, "England", opp, first, last) == expected
+    # mirrored pair
+    fwd, rev = h2h_lookup(cube, "England", "Scotland"), h2h_lookup(cube, "Scotland", "England")
+    assert (fwd["w"], fwd["gf"]) == (rev["l"], rev["ga"])
+    assert h2h_lookup(cube, "England", "No Such Team")["games"] == 0
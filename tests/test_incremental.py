@@ -0,0 +1,76 @@
+from __future__ import annotations
+import os
+import numpy as np
+import pandas as pd
+from src.data_io import ingest_results
+from src.incremental import LiveResults
+from src.metrics import compute_elo, build_kpi_index, build_elo_store, build_rolling_tables
+
+def _write(path, lines):
+    with open(path, "wb") as f:
+        f.write(b"".join(lines))
+
+def _append(path, lines):
+    with open(path, "ab") as f:
+        f.write(b"".join(lines))
+
+def _assert_matches_full_ingest(snap, path):
+    full = ingest_results(path, compact=True)
+    pd.testing.assert_frame_equal(snap.ingested.results, full.results)
+    assert snap.ingested.rows_read == full.rows_read and snap.ingested.rows_dropped == full.rows_dropped
+    history, final = compute_elo(full.results)
+    pd.testing.assert_frame_equal(snap.elo[0], history)
+    pd.testing.assert_frame_equal(snap.elo[1], final)
+    kpi = build_kpi_index(full.results)
+    assert snap.kpi_index.teams == kpi.teams
+    assert np.array_equal(snap.kpi_index.cum, kpi.cum) and np.array_equal(snap.kpi_index.dates, kpi.dates)
+    store = build_elo_store(history)
+    assert snap.elo_store.teams == store.teams
+    assert np.array_equal(snap.elo_store.rating, store.rating) and np.array_equal(snap.elo_store.dates, store.dates)
+
+def _assert_rolling_extended(snap, path):
+    # carried over from the previous snapshot and extended, not rebuilt
+    tables = snap.cached("rolling_tables", lambda: None)
+    full = build_rolling_tables(ingest_results(path, compact=True).results)
+    assert tables is not None and tables.teams == full.teams
+    assert np.array_equal(tables.dates, full.dates) and np.array_equal(tables.gf, full.gf)
+    assert all(np.array_equal(tables.rolling[c], full.rolling[c]) for c in full.rolling)
+
+def test_appends_are_folded_in_and_match_a_full_ingest(tmp_path):
+    lines = open("data/results.csv", "rb").read().splitlines(keepends=True)[:3001]
+    path = tmp_path / "results.csv"
+    _write(path, lines[:2900])
+    live = LiveResults(path, artifacts_root=None)
+    first = live.refresh()
+    assert first.generation == 0 and first.change == "full"
+    h2h = first.cached("h2h_cube", lambda: object())
+    first.cached("rolling_tables", lambda: build_rolling_tables(first.ingested.results))
+
+    os.utime(path, ns=(1, 1))  # touched, same bytes: same data, cached objects kept
+    assert live.refresh().generation == 0 and live.refresh().cached("h2h_cube", lambda: None) is h2h
+
+    # a matchday: new rows after the last date, plus one bad row for QA
+    _append(path, lines[2900:2950] + [b"not-a-date,Wales,Ireland,1,1,Friendly,Cardiff,Wales,FALSE\n"])
+    snap = live.refresh()
+    assert snap.change == "append" and snap.generation == 1
+    assert snap.cached("h2h_cube", lambda: "rebuilt") == "rebuilt"
+    assert first.ingested.rows_read == 2899  # earlier snapshots are left as they were
+    bad = snap.ingested.issues[snap.ingested.issues["issue_type"] == "INVALID_DATE"]
+    assert bad["row_index"].tolist() == [2949]
+    _assert_matches_full_ingest(snap, path)
+    _assert_rolling_extended(snap, path)
+
+    _append(path, lines[2950:])
+    assert live.refresh().change == "append"
+    _assert_matches_full_ingest(live.snapshot, path)
+    _assert_rolling_extended(live.snapshot, path)
+
+    # a back-dated match re-rates everything after it
+    _append(path, [b"1880-03-13,Wales,Scotland,1,5,Friendly,Wrexham,Wales,FALSE\n"])
+    assert live.refresh().change == "backfill"
+    _assert_matches_full_ingest(live.snapshot, path)
+
+    # an edit to earlier rows reloads the file
+    _write(path, lines[:2000])
+    assert live.refresh().change == "full"
+    _assert_matches_full_ingest(live.snapshot, path)
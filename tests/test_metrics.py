@@ -6,8 +6,12 @@ import pandas as pd
 from src.data_io import load_results
 from src.metrics import (
     team_perspective, filter_team_opponent_years, kpis,
-    rolling_form, rolling_goal_diff, rolling_win_pct,
-    compute_elo, team_elo_trend
+    rolling_form, rolling_goal_diff, rolling_win_pct, build_rolling_tables, team_rolling,
+    compute_elo, team_elo_trend,
+    build_kpi_index, kpis_in_range, kpis_in_years, contiguous_year_range,
+    build_elo_store, elo_trend, elo_rating_at, elo_leaderboard_as_of, standings,
+    streaks_table, team_records, match_records,
+    match_expectations, adjusted_kpis, adjusted_kpis_table
 )
 
 def test_rolling_metrics_and_kpis():
@@ -54,3 +58,156 @@ def test_elo_lite_outputs():
     assert isinstance(trend, pd.DataFrame)
     if not trend.empty:
         assert "rating" in trend.columns
+
+def test_time_based_rolling_windows():
+    df_t = pd.DataFrame({
+        "date": pd.to_datetime(["2020-01-01", "2020-06-01", "2020-06-01", "2021-03-01", "2022-01-01"]),
+        "result": ["W", "L", "D", "W", "L"],
+        "gf": [2, 0, 1, 3, 0],
+        "ga": [0, 1, 1, 1, 2],
+    })
+    rf = rolling_form(df_t, window="365D")
+    # brute force: all matches in (date - 365D, date], same-date matches included
+    for i, d in enumerate(df_t["date"]):
+        in_win = df_t[(df_t["date"] > d - pd.Timedelta("365D")) & (df_t["date"] <= d)]
+        expected = in_win["result"].map({"W": 1.0, "D": 0.5, "L": 0.0}).mean()
+        assert abs(rf["rolling_form"].iloc[i] - expected) < 1e-12
+    # both matches on 2020-06-01 share one value
+    assert rf["rolling_form"].iloc[1] == rf["rolling_form"].iloc[2]
+
+    rgd = rolling_goal_diff(df_t, window="2Y")
+    assert abs(rgd["rolling_gd"].iloc[3] - (2 - 1 + 0 + 2) / 4) < 1e-12
+
+    rwp = rolling_win_pct(df_t.iloc[::-1], window="365D")
+    assert abs(rwp.loc[3, "rolling_win_pct"] - 100.0 / 3) < 1e-9
+
+    # a digit-only string is a match count, not a nanosecond span
+    assert rolling_form(df_t, window="3")["rolling_form"].equals(rolling_form(df_t, window=3)["rolling_form"])
+
+def test_rolling_tables_match_per_team_rolling():
+    df = load_results().head(8000)
+    tables = build_rolling_tables(df)
+    for team in ("England", "Brazil", "Hungary", "Atlantis"):
+        dt = team_perspective(df, team)
+        rf, rgd, rwp = team_rolling(tables, team)
+        pd.testing.assert_frame_equal(rf, rolling_form(dt, 5), check_exact=True)
+        pd.testing.assert_frame_equal(rgd, rolling_goal_diff(dt, 5), check_exact=True)
+        pd.testing.assert_frame_equal(rwp, rolling_win_pct(dt, 10), check_exact=True)
+
+def test_team_perspective_matches_row_wise_definition():
+    df = load_results().head(3000)
+    team = str(df.iloc[0]["home_team"])
+    df_t = team_perspective(df, team)
+    sub = df[(df["home_team"] == team) | (df["away_team"] == team)]
+    assert len(df_t) == len(sub)
+    home = df_t["is_home"]
+    assert (df_t["opponent"] == df_t["away_team"].where(home, df_t["home_team"])).all()
+    assert (df_t["gf"] == df_t["home_score"].where(home, df_t["away_score"])).all()
+    expected = ["W" if gf > ga else "L" if gf < ga else "D" for gf, ga in zip(df_t["gf"], df_t["ga"])]
+    assert df_t["result"].tolist() == expected
+    assert df_t["date"].is_monotonic_increasing
+
+    # no filters -> no new frame is allocated
+    assert filter_team_opponent_years(df_t, None, None) is df_t
+
+def test_kpi_index_matches_scan():
+    df = load_results()
+    index = build_kpi_index(df)
+    for team in ["England", "Brazil", "Andorra", str(df.iloc[-1]["away_team"])]:
+        df_t = team_perspective(df, team)
+        assert kpis_in_years(index, team) == kpis(df_t)
+        for first, last in [(1990, 1999), (2010, 2010), (1800, 1850)]:
+            expected = kpis(filter_team_opponent_years(df_t, None, list(range(first, last + 1))))
+            assert kpis_in_years(index, team, first, last) == expected
+        start, end = pd.Timestamp("2002-05-31"), pd.Timestamp("2006-07-09")
+        expected = kpis(df_t[(df_t["date"] >= start) & (df_t["date"] <= end)])
+        assert kpis_in_range(index, team, start, end) == expected
+    assert kpis_in_years(index, "No Such Team")["games"] == 0
+    assert contiguous_year_range([2001, 1999, 2000]) == (1999, 2001)
+    assert contiguous_year_range([1999, 2001]) is None
+
+def test_elo_store_point_in_time_lookups():
+    df = load_results().head(5000)
+    ratings_history, final_ratings = compute_elo(df)
+    store = build_elo_store(ratings_history)
+
+    team = str(final_ratings.iloc[0]["team"])
+    ref = ratings_history[ratings_history["team"] == team].reset_index(drop=True)
+    got = elo_trend(store, team)
+    assert got["date"].tolist() == ref["date"].tolist()
+    assert (got["rating"] - ref["rating"]).abs().max() < 1e-3
+    assert len(team_elo_trend(ratings_history, team)) == len(got)
+
+    as_of = df["date"].iloc[-1]
+    board = elo_leaderboard_as_of(store, as_of, top=len(final_ratings))
+    assert board["team"].tolist()[:5] == final_ratings["team"].tolist()[:5]
+
+    # pre-match rating equals the previous post-match rating
+    assert elo_rating_at(store, team, got["date"].iloc[1]) == float(store.rating[store.teams[team][0]])
+    assert elo_rating_at(store, team, "1800-01-01") == store.base_rating
+
+def test_standings_match_per_team_kpis():
+    df = load_results()
+    table = standings(df, tournament="FIFA World Cup", years=[2014, 2018])
+    assert table["rank"].tolist() == list(range(1, len(table) + 1))
+    assert table["points"].is_monotonic_decreasing
+    wc = df[(df["tournament"] == "FIFA World Cup") & df["year"].isin([2014, 2018])]
+    for team in table["team"].head(5):
+        k = kpis(team_perspective(wc, team))
+        row = table[table["team"] == team].iloc[0]
+        assert [int(row[c]) for c in ("games", "w", "d", "l", "gf", "ga")] == \
+            [k[c] for c in ("games", "w", "d", "l", "gf", "ga")]
+        assert int(row["points"]) == 3 * k["w"] + k["d"]
+
+    dated = standings(df, date_range=("2010-06-11", "2010-07-11"), tournament=["FIFA World Cup"])
+    assert dated.iloc[0]["team"] in {"Spain", "Netherlands", "Germany"}
+    assert standings(df, tournament="No Such Cup").empty
+
+def test_streaks_and_records_match_brute_force():
+    df = load_results().head(6000)
+    streaks = streaks_table(df)
+    records = team_records(df)
+    team = "England"
+    res = team_perspective(df, team)["result"].tolist()
+
+    def longest_and_current(flags):
+        best = cur = 0
+        for f in flags:
+            cur = cur + 1 if f else 0
+            best = max(best, cur)
+        return best, cur
+
+    row = streaks[(streaks["team"] == team) & (streaks["streak"] == "unbeaten")].iloc[0]
+    assert (row["longest"], row["current"]) == longest_and_current([r != "L" for r in res])
+    row = streaks[(streaks["team"] == team) & (streaks["streak"] == "win")].iloc[0]
+    assert (row["longest"], row["current"]) == longest_and_current([r == "W" for r in res])
+
+    df_t = team_perspective(df, team)
+    rec = records[(records["team"] == team) & (records["record"] == "biggest_win")].iloc[0]
+    assert rec["value"] == (df_t["gf"] - df_t["ga"]).max()
+    top = match_records(df, "highest_scoring", top=3)
+    assert top["highest_scoring"].tolist() == sorted((df["home_score"] + df["away_score"]).tolist(), reverse=True)[:3]
+
+def test_adjusted_kpis_use_pre_match_elo():
+    df = load_results().head(5000)
+    ratings_history, _ = compute_elo(df)
+    store = build_elo_store(ratings_history)
+    exp = match_expectations(df, ratings_history)
+    assert len(exp) == 2 * len(df)
+    assert ((exp["p_win"] + exp["p_draw"] + exp["p_loss"]) - 1).abs().max() < 1e-9
+
+    for i in range(0, len(exp), 997):
+        r = exp.iloc[i]
+        assert abs(elo_rating_at(store, str(r["team"]), r["date"]) - r["elo"]) < 1e-3
+        assert abs(elo_rating_at(store, str(r["opponent"]), r["date"]) - r["opp_elo"]) < 1e-3
+
+    team = str(df.iloc[0]["home_team"])
+    rows = exp[exp["team"] == team]
+    k = adjusted_kpis(rows)
+    assert k["games"] == kpis(team_perspective(df, team))["games"]
+    assert k["pts"] == int(rows["pts"].sum())
+
+    table = adjusted_kpis_table(exp).set_index("team")
+    assert table.loc[team, "pts"] == k["pts"]
+    assert abs(table.loc[team, "poe"] - k["poe"]) < 0.11
+    assert table["games"].sum() == len(exp)
@@ -0,0 +1,44 @@
+from __future__ import annotations
+import json
+from src import perf
+from src.data_io import load_results
+from src.metrics import team_perspective, kpis
+
+def test_disabled_instrumentation_records_nothing():
+    perf.enable(False)
+    perf.reset()
+    with perf.record() as rec:
+        df = load_results().head(1000)
+        kpis(team_perspective(df, str(df.iloc[0]["home_team"])))
+        with perf.timer("manual"):
+            pass
+        perf.count("manual.events")
+    assert rec.events == []
+    assert perf.snapshot()["timers"] == {} and perf.snapshot()["counters"] == {}
+
+def test_enabled_timers_counters_and_exports():
+    perf.enable(True)
+    perf.reset()
+    try:
+        with perf.record() as rec:
+            with perf.timer("outer"):
+                df = load_results()
+                kpis(team_perspective(df, str(df.iloc[0]["home_team"])))
+        names = [e["name"] for e in rec.events]
+        assert names[-1] == "outer" and rec.events[-1]["depth"] == 0
+        assert {"data_io.parse_results", "data_io.ingest_results", "metrics.team_perspective", "metrics.kpis"} <= set(names)
+        assert next(e for e in rec.events if e["name"] == "metrics.kpis")["depth"] == 1
+
+        rows = perf.breakdown(rec)
+        assert rows[0]["name"] == "outer" and rows[0]["total_ms"] >= rows[-1]["total_ms"]
+
+        snap = perf.snapshot()
+        assert snap["timers"]["metrics.kpis"]["count"] == 1
+        assert snap["counters"]["data_io.rows_parsed"] == len(df)
+        assert json.loads(perf.to_json())["enabled"] is True
+        prom = perf.to_prometheus()
+        assert 'results_call_seconds_count{name="metrics.kpis"} 1' in prom
+        assert "# TYPE results_events_total counter" in prom
+    finally:
+        perf.enable(False)
+        perf.reset()
@@ -0,0 +1,61 @@
+from __future__ import annotations
+import numpy as np
+import pandas as pd
+import pytest
+from src.data_io import load_results
+from src.ratings import encode_matches
+from src.poisson import _objective, fit_poisson, decay_weights
+from src.metrics import (
+    fit_goal_model, goal_model_strengths, scoreline_probabilities, fixture_outcome_probabilities,
+)
+
+def test_gradient_matches_finite_differences():
+    enc = encode_matches(load_results().head(2000))
+    k = len(enc.teams)
+    f = _objective(enc, decay_weights(enc.dates, enc.dates[-1], 5.0), l2=1.0)
+    theta = np.random.default_rng(0).normal(0, 0.1, 3 + 2 * k)
+    theta[2] = 0.05
+    _, grad = f(theta)
+    for i in (0, 1, 2, 3, 3 + k):
+        e = np.zeros_like(theta)
+        e[i] = 1e-6
+        numeric = (f(theta + e)[0] - f(theta - e)[0]) / 2e-6
+        assert abs(numeric - grad[i]) < 1e-6
+
+def test_fit_recovers_synthetic_strengths():
+    rng = np.random.default_rng(1)
+    teams = [f"T{i}" for i in range(8)]
+    attack = np.linspace(-0.4, 0.4, 8)
+    pairs = [(i, j) for i in range(8) for j in range(8) if i != j] * 40
+    h = np.array([p[0] for p in pairs])
+    a = np.array([p[1] for p in pairs])
+    df = pd.DataFrame({
+        "date": pd.date_range("2000-01-01", periods=len(pairs), freq="D"),
+        "home_team": np.array(teams)[h], "away_team": np.array(teams)[a],
+        "home_score": rng.poisson(np.exp(0.1 + 0.3 + attack[h])),
+        "away_score": rng.poisson(np.exp(0.1 + attack[a])),
+        "neutral": False,
+    })
+    model = fit_poisson(encode_matches(df), l2=0.01)
+    assert abs(model.home_advantage - 0.3) < 0.08
+    assert np.corrcoef(model.attack, attack)[0, 1] > 0.95
+    assert abs(model.defence).max() < 0.15
+
+def test_goal_model_api():
+    df = load_results().head(6000)
+    model = fit_goal_model(df, half_life_years=10)
+    table = goal_model_strengths(model)
+    home, away = table["team"].iloc[0], table["team"].iloc[-1]
+
+    grid = scoreline_probabilities(model, home, away, max_goals=8)
+    assert grid.shape == (9, 9) and abs(grid.to_numpy().sum() - 1) < 1e-9
+    p = fixture_outcome_probabilities(model, home, away)
+    assert abs(p["home_win"] + p["draw"] + p["away_win"] - 1) < 1e-9
+    assert p["home_win"] > p["away_win"] and p["exp_home_goals"] > p["exp_away_goals"]
+    # home advantage disappears on neutral ground
+    assert fixture_outcome_probabilities(model, home, away, neutral=True)["home_win"] < p["home_win"]
+
+    with pytest.raises(ValueError):
+        fixture_outcome_probabilities(model, home, "Atlantis")
+    early = fit_goal_model(df, as_of=df["date"].iloc[1000])
+    assert len(early.teams) < len(model.teams)
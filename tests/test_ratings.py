@@ -0,0 +1,63 @@
+from __future__ import annotations
+import numpy as np
+import pandas as pd
+from src.data_io import load_results
+from src.metrics import compute_elo
+from src.ratings import RatingModel, DEFAULT_RATING_MODELS, compute_ratings, tournament_weight
+
+def _reference_elo(df, base_rating=1500.0, k_factor=20.0, home_advantage=50.0):
+    # the per-row Elo loop compute_elo replaced, on a stable date order
+    df = df.sort_values("date", kind="stable").reset_index(drop=True)
+    rating = {}
+    out = []
+    for ht, at, hs, as_ in zip(df["home_team"].astype(str), df["away_team"].astype(str),
+                               df["home_score"], df["away_score"]):
+        rh = rating.get(ht, base_rating); ra = rating.get(at, base_rating)
+        e_home = 1.0 / (1.0 + 10.0 ** ((ra - (rh + home_advantage)) / 400.0))
+        e_away = 1.0 - e_home
+        s_home, s_away = (1.0, 0.0) if hs > as_ else (0.0, 1.0) if hs < as_ else (0.5, 0.5)
+        rating[ht] = rh + k_factor * (s_home - e_home)
+        rating[at] = ra + k_factor * (s_away - e_away)
+        out += [rating[ht], rating[at]]
+    return np.array(out)
+
+def test_compute_elo_is_exactly_the_reference_loop():
+    df = load_results()
+    elo_hist, _ = compute_elo(df)
+    assert np.array_equal(elo_hist["rating"].to_numpy(), _reference_elo(df))
+
+def test_multi_model_pass_matches_single_model_runs():
+    df = load_results().head(4000)
+    hist, final, scores = compute_ratings(df, DEFAULT_RATING_MODELS)
+    assert list(scores["model"]) == [m.name for m in DEFAULT_RATING_MODELS]
+    assert ((scores["brier"] > 0) & (scores["brier"] < 0.25)).all()
+
+    # baseline column == compute_elo
+    elo_hist, _ = compute_elo(df)
+    assert np.array_equal(hist["elo"].to_numpy(), elo_hist["rating"].to_numpy())
+
+    # each model in the shared pass == that model run on its own
+    for model in DEFAULT_RATING_MODELS[1:]:
+        solo_hist, _, _ = compute_ratings(df, [model])
+        assert np.array_equal(hist[model.name].to_numpy(), solo_hist[model.name].to_numpy())
+
+def test_neutral_and_tournament_adjustments():
+    df = pd.DataFrame({
+        "date": pd.to_datetime(["2000-01-01", "2000-02-01"]),
+        "home_team": ["A", "B"], "away_team": ["B", "A"],
+        "home_score": [1, 3], "away_score": [0, 0],
+        "tournament": ["Friendly", "FIFA World Cup"], "neutral": [True, False],
+    })
+    models = [RatingModel("base"), RatingModel("neutral", neutral_aware=True),
+              RatingModel("tourn", tournament_weighted=True), RatingModel("margin", margin_weighted=True)]
+    hist, final, _ = compute_ratings(df, models)
+    first = hist.iloc[0]
+    # on neutral ground the home win was less expected -> bigger gain
+    assert first["neutral"] > first["base"]
+    # World Cup match moves ratings more than a friendly would
+    # (rows 1 and 2 are team B after match 1 and after match 2)
+    b1, b2 = hist.iloc[1], hist.iloc[2]
+    assert abs(b2["tourn"] - b1["tourn"]) > abs(b2["base"] - b1["base"])
+    assert abs(b2["margin"] - b1["margin"]) > abs(b2["base"] - b1["base"])
+    assert tournament_weight("FIFA World Cup qualification") == 2.0
+    assert set(final["team"]) == {"A", "B"}
@@ -2,7 +2,9 @@ from __future__ import annotations
 from pathlib import Path
 import pandas as pd
 from src.data_io import load_results
-from src.metrics import team_perspective, kpis, rolling_form, rolling_goal_diff
+from src.metrics import (
+    team_perspective, kpis, rolling_form, rolling_goal_diff, streaks_table, team_records
+)
 from src.report import build_h2h_report_html, build_team_report_html, save_report_html
 
 def test_build_and_save_h2h_report(tmp_path: Path):
@@ -45,3 +47,24 @@ def test_build_and_save_team_report(tmp_path: Path):
     assert out.exists()
     txt = out.read_text(encoding="utf-8")
     assert team in txt and "Team Report" in txt
+
+def test_team_report_with_streaks_and_records(tmp_path: Path):
+    df = load_results().head(3000)
+    team = str(df.iloc[0]["home_team"])
+    dfT = team_perspective(df, team)
+    streaks = streaks_table(df)
+    records = team_records(df)
+    html_text = build_team_report_html(
+        team, kpis(dfT), pd.DataFrame(), pd.DataFrame(), [], [],
+        streaks_table=streaks[streaks["team"] == team].drop(columns="team"),
+        records_table=records[records["team"] == team].drop(columns="team"),
+    )
+    assert "Streaks &amp; Records" in html_text and "unbeaten" in html_text and "biggest_win" in html_text
+
+def test_report_with_adjusted_kpis():
+    df = load_results().head(3000)
+    team = str(df.iloc[0]["home_team"])
+    adjusted = {"games": 10, "pts": 18, "xpts": 15.2, "poe": 2.8, "poe_per_game": 0.28, "avg_opp_elo": 1532.0}
+    html_text = build_team_report_html(team, kpis(team_perspective(df, team)), pd.DataFrame(), pd.DataFrame(),
+                                       [], [], adjusted_kpi=adjusted)
+    assert "Expected Points" in html_text and "+2.8" in html_text and "1532" in html_text
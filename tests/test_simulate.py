@@ -0,0 +1,42 @@
+from __future__ import annotations
+import numpy as np
+import pytest
+from src.simulate import Tournament, simulate_tournament, match_probabilities
+
+RATINGS = {"A": 2000.0, "B": 1800.0, "C": 1700.0, "D": 1600.0,
+           "E": 1650.0, "F": 1550.0, "G": 1500.0, "H": 1450.0}
+
+def test_match_probabilities_sum_to_one():
+    p_w, p_d, p_l = match_probabilities(np.array([1500.0, 1900.0]), np.array([1500.0, 1500.0]))
+    assert np.allclose(p_w + p_d + p_l, 1.0)
+    assert p_w[1] > p_w[0] and p_d[1] < p_d[0]
+
+def test_groups_and_knockout_probabilities():
+    t = Tournament(groups={"X": ["A", "B", "C", "D"], "Y": ["E", "F", "G", "H"]}, advance=2)
+    out = simulate_tournament(t, RATINGS, n_sims=20_000, seed=1, batch_size=5_000)
+    assert abs(out["p_champion"].sum() - 1.0) < 1e-9
+    assert abs(out["p_group_advance"].sum() - 4.0) < 1e-9
+    assert abs(out["p_final"].sum() - 2.0) < 1e-9
+    assert out.iloc[0]["team"] == "A"
+    assert (out["p_semi_final"] >= out["p_final"]).all()
+
+def test_seeded_runs_are_reproducible_across_workers():
+    t = Tournament(knockout=list(RATINGS))
+    one = simulate_tournament(t, RATINGS, n_sims=12_000, seed=7, batch_size=4_000, workers=1)
+    two = simulate_tournament(t, RATINGS, n_sims=12_000, seed=7, batch_size=4_000, workers=2)
+    assert one.equals(two)
+
+def test_fixture_list_and_bad_bracket():
+    fixtures = [(a, b) for a in "ABC" for b in "ABC" if a != b]
+    out = simulate_tournament(Tournament(fixtures=fixtures), RATINGS, n_sims=5_000, seed=3)
+    assert abs(out["p_league_first"].sum() - 1.0) < 1e-9
+    assert out.iloc[0]["team"] == "A"
+    with pytest.raises(ValueError):
+        simulate_tournament(Tournament(knockout=["A", "B", "C"]), RATINGS, n_sims=10)
+
+def test_empty_tournament_and_no_sims_are_rejected():
+    for t in (Tournament(), Tournament(knockout=[]), Tournament(groups={}), Tournament(groups={"A": []})):
+        with pytest.raises(ValueError):
+            simulate_tournament(t, RATINGS, n_sims=10)
+    with pytest.raises(ValueError):
+        simulate_tournament(Tournament(knockout=list(RATINGS)), RATINGS, n_sims=0)
@@ -7,9 +7,24 @@ if str(ROOT) not in sys.path:
     sys.path.insert(0, str(ROOT))
 # ------------------------------------------
 
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 import pandas as pd
-from src.sql_io import init_db, load_csv_to_db, run_query
+from src.data_io import load_results
+from src.metrics import (
+    build_h2h_cube, h2h_lookup, build_kpi_index, kpis_in_years,
+    compute_elo, elo_leaderboard_as_of, elo_trend, elo_rating_at,
+    team_perspective, rolling_form, rolling_goal_diff, rolling_win_pct
+)
+from src.sql_io import (
+    init_db, load_csv_to_db, load_frame_to_db, run_query, build_h2h_cube_from_db,
+    save_elo_history, load_elo_store_from_db,
+    configure_slow_query_log, read_slow_query_log, slow_query_summary,
+    configure_read_mode, refresh_replica, READ_MODES, _read_connection, _replicas,
+    rebuild_db, db_writer, run_query_paged, iter_query_pages, export_query
+)
+import pytest
 
 def test_sql_etl_and_queries():
     # 1) check CSV exists and not empty
@@ -42,3 +57,320 @@ def test_sql_etl_and_queries():
     rf = run_query("recent_form_10", {"team_name": team_a, "limit": 10}, db_path)
     assert isinstance(rf, pd.DataFrame)
     assert len(rf) <= 10
+
+def test_h2h_cube_from_db_matches_dataframe(tmp_path):
+    db_path = tmp_path / "h2h.db"
+    init_db(db_path)
+    load_csv_to_db(db_path, Path("data/results.csv"))
+
+    cube_db = build_h2h_cube_from_db(db_path)
+    cube_df = build_h2h_cube(load_results())
+    assert set(cube_db.pairs) == set(cube_df.pairs)
+    for a, b, y0, y1 in [("England", "Scotland", 1872, 2030), ("Brazil", "Argentina", 1990, 2005)]:
+        assert h2h_lookup(cube_db, a, b, y0, y1) == h2h_lookup(cube_df, a, b, y0, y1)
+        row = run_query("h2h_summary_years",
+                        {"team_a": a, "team_b": b, "year_from": y0, "year_to": y1}, db_path).iloc[0]
+        k = h2h_lookup(cube_db, a, b, y0, y1)
+        assert [int(row[c]) for c in ("games", "w", "d", "l", "gf", "ga")] == \
+            [k[c] for c in ("games", "w", "d", "l", "gf", "ga")]
+
+def test_team_year_summary_maintained_by_triggers(tmp_path):
+    db_path = tmp_path / "rollup.db"
+    init_db(db_path)
+    load_csv_to_db(db_path, Path("data/results.csv"))
+
+    index = build_kpi_index(load_results())
+    params = {"team_name": "England", "year_from": 1990, "year_to": 1999}
+    row = run_query("team_year_kpis", params, db_path).iloc[0]
+    k = kpis_in_years(index, "England", 1990, 1999)
+    assert [int(row[c]) for c in ("games", "w", "d", "l", "gf", "ga")] == \
+        [k[c] for c in ("games", "w", "d", "l", "gf", "ga")]
+    assert int(row["home_games"]) + int(row["away_games"]) == k["games"]
+
+    board = run_query("team_year_leaderboard",
+                      {"year_from": 2000, "year_to": 2009, "min_games": 50, "limit": 10}, db_path)
+    assert len(board) == 10 and board["win_pct"].is_monotonic_decreasing
+
+    # deleting matches rolls the summary back
+    with sqlite3.connect(db_path) as conn:
+        conn.execute("DELETE FROM matches WHERE year BETWEEN 1990 AND 1994")
+    row = run_query("team_year_kpis", params, db_path).iloc[0]
+    assert int(row["games"]) == kpis_in_years(index, "England", 1995, 1999)["games"]
+
+    # updates (a corrected score, a match moved to another year) stay in sync
+    rebuilt = """
+        SELECT team_id, year, COUNT(*), SUM(gf > ga), SUM(gf = ga), SUM(gf < ga), SUM(gf), SUM(ga),
+               SUM(h), SUM(h AND gf > ga), SUM(h AND gf = ga), SUM(h AND gf < ga)
+        FROM (SELECT home_team_id AS team_id, year, home_score AS gf, away_score AS ga, 1 AS h FROM matches
+              UNION ALL
+              SELECT away_team_id, year, away_score, home_score, 0 FROM matches)
+        GROUP BY team_id, year ORDER BY team_id, year"""
+    kept = """
+        SELECT team_id, year, games, w, d, l, gf, ga, home_games, home_w, home_d, home_l
+        FROM team_year_summary ORDER BY team_id, year"""
+    with sqlite3.connect(db_path) as conn:
+        conn.execute("UPDATE matches SET home_score = home_score + 3 WHERE year = 1998")
+        conn.execute("UPDATE matches SET year = 2031, date = '2031-06-01' "
+                     "WHERE id IN (SELECT id FROM matches WHERE year = 1997 LIMIT 20)")
+        assert conn.execute(kept).fetchall() == conn.execute(rebuilt).fetchall()
+
+def test_elo_history_persisted_and_queried(tmp_path):
+    db_path = tmp_path / "elo.db"
+    init_db(db_path)
+    csv_path = tmp_path / "results.csv"
+    pd.read_csv("data/results.csv").head(3000).to_csv(csv_path, index=False)
+    load_csv_to_db(db_path, csv_path)
+
+    df = load_results().head(3000)
+    ratings_history, _ = compute_elo(df)
+    assert save_elo_history(ratings_history, db_path) == len(ratings_history)
+    store = load_elo_store_from_db(db_path)
+
+    as_of = "1930-07-30"
+    board_sql = run_query("elo_leaderboard_as_of", {"as_of": as_of, "limit": 10}, db_path)
+    board_mem = elo_leaderboard_as_of(store, as_of, top=10)
+    assert board_sql["team"].tolist() == board_mem["team"].tolist()
+
+    team = board_mem.iloc[0]["team"]
+    trend = run_query("elo_team_trend",
+                      {"team_name": team, "date_from": "1900-01-01", "date_to": "1930-12-31"}, db_path)
+    assert len(trend) == len(elo_trend(store, team, "1900-01-01", "1930-12-31"))
+
+    first = trend.iloc[0]["date"]
+    at = run_query("elo_rating_at_match", {"team_name": team, "match_date": first}, db_path)
+    assert abs(float(at.iloc[0]["rating_before"]) - elo_rating_at(store, team, first)) < 1e-3
+
+def test_sql_rolling_metrics_match_pandas(tmp_path):
+    db_path = tmp_path / "rolling.db"
+    init_db(db_path)
+    csv_path = tmp_path / "results.csv"
+    pd.read_csv("data/results.csv").head(6000).to_csv(csv_path, index=False)
+    load_csv_to_db(db_path, csv_path)
+    df = load_results().head(6000)
+
+    def close(a, b):
+        return len(a) == len(b) and abs(pd.Series(a).to_numpy() - pd.Series(b).to_numpy()).max() < 1e-9
+
+    everyone = run_query("all_teams_rolling_metrics",
+                         {"window": 7, "date_from": "1800-01-01", "date_to": "2100-01-01"}, db_path)
+    assert len(everyone) == 2 * len(df)
+    for team in ("England", "Brazil", "Hungary"):
+        dt = team_perspective(df, team)
+        one = run_query("team_rolling_metrics", {"team_name": team, "window": 7}, db_path)
+        assert close(one["rolling_form"], rolling_form(dt, 7)["rolling_form"])
+        assert close(one["rolling_gd"], rolling_goal_diff(dt, 7)["rolling_gd"])
+        assert close(one["rolling_win_pct"], rolling_win_pct(dt, 7)["rolling_win_pct"])
+
+        part = everyone[everyone["team"] == team]
+        assert close(part["rolling_form"], one["rolling_form"])
+
+        days = run_query("team_rolling_metrics_days", {"team_name": team, "days": 365}, db_path)
+        assert close(days["rolling_form"], rolling_form(dt, "365D")["rolling_form"])
+        assert close(days["rolling_gd"], rolling_goal_diff(dt, "365D")["rolling_gd"])
+
+    current = run_query("all_teams_current_form", {"window": 5, "as_of": "2100-01-01", "limit": 500}, db_path)
+    row = current[current["team"] == "England"].iloc[0]
+    assert abs(row["rolling_form"] - round(rolling_form(team_perspective(df, "England"), 5)["rolling_form"].iloc[-1], 3)) < 1e-9
+
+    # team_matches follows deletes and updates on matches
+    rebuilt = """
+        SELECT home_team_id, date, id, year, away_team_id, 1, home_score, away_score FROM matches
+        UNION ALL
+        SELECT away_team_id, date, id, year, home_team_id, 0, away_score, home_score FROM matches
+        ORDER BY 1, 2, 3"""
+    kept = """
+        SELECT team_id, date, match_id, year, opponent_id, is_home, gf, ga
+        FROM team_matches ORDER BY 1, 2, 3"""
+    with sqlite3.connect(db_path) as conn:
+        conn.execute("DELETE FROM matches WHERE year < 1950")
+        left = conn.execute("SELECT COUNT(*) FROM team_matches").fetchone()[0]
+        assert left == 2 * conn.execute("SELECT COUNT(*) FROM matches").fetchone()[0]
+        conn.execute("UPDATE matches SET away_score = away_score + 1 WHERE year = 1955")
+        conn.execute("UPDATE matches SET date = '1956-12-31', year = 1956 WHERE year = 1954")
+        assert conn.execute(kept).fetchall() == conn.execute(rebuilt).fetchall()
+
+def test_slow_query_log_captures_plans_and_rotates(tmp_path):
+    db_path = tmp_path / "slow.db"
+    init_db(db_path)
+    csv_path = tmp_path / "results.csv"
+    pd.read_csv("data/results.csv").head(3000).to_csv(csv_path, index=False)
+    load_csv_to_db(db_path, csv_path)
+    log_path = tmp_path / "logs" / "slow.log"
+    try:
+        configure_slow_query_log(None)
+        run_query("team_rolling_metrics", {"team_name": "England", "window": 5}, db_path)
+        assert read_slow_query_log(log_path).empty
+
+        configure_slow_query_log(0.0, log_path, max_bytes=2_000, backup_count=2)
+        for team in ("England", "Scotland", "Wales", "Côte d'Ivoire", "Ireland", "Uruguay"):
+            out = run_query("team_rolling_metrics", {"team_name": team, "window": 5}, db_path)
+        entries = read_slow_query_log(log_path)
+        last = entries.iloc[-1]
+        assert last["query"] == "team_rolling_metrics" and last["rows"] == len(out)
+        assert last["signature"] == "team_name:str(7),window:int"
+        # team_matches (alias m) is read through its clustered key; nested steps are indented
+        assert any(line.strip().startswith("SEARCH m USING PRIMARY KEY") for line in last["plan"])
+        assert any(line.startswith("  ") for line in last["plan"])
+        assert (tmp_path / "logs" / "slow.log.1").exists()  # rotated
+        assert entries["ts"].is_monotonic_increasing
+
+        summary = slow_query_summary(entries)
+        assert summary.iloc[0]["query"] == "team_rolling_metrics"
+        assert summary.iloc[0]["calls"] == len(entries)
+    finally:
+        configure_slow_query_log(None)
+
+def test_read_modes_agree_and_replica_follows_writes(tmp_path):
+    db_path = tmp_path / "read.db"
+    init_db(db_path)
+    csv_path = tmp_path / "results.csv"
+    pd.read_csv("data/results.csv").head(3000).to_csv(csv_path, index=False)
+    load_csv_to_db(db_path, csv_path)
+    params = {"team_name": "England", "window": 5}
+    try:
+        outs = {}
+        for mode in READ_MODES:
+            configure_read_mode(mode)
+            outs[mode] = run_query("team_rolling_metrics", params, db_path)
+        assert outs["readonly"].equals(outs["default"]) and outs["memory"].equals(outs["default"])
+
+        # the replica is read-only and is re-cloned once the file changes
+        assert refresh_replica(db_path) > 0
+        with pytest.raises(sqlite3.OperationalError), _read_connection(db_path) as conn:
+            conn.execute("DELETE FROM matches")
+        with sqlite3.connect(db_path) as conn:
+            conn.execute("DELETE FROM matches WHERE home_team_id IN (SELECT id FROM teams WHERE name = 'England')")
+        fewer = run_query("team_rolling_metrics", params, db_path)
+        assert 0 < len(fewer) < len(outs["memory"])
+
+        configure_read_mode("readonly")
+        with pytest.raises(sqlite3.OperationalError):
+            run_query("team_rolling_metrics", params, tmp_path / "missing.db")
+        with pytest.raises(ValueError):
+            configure_read_mode("turbo")
+    finally:
+        configure_read_mode("default")
+
+def test_readonly_mode_sees_commits_still_in_the_wal(tmp_path):
+    db_path = tmp_path / "ro.db"
+    df = load_results().head(2000)
+    init_db(db_path)
+    load_frame_to_db(df.head(1000), db_path)
+    # an open read transaction keeps the checkpoint from copying the commit back
+    reader = sqlite3.connect(db_path)
+    reader.execute("BEGIN")
+    reader.execute("SELECT COUNT(*) FROM matches").fetchone()
+    try:
+        rebuild_db(df, db_path)
+        assert Path(f"{db_path}-wal").stat().st_size > 0
+        configure_read_mode("readonly")
+        with _read_connection(db_path) as conn:
+            assert conn.execute("SELECT COUNT(*) FROM matches").fetchone()[0] == 2000
+    finally:
+        reader.close()
+        configure_read_mode("default")
+
+def test_replica_is_recloned_only_after_a_commit(tmp_path):
+    db_path = tmp_path / "replica.db"
+    df = load_results().head(4000)
+    init_db(db_path)
+    load_frame_to_db(df.head(1000), db_path)
+    key = str(db_path.resolve())
+    seen = []
+    def progress(fraction, message=""):
+        # reads during the open rebuild transaction stay on the first replica
+        with _read_connection(db_path) as conn:
+            seen.append((_replicas[key], conn.execute("SELECT COUNT(*) FROM matches").fetchone()[0]))
+    try:
+        configure_read_mode("memory")
+        with _read_connection(db_path) as conn:
+            before = _replicas[key]
+        rebuild_db(df, db_path, progress=progress)
+        assert len(seen) > 3 and all(r is before and n == 1000 for r, n in seen)
+        with _read_connection(db_path) as conn:
+            assert conn.execute("SELECT COUNT(*) FROM matches").fetchone()[0] == 4000
+            assert _replicas[key] is not before
+    finally:
+        configure_read_mode("default")
+
+def test_rebuild_is_atomic_for_readers_and_writes_are_serialized(tmp_path):
+    db_path = tmp_path / "wal.db"
+    df = load_results().head(4000)
+    init_db(db_path)
+    load_frame_to_db(df.head(1000), db_path)
+    with sqlite3.connect(db_path) as conn:
+        assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+
+    # a reader polled at every progress step still sees the old snapshot
+    seen = []
+    def progress(fraction, message=""):
+        with sqlite3.connect(db_path) as conn:
+            seen.append(conn.execute("SELECT COUNT(*) FROM matches").fetchone()[0])
+    assert rebuild_db(df, db_path, progress=progress)[1] == 4000
+    assert len(seen) > 3 and set(seen) == {1000}
+    assert run_query("recent_form_10", {"team_name": "England", "limit": 10}, db_path)["date"].notna().all()
+
+    writer = db_writer(db_path)
+    assert db_writer(db_path) is writer
+    order = []
+    slow = writer.submit("rebuild", lambda *a, progress: order.append("a") or rebuild_db(*a, progress=progress),
+                         df.head(2000), db_path)
+    fast = writer.submit("init", lambda progress: order.append("b") or init_db(db_path, progress=progress))
+    bad = writer.submit("bad", load_csv_to_db, db_path, tmp_path / "missing.csv")
+    assert slow.result()[1] == 2000 and fast.result() is None
+    with pytest.raises(FileNotFoundError):
+        bad.result()
+    assert order == ["a", "b"]
+    assert (slow.status, slow.progress, bad.status) == ("done", 1.0, "failed")
+    assert [j.name for j in writer.jobs()] == ["bad", "init", "rebuild"] and not writer.pending()
+
+def test_keyset_pages_and_streaming_export(tmp_path):
+    db_path = tmp_path / "paged.db"
+    init_db(db_path)
+    df = load_results().head(5000)
+    load_frame_to_db(df, db_path)
+    params = {"date_from": "1800-01-01", "date_to": "2100-01-01"}
+
+    first = run_query_paged("match_history", params, page_size=300, db_path=db_path)
+    second = run_query_paged("match_history", params, page_size=300, after=first.next_after, db_path=db_path)
+    assert len(first.rows) == 300 and second.rows["id"].iloc[0] == first.rows["id"].iloc[-1] + 1
+    pages = list(iter_query_pages("match_history", params, page_size=700, db_path=db_path))
+    every = pd.concat(pages, ignore_index=True)
+    assert [len(p) for p in pages][:-1] == [700] * (len(pages) - 1)
+    assert len(every) == 5000 and every["id"].is_unique
+    assert list(zip(every["date"], every["id"])) == sorted(zip(every["date"], every["id"]))
+
+    team = run_query_paged("team_match_history", {"team_name": "England"}, page_size=10_000, db_path=db_path)
+    assert team.next_after is None and len(team.rows) == len(team_perspective(df, "England"))
+    with pytest.raises(ValueError):
+        run_query_paged("recent_form_10", {"team_name": "England", "limit": 5}, db_path=db_path)
+
+    # exports stream from one cursor; paged queries are exported whole
+    n = export_query("match_history", params, tmp_path / "out" / "matches.csv.gz", batch_rows=333, db_path=db_path)
+    back = pd.read_csv(tmp_path / "out" / "matches.csv.gz")
+    assert n == 5000 and back["id"].tolist() == every["id"].tolist()
+    rolling = {"team_name": "England", "window": 5}
+    assert export_query("team_rolling_metrics", rolling, tmp_path / "r.csv", db_path=db_path) == \
+        len(run_query("team_rolling_metrics", rolling, db_path))
+    with pytest.raises(ValueError):
+        export_query("match_history", params, tmp_path / "matches.xlsx", db_path=db_path)
+    assert not list(tmp_path.rglob("*.part"))
+
+    # in "memory" mode an export does not take the replica's lock
+    try:
+        configure_read_mode("memory")
+        with _read_connection(db_path):
+            done = ThreadPoolExecutor(1).submit(export_query, "match_history", params,
+                                                tmp_path / "busy.csv", db_path=db_path)
+            assert done.result(timeout=30) == 5000
+    finally:
+        configure_read_mode("default")
+
+def test_parquet_export(tmp_path):
+    pytest.importorskip("pyarrow")
+    db_path = tmp_path / "pq.db"
+    init_db(db_path)
+    load_frame_to_db(load_results().head(2000), db_path)
+    params = {"date_from": "1800-01-01", "date_to": "2100-01-01"}
+    assert export_query("match_history", params, tmp_path / "m.parquet", batch_rows=500, db_path=db_path) == 2000
+    assert len(pd.read_parquet(tmp_path / "m.parquet")) == 2000